@@ -1,4 +1,4 @@
 from .cox_ingersoll_ross import CoxIngersollRoss
 from .geometric_brownian_motion import GeometricBrownianMotion
-from .hawkes import Hawkes
+from .hawkes import Hawkes, MultivariateHawkes
 from .ohrnstein_uhlenbeck import OrnsteinUhlenbeck
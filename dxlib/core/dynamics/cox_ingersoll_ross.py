@@ -83,3 +83,21 @@ class CoxIngersollRoss(StochasticProcess):
             trajectory[i] = self.sample(trajectory[i - 1], dt, size)
 
         return trajectory
+
+    def _paths(self, x, dt, n_steps, rng, state) -> np.ndarray:
+        # full truncation Euler scheme: the drift and diffusion use max(x, 0), and the state itself may go negative,
+        # so the values are only truncated at zero by `_observe`
+        noise = rng.standard_normal((n_steps, len(x)))
+        noise *= self.volatility * np.sqrt(dt)
+        paths = np.empty_like(noise)
+        kappa_dt = self.mean_reversion * dt
+        state = np.array(x, dtype=float)
+        positive = np.empty_like(state)
+        for i in range(n_steps):
+            np.maximum(state, 0, out=positive)
+            state += kappa_dt * (self.long_term_mean - positive) + np.sqrt(positive) * noise[i]
+            paths[i] = state
+        return paths
+
+    def _observe(self, paths) -> np.ndarray:
+        return np.maximum(paths, 0, out=paths)
@@ -75,3 +75,13 @@ class GeometricBrownianMotion(StochasticProcess):
             yield sample, i * dt
             sample = self.sample(sample, dt, size)
         return None
+
+    def _paths(self, x, dt, n_steps, rng, state) -> np.ndarray:
+        # log-returns of all steps at once, accumulated into log-prices
+        paths = rng.standard_normal((n_steps, len(x)))
+        paths *= self.vol * np.sqrt(dt)
+        paths += (self.mean - 0.5 * self.vol ** 2) * dt
+        np.cumsum(paths, axis=0, out=paths)
+        np.exp(paths, out=paths)
+        paths *= x
+        return paths
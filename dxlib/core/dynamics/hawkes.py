@@ -1,3 +1,6 @@
+import math
+from typing import Optional, Tuple
+
 import numpy as np
 
 from .stochastic_process import StochasticProcess
@@ -21,17 +24,49 @@ class Hawkes(StochasticProcess):
         self.branching_ratio = branching_ratio
         self.decay = decay
 
-    def intensity(self, x, dt, events) -> np.ndarray:
+        self.last_event: Optional[float] = None
+        self.excitation = 0.0
+
+    def reset(self):
+        """
+        Forget the events registered with `update`.
+        """
+        self.last_event = None
+        self.excitation = 0.0
+
+    def update(self, event: float, dt=1.0):
+        """
+        Register an event, updating the recursive state of the exponential kernel in O(1).
+
+        The state is the kernel sum over the registered events at the last event, which decays by
+        exp(-decay * elapsed / dt) until the next one, so the intensity never needs the event history.
+
+        Args:
+            event (float): Time of the event, not earlier than the last registered one.
+            dt (float): Time step, the unit of the kernel's decay.
+        """
+        if self.last_event is not None:
+            self.excitation *= math.exp(-self.decay * (event - self.last_event) / dt)
+        self.excitation += 1.0
+        self.last_event = event
+
+    def intensity(self, x, dt, events=None) -> np.ndarray:
         """
         Compute the intensity of the Hawkes process at a given point in time.
 
         Args:
             x (float | np.ndarray): Current value of the process (typically the number of events).
-            events (np.ndarray): Array of event times.
+            events (np.ndarray): Array of event times. If None, the events registered with `update` are used,
+                through their recursive state.
 
         Returns:
             np.ndarray: Intensity of the Hawkes process at a given point in time.
         """
+        if events is None:
+            if self.last_event is None:
+                return self.base_intensity
+            return (self.base_intensity
+                    + self.branching_ratio * self.excitation * np.exp(-self.decay * (x - self.last_event) / dt))
         return (self.base_intensity
                 + self.branching_ratio * np.sum(np.exp(-self.decay * (x - events) / dt), axis=0))
 
@@ -42,14 +77,16 @@ class Hawkes(StochasticProcess):
         Args:
             x (float | np.ndarray): Current value of the process (typically the number of events).
             dt (float): Time step.
-            events (np.ndarray): Array of event times.
+            events (np.ndarray): Array of event times. If None, the events registered with `update` are used.
             size (int): Number of samples to generate.
         Returns:
             np.ndarray: Samples drawn from the Hawkes process.
         """
         assert (isinstance(x, (int, float)) and not isinstance(x, complex)) or isinstance(x, np.ndarray), \
             "Argument must be a non-complex number or a NumPy array"
-        events = np.array(events) if events is not None else np.array([])
+        if events is None:
+            return x + np.random.exponential(dt / self.intensity(x, dt), size)
+        events = np.array(events)
         if isinstance(x, (int, float)) and not isinstance(x, complex):
             return x + np.random.exponential(dt / self.intensity(x, dt, events), size)
         elif isinstance(x, np.ndarray) and size is not None:
@@ -112,3 +149,141 @@ class Hawkes(StochasticProcess):
             raise ValueError("Argument 'size' must be provided when 'x' is a NumPy array.")
         else:
             raise ValueError("Invalid input arguments.")
+
+    def simulate_events(self, t: float, seed: Optional[int | np.random.Generator] = None) -> np.ndarray:
+        """
+        Simulate the event times of the process over [0, t] by Ogata's thinning.
+
+        Uses the kernel of `intensity` with a unit time step, branching_ratio * exp(-decay * s).
+        Between events the intensity only decays, so its value right after the last event bounds it until the next one:
+        candidate times are drawn at that rate, and accepted with probability intensity / bound.
+        The kernel sum is carried recursively, so each candidate costs O(1).
+
+        Args:
+            t (float): Length of the simulation window.
+            seed (int | np.random.Generator): Seed or generator for the random draws.
+
+        Returns:
+            np.ndarray: Sorted event times.
+        """
+        rng = np.random.default_rng(seed)
+        mu, alpha, beta = self.base_intensity, self.branching_ratio, self.decay
+        exp = math.exp
+
+        events = []
+        now, excitation = 0.0, 0.0
+        while True:
+            # draw in blocks, python floats are much faster to iterate than numpy scalars
+            waits = rng.standard_exponential(1 << 16).tolist()
+            uniforms = rng.random(1 << 16).tolist()
+            for wait, uniform in zip(waits, uniforms):
+                bound = mu + alpha * excitation
+                wait /= bound
+                now += wait
+                if now > t:
+                    return np.array(events)
+                excitation *= exp(-beta * wait)
+                if uniform * bound <= mu + alpha * excitation:
+                    events.append(now)
+                    excitation += 1.0
+
+    def _paths(self, x, dt, n_steps, rng, state) -> np.ndarray:
+        # event times of each path, where every value is an event, as in `simulate`.
+        # The kernel sum over past events is carried recursively instead of summed over the whole history:
+        # after an event, sum = 1 + exp(-decay * wait / dt) * previous sum
+        kernel = state.get("kernel")
+        if kernel is None:
+            kernel = np.ones(len(x))
+        waits = rng.standard_exponential((n_steps, len(x)))
+        paths = np.empty_like(waits)
+        times = np.array(x, dtype=float)
+        for i in range(n_steps):
+            wait = waits[i]
+            wait *= dt / (self.base_intensity + self.branching_ratio * kernel)
+            times += wait
+            kernel = 1 + np.exp(-self.decay * wait / dt) * kernel
+            paths[i] = times
+        state["kernel"] = kernel
+        return paths
+
+
+class MultivariateHawkes:
+    """
+    Multivariate Hawkes process with exponential kernels, where events of each component excite all components.
+
+    The intensity of component i is base_intensity[i] + sum over past events (t_k, j_k) of
+    excitation[i, j_k] * exp(-decay[i, j_k] * (t - t_k)).
+    """
+
+    def __init__(self, base_intensity, excitation, decay):
+        """
+        Args:
+            base_intensity (np.ndarray): Baseline intensity of each of the d components, of shape (d,).
+            excitation (np.ndarray): Jump of the intensity of component i after an event of component j,
+                of shape (d, d).
+            decay (float | np.ndarray): Decay rate of the kernels, a scalar or of shape (d, d).
+        """
+        self.base_intensity = np.asarray(base_intensity, dtype=float)
+        d = len(self.base_intensity)
+        self.excitation = np.asarray(excitation, dtype=float).reshape(d, d)
+        self.decay = np.broadcast_to(np.asarray(decay, dtype=float), (d, d)).copy()
+        if (self.decay <= 0).any():
+            raise ValueError("Decay rates must be positive.")
+        # spectral radius of the branching matrix, the process is stationary if below one
+        self.branching_ratio = float(np.max(np.abs(np.linalg.eigvals(self.excitation / self.decay))))
+
+    @property
+    def dimension(self) -> int:
+        return len(self.base_intensity)
+
+    def simulate_events(self, t: float, seed: Optional[int | np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Simulate the events of all components over [0, t] by Ogata's thinning, on the total intensity.
+
+        The kernel state is a (d, d) matrix of decayed sums, updated in O(d^2) per candidate time.
+
+        Args:
+            t (float): Length of the simulation window.
+            seed (int | np.random.Generator): Seed or generator for the random draws.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted event times, and the component of each event.
+        """
+        rng = np.random.default_rng(seed)
+        mu, alpha, beta = self.base_intensity, self.excitation, self.decay
+
+        # with a single decay rate the kernel sums of each component decay together, so the state reduces to
+        # the excess intensity of each component, instead of a (d, d) matrix of sums per pair
+        uniform = bool((beta == beta[0, 0]).all())
+        rate = float(beta[0, 0])
+        state = np.zeros(len(mu)) if uniform else np.zeros_like(alpha)
+
+        times, marks = [], []
+        now, last = 0.0, 0.0
+        bound = mu.sum()
+        while True:
+            draws = rng.random((1 << 12, 3)).tolist()
+            for wait, accept, pick in draws:
+                now += -math.log1p(-wait) / bound
+                if now > t:
+                    return np.array(times), np.array(marks, dtype=int)
+                if uniform:
+                    state *= math.exp(-rate * (now - last))
+                    cumulative = (mu + state).cumsum()
+                else:
+                    state *= np.exp(-beta * (now - last))
+                    cumulative = (mu + (alpha * state).sum(axis=1)).cumsum()
+                last = now
+                total = cumulative[-1]
+                if accept * bound <= total:
+                    component = min(int(cumulative.searchsorted(pick * total, side="right")), len(mu) - 1)
+                    times.append(now)
+                    marks.append(component)
+                    if uniform:
+                        state += alpha[:, component]
+                        bound = total + alpha[:, component].sum()
+                    else:
+                        state[:, component] += 1.0
+                        bound = total + alpha[:, component].sum()
+                else:
+                    bound = total
@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.signal import lfilter
 
 from .stochastic_process import StochasticProcess
 
@@ -78,3 +79,14 @@ class OrnsteinUhlenbeck(StochasticProcess):
             trajectory[i] = self.sample(trajectory[i - 1], dt, size)
 
         return trajectory
+
+    def _paths(self, x, dt, n_steps, rng, state) -> np.ndarray:
+        # the deviations from the mean follow y[i] = phi * y[i - 1] + noise[i], a linear recurrence over the
+        # pre-drawn noise, solved for all steps and paths at once by `lfilter`, as a discounted cumulative sum
+        phi = 1 - self.mean_reversion * dt
+        noise = rng.standard_normal((n_steps, len(x)))
+        noise *= self.volatility * np.sqrt(dt)
+        deviation = x - self.long_term_mean
+        paths, _ = lfilter([1.0], [1.0, -phi], noise, axis=0, zi=(phi * deviation)[None, :])
+        paths += self.long_term_mean
+        return paths
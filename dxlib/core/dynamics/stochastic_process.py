@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
 
 import numpy as np
 
@@ -31,3 +32,84 @@ class StochasticProcess(ABC):
             size (int): Number of samples to generate.
         """
         pass
+
+    def _paths(self, x: np.ndarray, dt: float, n_steps: int, rng: np.random.Generator, state: dict) -> np.ndarray:
+        """
+        Generate the next `n_steps` values of every path, starting after the current values `x`.
+        Processes that depend on more than the current values keep it in `state`, which is shared by all chunks.
+
+        Returns:
+            np.ndarray: Array of shape (n_steps, len(x)).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support path simulation")
+
+    def _observe(self, paths: np.ndarray) -> np.ndarray:
+        """
+        Map the simulated states to the values of the process, in place. The identity by default.
+        """
+        return paths
+
+    def iter_paths(self,
+                   x0: float | np.ndarray,
+                   dt: float,
+                   n_steps: int,
+                   n_paths: int,
+                   seed: Optional[int | np.random.Generator] = None,
+                   chunk_size: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Simulate `n_paths` paths of the process in chunks of at most `chunk_size` steps,
+        so large path sets can be streamed without holding them in memory.
+
+        Chunks continue from the last row of the previous chunk and draw from the same generator,
+        so they concatenate to the same paths as `simulate_paths` with the same seed.
+
+        Args:
+            x0 (float | np.ndarray): Starting value, shared by all paths or one per path.
+            dt (float): Time step.
+            n_steps (int): Number of steps, counting the starting value as the first one.
+            n_paths (int): Number of paths.
+            seed (int | np.random.Generator): Seed or generator for the random draws.
+            chunk_size (int): Maximum number of steps per chunk. Defaults to all steps in one chunk.
+
+        Yields:
+            np.ndarray: Arrays of shape (chunk steps, n_paths).
+        """
+        rng = np.random.default_rng(seed)
+        chunk_size = max(1, chunk_size or n_steps)
+        x = np.broadcast_to(np.asarray(x0, dtype=float), (n_paths,))
+        state = {}
+
+        done = 0
+        while done < n_steps:
+            m = min(chunk_size, n_steps - done)
+            if done == 0:
+                chunk = np.empty((m, n_paths))
+                chunk[0] = x
+                chunk[1:] = self._paths(x, dt, m - 1, rng, state)
+            else:
+                chunk = self._paths(x, dt, m, rng, state)
+            # the next chunk continues from the simulated state, before it is mapped to the process values
+            x = chunk[-1].copy()
+            done += m
+            yield self._observe(chunk)
+
+    def simulate_paths(self,
+                       x0: float | np.ndarray,
+                       dt: float,
+                       n_steps: int,
+                       n_paths: int,
+                       seed: Optional[int | np.random.Generator] = None) -> np.ndarray:
+        """
+        Simulate `n_paths` paths of the process at once.
+
+        Args:
+            x0 (float | np.ndarray): Starting value, shared by all paths or one per path.
+            dt (float): Time step.
+            n_steps (int): Number of steps, counting the starting value as the first one.
+            n_paths (int): Number of paths.
+            seed (int | np.random.Generator): Seed or generator for the random draws.
+
+        Returns:
+            np.ndarray: Array of shape (n_steps, n_paths), one path per column.
+        """
+        return next(self.iter_paths(x0, dt, n_steps, n_paths, seed), np.empty((0, n_paths)))
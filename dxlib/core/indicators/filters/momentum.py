@@ -1,7 +1,7 @@
 import pandas as pd
 
 from dxlib.core import Signal
-from dxlib.history import History
+from dxlib.history import History, HistorySchema
 
 
 class Momentum:
@@ -15,24 +15,38 @@ class Momentum:
         long = prices.shift(self.long_window + self.skip_window)
         return (shifted / long) - 1
 
-    def get_signals(self, history: History) -> History:
-        df = history.data
-        momentum_df = df.apply(self.momentum)
-
-        signals = pd.DataFrame(index=df.index, columns=df.columns)
+    def _signals(self, momentum_df: pd.DataFrame) -> pd.DataFrame:
+        signals = pd.DataFrame(index=momentum_df.index, columns=momentum_df.columns)
 
-        for column in df.columns:
+        for column in momentum_df.columns:
             signals[column] = Signal.HOLD
             signals.loc[momentum_df[column] > self.threshold, column] = Signal.BUY
             signals.loc[momentum_df[column] < -self.threshold, column] = Signal.SELL
 
-        return History(
-            history_schema=history.history_schema,
-            data={
-                "index": df.index,
-                "index_names": df.index.names,
-                "columns": signals.columns,
-                "column_names": [""],
-                "data": signals,
-            }
+        return signals
+
+    def _schema(self, history: History) -> HistorySchema:
+        return HistorySchema(
+            index=history.history_schema.index,
+            columns={col: Signal for col in history.history_schema.column_names},
         )
+
+    def get_signals(self, history: History) -> History:
+        df = history.data
+        momentum_df = df.apply(self.momentum)
+
+        return History(history_schema=self._schema(history), data=self._signals(momentum_df))
+
+    def update(self, state, history: History):
+        """
+        Get the signals of new rows only. The state holds the last `long_window + skip_window` rows.
+
+        Returns:
+            Tuple[pd.DataFrame, History]: The new state, and the signals of the new rows.
+        """
+        tail = state if state is not None else history.data.iloc[:0]
+        df = pd.concat([tail, history.data])
+        momentum_df = df.apply(self.momentum).iloc[len(tail):]
+
+        state = df.iloc[-(self.long_window + self.skip_window):]
+        return state, History(history_schema=self._schema(history), data=self._signals(momentum_df))
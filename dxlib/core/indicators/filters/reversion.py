@@ -15,6 +15,8 @@ def zscore(short_window: int = 5, long_window: int = 20) -> Callable[[pd.Series]
 
         z = (short_ma - long_ma) / long_std
         return z.replace([np.inf, -np.inf], np.nan).fillna(0)
+    # number of past rows the score of a row depends on, used by `Reversion.update`
+    _zscore.window = max(short_window, long_window)
     return _zscore
 
 
@@ -24,21 +26,49 @@ class Reversion:
         self.lower = lower
         self.score = score if score is not None else zscore(5, 20)
 
-    def get_signals(self, history: History) -> History:
-        scores = history.apply({"instrument": self.score})
-
+    def _signals(self, scores: pd.DataFrame) -> pd.DataFrame:
         signals = pd.DataFrame(index=scores.index, columns=scores.columns)
 
         for column in scores.columns:
             signals.loc[scores[column] > self.upper, column] = Signal.SELL
             signals.loc[scores[column] < self.lower, column] = Signal.BUY
 
-        schema = HistorySchema(
+        return signals.dropna()
+
+    @staticmethod
+    def _schema(history: History) -> HistorySchema:
+        return HistorySchema(
             index=history.history_schema.index,
             columns={col: Signal for col in history.history_schema.column_names},
         )
 
+    def get_signals(self, history: History) -> History:
+        scores = history.apply({"instrument": self.score})
+
         return History(
-            history_schema=schema,
-            data=signals.dropna()
+            history_schema=self._schema(history),
+            data=self._signals(scores.data)
         )
+
+    def update(self, state, history: History):
+        """
+        Get the signals of new rows only.
+
+        The state holds the last rows of each instrument, as many as the score's `window` attribute,
+        or all of them for scores without one.
+
+        Returns:
+            Tuple[dict, History]: The new state, and the signals of the new rows.
+        """
+        state = state if state is not None else {}
+        window = getattr(self.score, "window", None)
+
+        scores = []
+        for instrument, rows in history.data.groupby(level="instrument", sort=False, observed=True):
+            tail = state.get(instrument, rows.iloc[:0])
+            df = pd.concat([tail, rows])
+            scores.append(self.score(df).iloc[len(tail):])
+            state[instrument] = df if window is None else df.iloc[-window:]
+
+        scores = pd.concat(scores) if scores else history.data.iloc[:0]
+        return state, History(history_schema=self._schema(history), data=self._signals(scores))
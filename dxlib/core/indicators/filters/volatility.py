@@ -13,6 +13,13 @@ class Volatility:
     def volatility(self, prices: pd.Series) -> pd.Series:
         return prices.pct_change().rolling(self.window).std()
 
+    @staticmethod
+    def _schema(history: History) -> HistorySchema:
+        return HistorySchema(
+            index=history.history_schema.index,
+            columns={col: Signal for col in history.history_schema.column_names},
+        )
+
     def get_signals(self, history: History) -> History:
         vol = history.apply({"instrument": self.volatility})
 
@@ -24,12 +31,35 @@ class Volatility:
             new = row.data >= threshold.loc[date]
             signals.loc[new.any(axis=1)[lambda x: x].index] = Signal.BUY
 
-        schema = HistorySchema(
-            index=history.history_schema.index,
-            columns={col: Signal for col in history.history_schema.column_names},
-        )
-
         return History(
-            history_schema=schema,
+            history_schema=self._schema(history),
             data=signals.dropna()
         )
+
+    def update(self, state, history: History):
+        """
+        Get the signals of new rows only. The state holds the last `window` rows of each instrument.
+
+        The quantile threshold is taken across the instruments of each date,
+        so all rows of a date must be passed in the same call.
+
+        Returns:
+            Tuple[dict, History]: The new state, and the signals of the new rows.
+        """
+        state = state if state is not None else {}
+
+        vol = []
+        for instrument, rows in history.data.groupby(level="instrument", sort=False, observed=True):
+            tail = state.get(instrument, rows.iloc[:0])
+            df = pd.concat([tail, rows])
+            vol.append(self.volatility(df).iloc[len(tail):])
+            state[instrument] = df.iloc[-self.window:]
+        vol = pd.concat(vol) if vol else history.data.iloc[:0]
+
+        threshold = vol.groupby(level="date").quantile(self.quantile)
+        above = vol >= threshold.loc[vol.index.get_level_values("date")].to_numpy()
+
+        signals = pd.DataFrame(index=vol.index, columns=vol.columns)
+        signals.loc[above.any(axis=1)] = Signal.BUY
+
+        return state, History(history_schema=self._schema(history), data=signals.dropna())
@@ -39,4 +39,5 @@ class Instrument(TypeRegistry):
         return type(self) == type(other) and self.symbol < other.symbol
 
     def __hash__(self):
-        return hash((self.symbol, self.name, self.asset_class))
+        # consistent with __eq__, and cheap: the hash of a string is cached
+        return hash(self.symbol)
@@ -1,13 +1,28 @@
-from typing import Dict, List
+from typing import Dict, List, Iterable
+
+import numpy as np
+import pandas as pd
 
 from dxlib.types import TypeRegistry
 from .instrument import Instrument
 
 
 class InstrumentStore(TypeRegistry):
+    """
+    Instruments by symbol.
+
+    Each instrument also has a dense integer id, in the order instruments were added, which never changes once
+    assigned. A symbol removed from the store keeps its id, which is not reused, still decodes to its instrument,
+    and is its id again if the symbol is added back.
+    Ids let histories hold their instrument level as integer codes, see `categorical` and `History.categorize`.
+    """
+
     def __init__(self, instruments: Dict[str, Instrument] = None):
         super().__init__()
         self._instruments: Dict[str, Instrument] = instruments or {}
+        self._ids: Dict[str, int] = {}
+        # instruments by id, including those since removed from the store
+        self._by_id: List[Instrument] = []
 
     @property
     def instruments(self):
@@ -71,5 +86,95 @@ class InstrumentStore(TypeRegistry):
     def to_list(self) -> List[Instrument]:
         return list(self.instruments.values())
 
+    # region Ids
+
+    def _assign_ids(self):
+        # `instruments` is a plain dict that may have been changed directly, so the symbols without an id,
+        # added since the last call, are found by a scan, done only when a symbol is found missing
+        for symbol, instrument in self.instruments.items():
+            if symbol not in self._ids:
+                self._ids[symbol] = len(self._by_id)
+                self._by_id.append(instrument)
+
+    def _id(self, symbol: str) -> int:
+        i = self._ids.get(symbol)
+        if i is None:
+            self._assign_ids()
+            i = self._ids[symbol]
+        return i
+
+    def id(self, symbol: str | Instrument) -> int:
+        """
+        Get the id of an instrument.
+
+        Raises:
+            KeyError: If the instrument is not in the store.
+        """
+        symbol = symbol.symbol if isinstance(symbol, Instrument) else symbol
+        if symbol not in self.instruments:
+            raise KeyError(symbol)
+        return self._id(symbol)
+
+    def ids(self, instruments: Iterable[str | Instrument]) -> np.ndarray:
+        """
+        Get the ids of many instruments, adding those not yet in the store.
+
+        Each distinct instrument is looked up once, so this is fast for repeated values, such as the rows of a history.
+
+        Args:
+            instruments (Iterable[str | Instrument]): The instruments or symbols.
+
+        Returns:
+            np.ndarray: The id of each instrument, -1 for missing values.
+        """
+        if not isinstance(instruments, (pd.Index, pd.Series, np.ndarray)):
+            instruments = list(instruments)
+        codes, uniques = pd.factorize(np.asarray(instruments, dtype=object))
+        for value in uniques:
+            if isinstance(value, Instrument):
+                self.instruments.setdefault(value.symbol, value)
+            elif value not in self.instruments:
+                self.add(value)
+        ids = np.array([self._id(value.symbol if isinstance(value, Instrument) else value) for value in uniques],
+                       dtype=np.intp)
+        return np.where(codes < 0, -1, ids[codes]) if len(ids) else codes.astype(np.intp)
+
+    def _current(self, i: int) -> Instrument:
+        # the instrument now held under the symbol of id `i`, or the last one if it was removed
+        instrument = self._by_id[i]
+        return self.instruments.get(instrument.symbol, instrument)
+
+    def decode(self, ids: Iterable[int]) -> List[Instrument]:
+        """
+        Get the instruments of many ids.
+        """
+        return [self._current(i) for i in ids]
+
+    @property
+    def categories(self) -> pd.Index:
+        """
+        The instruments of every id, in id order, including those removed from the store since.
+        """
+        self._assign_ids()
+        return pd.Index([self._current(i) for i in range(len(self._by_id))], dtype=object)
+
+    def categorical(self, instruments: Iterable[str | Instrument]) -> pd.Categorical:
+        """
+        Encode instruments as a categorical, whose codes are their ids and whose categories are `categories`.
+
+        Instruments are then compared, hashed and grouped as integers,
+        and only mapped back to `Instrument` objects when read.
+
+        Args:
+            instruments (Iterable[str | Instrument]): The instruments or symbols, added to the store if missing.
+
+        Returns:
+            pd.Categorical: The encoded instruments.
+        """
+        codes = self.ids(instruments)
+        return pd.Categorical.from_codes(codes, categories=self.categories)
+
+    # endregion
+
     def __hash__(self):
         return hash(self.instruments)
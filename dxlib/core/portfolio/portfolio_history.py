@@ -16,14 +16,16 @@ class PortfolioHistory(History):
     """
     def __init__(self,
                  schema_index: Dict[str, Type],
-                 data: Optional[pd.DataFrame | dict] = None):
+                 data: Optional[pd.DataFrame | dict] = None,
+                 columnar: bool = True):
         assert "instrument" in list(
             schema_index.keys()), "Index can not be converted to portfolio type. Must have `instrument` indexed at some level."
         schema = HistorySchema(
             index=schema_index,
             columns={"quantity": Number},
         )
-        super().__init__(schema, data)
+        super().__init__(schema, data, columnar=columnar)
+        self._keys = set(self.data.index.droplevel("instrument").unique()) if not self.data.empty else set()
 
     @classmethod
     def from_history(cls, history: History) -> "PortfolioHistory":
@@ -50,6 +52,7 @@ class PortfolioHistory(History):
             key = key.droplevel("instrument").unique().item()
             portfolio = pd.concat({key: df}, names=list(set(self.history_schema.index_names) - {"instrument"}))
             self.data = pd.concat([self.data, portfolio])
+            self._keys.add(key)
 
     def update(self, key: pd.Index, portfolio: Portfolio):
         df = portfolio.to_frame()
@@ -60,6 +63,13 @@ class PortfolioHistory(History):
         index_names = list(set(self.history_schema.index_names) - {"instrument"})
         new_data = pd.concat({key: df}, names=index_names)
 
+        # appending a new key only touches the new rows, replacing an existing key rebuilds the data
+        if self.buffer is not None and key not in self._keys:
+            self.buffer.append(new_data, keep="last")
+            self._keys.add(key)
+            return
+        self._keys.add(key)
+
         if not self.data.empty:
             to_drop = self.data.index.droplevel("instrument") == key
             self.data = self.data.loc[~to_drop]
@@ -1,21 +1,142 @@
 import hashlib
+import json
 import os
 import pickle
 import tempfile
-from typing import TypeVar, Type, Callable, Any
+from typing import TypeVar, Type, Callable, Any, Dict, Optional, Tuple
+from urllib.parse import quote
 
 import h5py
+import numpy as np
 import pandas as pd
 
 from .registry import Registry
 from .serializable import Serializable
 
 
+# region Frames
+
+def _encode(values: pd.Index) -> Tuple[np.ndarray, Dict[str, Any], Optional[list]]:
+    """
+    Encode a column or index level as a native array, the attributes to decode it with, and its categories, if any.
+
+    Numbers and booleans are kept as they are, nullable ones with their mask, and datetimes as int64 ticks.
+    Anything else is factorized into integer codes and the list of its distinct values.
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype) or (isinstance(dtype, np.dtype) and dtype.kind == "M"):
+        return values.asi8, {"encoding": "datetime", "dtype": str(dtype)}, None
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufc":
+        return values.to_numpy(), {"encoding": "native"}, None
+    if isinstance(values.array, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+        mask = np.asarray(values.isna())
+        array = values.array.to_numpy(dtype=dtype.numpy_dtype, na_value=dtype.numpy_dtype.type(0))
+        return array, {"encoding": "masked", "dtype": str(dtype), "mask": mask}, None
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes, categories = values.codes, values.categories
+        encoding = "categorical"
+    else:
+        codes, categories = pd.factorize(values)
+        encoding = "codes"
+    codes = np.asarray(codes, dtype=np.int32 if len(categories) < 2 ** 31 else np.int64)
+    attrs = {"encoding": encoding}
+    if encoding == "codes" and dtype != object:
+        # such as the string dtype, restored from the decoded values
+        attrs["dtype"] = str(dtype)
+    return codes, attrs, list(categories)
+
+
+def _decode(array: np.ndarray, attrs, categories: Optional[list], mask: Optional[np.ndarray] = None) -> pd.Index:
+    encoding = attrs["encoding"]
+    if encoding == "native":
+        return pd.Index(array)
+    if encoding == "masked":
+        values = pd.array(array, dtype=attrs["dtype"])
+        values[mask] = pd.NA
+        return pd.Index(values)
+    if encoding == "datetime":
+        dtype = pd.api.types.pandas_dtype(attrs["dtype"])
+        unit = np.datetime_data(dtype.base if dtype.kind == "M" else np.dtype(f"M8[{dtype.unit}]"))[0]
+        index = pd.DatetimeIndex(array.view(f"M8[{unit}]"))
+        return index.tz_localize("UTC").tz_convert(dtype.tz) if isinstance(dtype, pd.DatetimeTZDtype) else index
+
+    values = pd.Categorical.from_codes(array, dtype=pd.CategoricalDtype(pd.Index(categories, dtype=object)))
+    if encoding == "categorical":
+        return pd.CategoricalIndex(values)
+    values = pd.Index(np.asarray(values, dtype=object))
+    return values.astype(attrs["dtype"]) if "dtype" in attrs else values
+
+
+def _write_frame(group: h5py.Group, frame: pd.DataFrame, compression: Optional[str], chunk_rows: int):
+    """
+    Write a DataFrame as one dataset per index level and column, with the categories of encoded ones as JSON.
+    """
+    levels = [frame.index.get_level_values(i) for i in range(frame.index.nlevels)]
+    arrays = [("index", i, level) for i, level in enumerate(levels)]
+    arrays += [("columns", i, pd.Index(frame.iloc[:, i])) for i in range(frame.shape[1])]
+
+    group.attrs["index"] = json.dumps(list(frame.index.names), default=str)
+    group.attrs["columns"] = json.dumps(list(frame.columns), default=str)
+    for kind, i, values in arrays:
+        array, attrs, categories = _encode(values)
+        mask = attrs.pop("mask", None)
+        # empty datasets cannot be chunked, nor so compressed
+        options = {"compression": compression, "chunks": (min(len(array), chunk_rows),)} \
+            if compression and len(array) else {}
+        dataset = group.create_dataset(f"{kind}/{i}", data=array, **options)
+        dataset.attrs.update(attrs)
+        if mask is not None:
+            group.create_dataset(f"{kind}/{i}.mask", data=mask, **options)
+        if categories is not None:
+            group.create_dataset(f"{kind}/{i}.categories",
+                                 data=json.dumps(Registry.serialize(categories), default=str))
+
+
+def _read_frame(group: h5py.Group, types: Dict[str, type] = None) -> pd.DataFrame:
+    """
+    Read a DataFrame written by `_write_frame`, deserializing the categories of the levels and columns in `types`.
+    """
+    types = types or {}
+
+    def read(kind: str, names: list) -> list:
+        values = []
+        for i, name in enumerate(names):
+            dataset = group[f"{kind}/{i}"]
+            categories = None
+            if f"{i}.categories" in group[kind]:
+                categories = json.loads(group[f"{kind}/{i}.categories"][()])
+                if name in types:
+                    categories = [Registry.deserialize(value, types[name]) for value in categories]
+            mask = group[f"{kind}/{i}.mask"][()] if f"{i}.mask" in group[kind] else None
+            values.append(_decode(dataset[()], dataset.attrs, categories, mask))
+        return values
+
+    index_names, columns = json.loads(group.attrs["index"]), json.loads(group.attrs["columns"])
+    levels = read("index", index_names)
+    index = pd.MultiIndex.from_arrays(levels, names=index_names) if len(levels) > 1 else levels[0].rename(index_names[0])
+    return pd.DataFrame({i: values.array for i, values in enumerate(read("columns", columns))},
+                        index=index).set_axis(pd.Index(columns), axis=1)
+
+def _history_types() -> Tuple[type, type]:
+    # dxlib.history depends on dxlib.data, so it is imported when first needed
+    from dxlib.history import History, HistorySchema
+    from dxlib.core.instruments import instrument_dto  # noqa: F401, registers Instrument with the Registry
+    return History, HistorySchema
+
+# endregion
+
+
 class Storage:
     """
     Cache class to manage HDF5 storage for objects.
     This class provides methods to store, extend, load, and verify existence of HDF5 caches.
     It does not depend on specific index names or columns, allowing flexibility for different history objects.
+
+    Each key of a storage unit is kept in a file of its own, in the unit's directory, so storing one key
+    neither rewrites nor drops the others. Keys of units written as a single `{storage}.h5` file still load.
+    DataFrames, and the data of Histories, are stored natively as one compressed dataset per column and index level,
+    and other objects as the JSON of their Serializable.
     """
     T = TypeVar('T')
 
@@ -43,9 +164,31 @@ class Storage:
         """
         return os.path.join(self.cache_dir, f"{storage}.h5")
 
+    def _key_path(self, storage: str, key: str) -> str:
+        """
+        Generate the file path for a key of a storage unit, under the unit's directory.
+        """
+        return os.path.join(self.cache_dir, storage, f"{quote(key, safe='')}.h5")
+
+    def _locate(self, storage: str, key: str) -> Optional[Tuple[str, str]]:
+        """
+        Find the file holding a key, and the key's name in it, or None if it is not stored.
+        """
+        key_path = self._key_path(storage, key)
+        if os.path.exists(key_path):
+            return key_path, "data"
+        cache_path = self._path(storage)
+        try:
+            with h5py.File(cache_path, 'r') as f:
+                if key in f:
+                    return cache_path, key
+        except (OSError, FileNotFoundError):
+            pass
+        return None
+
     # region Manipulation
 
-    def load(self, storage: str, key: str, obj_type: Type[Serializable]) -> Serializable | None:
+    def load(self, storage: str, key: str, obj_type: Type[Serializable] = None) -> Serializable | pd.DataFrame | Any:
         """
         Load an object's data from an HDF5 cache file.
 
@@ -54,23 +197,36 @@ class Storage:
             key (str): The key to load the data under in the storage unit.
             obj_type (Type[Serializable]): The object type to load.
         Returns:
-            pd.DataFrame: The loaded data.
+            Serializable: The loaded object. Keys stored natively load as the DataFrame or History they were
+                stored from, and Histories as their DataFrame if `obj_type` is not a History DTO.
 
         Raises:
             KeyError: If the key is not present in the storage unit.
         """
-        cache_path = self._path(storage)
-        # ensure path exists
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        located = self._locate(storage, key)
+        if located is None:
+            raise KeyError(f"Key {key} not found in {storage}")
+        path, name = located
 
-        with h5py.File(cache_path, 'r') as f:
-            obj_data = f.get(key)
-            if not obj_data:
-                raise KeyError(f"Key {key} not found in {cache_path}")
+        with h5py.File(path, 'r') as f:
+            obj_data = f[name]
+            if isinstance(obj_data, h5py.Group):
+                return self._load_frame(obj_data, obj_type)
             data = obj_data[()].decode('utf-8')
 
             return obj_type.model_validate_json(data) if obj_type is not None else data
 
+    @staticmethod
+    def _load_frame(group: h5py.Group, obj_type: Type[Serializable] = None) -> pd.DataFrame | Any:
+        if "schema" not in group.attrs:
+            return _read_frame(group)
+        history_type, schema_type = _history_types()
+        schema = Registry.deserialize(json.loads(group.attrs["schema"]), schema_type)
+        data = _read_frame(group, {**schema.index, **schema.columns})
+        if obj_type is not None and getattr(obj_type, "domain_cls", None) is not history_type:
+            return data
+        return history_type(schema, data)
+
     def is_writable(self):
         try:
             testfile = tempfile.TemporaryFile(dir=self.cache_dir)
@@ -79,25 +235,54 @@ class Storage:
         except (OSError, PermissionError):
             return False
 
-    def store(self, storage: str, key: str, data: Serializable, overwrite: bool = False):
+    def store(self,
+              storage: str,
+              key: str,
+              data: Serializable | pd.DataFrame | Any,
+              overwrite: bool = False,
+              compression: Optional[str] = "gzip",
+              chunk_rows: int = 2 ** 16):
         """
-        Store an object's data in an HDF5 cache file.
+        Store an object's data under a key of a storage unit, in the key's own HDF5 file.
+
+        DataFrames, and Histories, are stored natively, as one chunked and compressed dataset per column
+        and index level. Other objects are stored as the JSON of their Serializable.
+        The key is written to a temporary file first, which replaces the key's file only once complete.
 
         Args:
             storage (str): The name/identifier for the storage unit.
             key (str): The key to store the data under in the storage unit.
-            data (Serializable): The object to store.
+            data (Serializable | pd.DataFrame | History): The object to store.
             overwrite (bool): If True, overwrite existing data.
+            compression (str): The HDF5 compression filter of native datasets, or None to store them uncompressed.
+            chunk_rows (int): The rows per chunk of compressed datasets.
+
+        Raises:
+            KeyError: If the key is already present in the storage unit, and `overwrite` is False.
         """
-        cache_path = self._path(storage)
+        key_path = self._key_path(storage, key)
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        history_type, _ = _history_types()
 
-        if not overwrite:
-            with h5py.File(cache_path, 'r') as f:
-                if key in f:
-                    raise KeyError("Key already exists. Use overwrite=True to overwrite.")
+        if not overwrite and self._locate(storage, key) is not None:
+            raise KeyError("Key already exists. Use overwrite=True to overwrite.")
 
-        with h5py.File(cache_path, 'w') as f:
-            f.create_dataset(key, data=data.model_dump_json())
+        fd, temp_path = tempfile.mkstemp(suffix=".h5.tmp", dir=os.path.dirname(key_path))
+        os.close(fd)
+        try:
+            with h5py.File(temp_path, 'w') as f:
+                if isinstance(data, history_type):
+                    group = f.create_group("data")
+                    group.attrs["schema"] = json.dumps(Registry.serialize(data.history_schema))
+                    _write_frame(group, data.data, compression, chunk_rows)
+                elif isinstance(data, pd.DataFrame):
+                    _write_frame(f.create_group("data"), data, compression, chunk_rows)
+                else:
+                    f.create_dataset("data", data=data.model_dump_json())
+            os.replace(temp_path, key_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
 
     # Cache a function call given its arguments, if the cache does not exist, else load it
     @staticmethod
@@ -124,15 +309,7 @@ class Storage:
                ):
         func_name = func.__qualname__
         key = hash_function(func_name, *args, **kwargs) if hash_function else self._hash(func_name, *args, **kwargs)
-        cache_path = self._path(storage)
-
-        try:
-            with h5py.File(cache_path, 'r') as f:
-                if key in f:
-                    return True
-            return False
-        except (OSError, KeyError):
-            return False
+        return self._locate(storage, key) is not None
 
 
     def cached(self,
@@ -149,11 +326,13 @@ class Storage:
         key = hash_function(func_name, *args, **kwargs) if hash_function else self._hash(func_name, *args, **kwargs)
 
         try:
-            return self.load(storage, key, model).to_domain()
+            obj = self.load(storage, key, model)
+            return obj.to_domain() if isinstance(obj, Serializable) else obj
         except (KeyError, FileNotFoundError):
             obj = func(*args, **kwargs)
             if self.is_writable():
-                self.store(storage, key, model.from_domain(obj), overwrite=True)  # None.
+                native = isinstance(obj, (pd.DataFrame, _history_types()[0]))
+                self.store(storage, key, obj if native else model.from_domain(obj), overwrite=True)  # None.
             return obj
 
     # endregion
@@ -2,9 +2,10 @@
 Structured storage implementation using Parquet + Polars as the primary backend.
 
 Features implemented:
-- Global or per-universe Parquet tables for timeseries with explicit schema
-  (date, symbol, open, high, low, close, volume, factors...)
-- Appendable writes using Polars' lazy_pandas or direct parquet write with row groups
+- A Hive-partitioned Parquet dataset for timeseries with explicit schema
+  (date, symbol, open, high, low, close, volume, factors...), partitioned by symbol and year by default
+- Appends that only write new part files to the partitions they touch, and a compaction job
+  that merges and deduplicates the parts of a partition
 - Metadata store backed by a single Parquet file `assets.parquet`
 - Simple index mapping storing symbol -> file offset (optional, lightweight)
 - Query API that supports filter_by, select_columns, date range, sorting, and sampling
@@ -19,9 +20,12 @@ and more thorough validation.
 """
 from __future__ import annotations
 
+import glob
 import os
-from typing import Iterable, List, Optional, Dict, Any, Tuple
-from datetime import date, datetime
+import re
+from typing import Iterable, List, Optional, Dict, Any, Tuple, Sequence
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
 
 import polars as pl
 
@@ -31,26 +35,55 @@ class StructuredStorage:
 
     Data layout:
       storage_dir/
-        timeseries.parquet   <- a single large table with schema including 'date' and 'symbol'
-        assets.parquet       <- asset metadata table
-        index.json           <- optional mapping symbol -> row-groups or file offsets
+        timeseries/                       <- rows with schema including 'date' and 'symbol'
+          symbol=AAPL/year=2024/
+            part-000001.parquet           <- one part per append, in append order
+            part-000002.parquet
+        assets.parquet                    <- asset metadata table
+
+    Partition values are percent-encoded in directory names, and every part keeps all columns,
+    including 'symbol'.
 
     Contract:
-      - append_timeseries(df: pl.DataFrame) will append new rows (same schema)
-      - query_timeseries(...) returns a pl.DataFrame matching filters
+      - append_timeseries(df: pl.DataFrame) will append new rows (same schema), replacing
+        earlier rows with the same (date, symbol)
+      - compact() merges the parts of each partition, dropping replaced rows
+      - query_timeseries(...) returns a pl.DataFrame matching filters, scan_timeseries(...) a lazy plan
       - store_asset_metadata(assets: pl.DataFrame) stores/updates metadata
       - query_assets(...) filters metadata quickly
     """
 
-    TIMESERIES_FILENAME = "timeseries.parquet"
+    TIMESERIES_FILENAME = "timeseries.parquet"  # single-file table of earlier versions, migrated on open
+    TIMESERIES_DIRNAME = "timeseries"
     ASSETS_FILENAME = "assets.parquet"
-
-    def __init__(self, storage_dir: str):
+    PARTITION_KEYS = {
+        "symbol": pl.col("symbol"),
+        "year": pl.col("date").dt.year(),
+        "month": pl.col("date").dt.month(),
+    }
+    KEY = ["date", "symbol"]
+
+    def __init__(self, storage_dir: str, partition_by: Sequence[str] = ("symbol", "year")):
+        """
+        Args:
+            storage_dir: directory of the tables
+            partition_by: partition keys of the timeseries, among 'symbol', 'year' and 'month'
+                (the latter two of 'date'). Must be the same every time a storage directory is opened.
+        """
+        unknown = set(partition_by) - self.PARTITION_KEYS.keys()
+        if unknown:
+            raise ValueError(f"Unsupported partition keys: {sorted(unknown)}")
         self.storage_dir = storage_dir
         os.makedirs(self.storage_dir, exist_ok=True)
+        self.partition_by = list(partition_by)
         self.timeseries_path = os.path.join(self.storage_dir, self.TIMESERIES_FILENAME)
+        self.timeseries_dir = os.path.join(self.storage_dir, self.TIMESERIES_DIRNAME)
         self.assets_path = os.path.join(self.storage_dir, self.ASSETS_FILENAME)
 
+        if os.path.exists(self.timeseries_path):
+            self._write_parts(pl.read_parquet(self.timeseries_path))
+            os.remove(self.timeseries_path)
+
     # -------------------- Timeseries --------------------
     def _ensure_timeseries_schema(self, df: pl.DataFrame) -> pl.DataFrame:
         # minimal required columns
@@ -65,36 +98,111 @@ class StructuredStorage:
             df = df.with_columns(pl.col("date").str.strptime(pl.Date, "%Y-%m-%d").alias("date"))
         return df
 
+    def _partition_dir(self, values: Tuple) -> str:
+        return os.path.join(self.timeseries_dir, *(
+            f"{name}={quote(str(value), safe='')}" for name, value in zip(self.partition_by, values)
+        ))
+
+    @staticmethod
+    def _parts(directory: str) -> List[str]:
+        """Part files of a partition, in append order."""
+        return sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+
+    def _partitions(self,
+                    symbols: Optional[Iterable[str]] = None,
+                    start: Optional[date] = None,
+                    end: Optional[date] = None) -> Dict[str, List[str]]:
+        """Part files of each partition, optionally only of the partitions that can hold some symbols or dates."""
+        def pattern(symbol: Optional[str] = None) -> str:
+            return os.path.join(self.timeseries_dir, *(
+                f"{name}={quote(symbol, safe='')}" if name == "symbol" and symbol is not None else f"{name}=*"
+                for name in self.partition_by
+            ))
+
+        if symbols is not None and "symbol" in self.partition_by:
+            directories = [directory for symbol in set(symbols) for directory in glob.glob(pattern(str(symbol)))]
+        else:
+            directories = glob.glob(pattern())
+        if start is not None or end is not None:
+            directories = [directory for directory in directories if self._in_range(directory, start, end)]
+        return {directory: self._parts(directory) for directory in sorted(directories)}
+
+    def _in_range(self, directory: str, start: Optional[date], end: Optional[date]) -> bool:
+        """Whether a partition can hold dates between start and end, from its year and month, if partitioned by them."""
+        values = dict(part.split("=", 1) for part in os.path.relpath(directory, self.timeseries_dir).split(os.sep))
+        if "year" not in values:
+            return True
+        year = int(values["year"])
+        if "month" in values:
+            month = int(values["month"])
+            first, last = date(year, month, 1), date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        else:
+            first, last = date(year, 1, 1), date(year, 12, 31)
+        start = start.date() if isinstance(start, datetime) else start
+        end = end.date() if isinstance(end, datetime) else end
+        return (start is None or last >= start) and (end is None or first <= end)
+
+    def _write_part(self, directory: str, df: pl.DataFrame):
+        """Write the next part of a partition. Parts are renamed into place, so readers never see partial files."""
+        os.makedirs(directory, exist_ok=True)
+        parts = self._parts(directory)
+        number = int(re.search(r"part-(\d+)", os.path.basename(parts[-1])).group(1)) + 1 if parts else 1
+        path = os.path.join(directory, f"part-{number:06d}.parquet")
+        df.sort("date").write_parquet(path + ".tmp", compression="snappy", statistics=True)
+        os.replace(path + ".tmp", path)
+
+    def _write_parts(self, df: pl.DataFrame):
+        keys = [f"__{name}" for name in self.partition_by]
+        df = df.with_columns(self.PARTITION_KEYS[name].alias(key) for name, key in zip(self.partition_by, keys))
+        for values, part in df.partition_by(keys, as_dict=True, include_key=False, maintain_order=True).items():
+            self._write_part(self._partition_dir(values), part)
+
     def append_timeseries(self, df: pl.DataFrame, partition_by: Optional[List[str]] = None):
-        """Append timeseries rows to the global timeseries table.
+        """Append timeseries rows to the partitioned timeseries dataset.
 
-        Polars does not support in-place Parquet append across all backends; the
-        approach used here is pragmatic:
-         - if file doesn't exist, write full df
-         - else, read metadata (schema) and write a new parquet file appended via
-           pyarrow dataset write to the same directory (polars can read the union)
+        Rows are split by partition, and each partition they fall into gets a new part file holding only them,
+        so the cost of an append is proportional to the appended rows. Rows replace earlier rows with the same
+        (date, symbol) when read, and for good on `compact`.
 
         Args:
             df: polars.DataFrame with required schema
-            partition_by: optional list of columns to partition data by (e.g., ['symbol'])
+            partition_by: the partition keys of the storage, checked if given
         """
+        if partition_by is not None and list(partition_by) != self.partition_by:
+            raise ValueError(f"Storage is partitioned by {self.partition_by}, not {list(partition_by)}")
         df = self._ensure_timeseries_schema(df)
         # convert date columns to date
         if df.schema.get("date", None) == pl.Datetime:
             df = df.with_columns(pl.col("date").cast(pl.Date))
 
-        if not os.path.exists(self.timeseries_path):
-            # write single-file parquet
-            df.write_parquet(self.timeseries_path, compression="snappy")
-            return
+        self._write_parts(df.unique(subset=self.KEY, keep="last", maintain_order=True))
+
+    def compact(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """Merge the parts of each partition into one, sorted by date, keeping the last row of each (date, symbol).
+
+        Only partitions with more than one part are rewritten. The merged part is written before the parts it
+        replaces are removed, and reads resolve duplicates the same way, so concurrent readers see the same rows.
+
+        Args:
+            symbols: only compact the partitions of these symbols
 
-        # Existing file - append by reading existing and concat (safe but memory heavy)
-        # For larger datasets, a better approach is to write to partitioned files using pyarrow.dataset.write_dataset.
-        existing = pl.read_parquet(self.timeseries_path)
-        combined = pl.concat([existing, df], how="vertical")
-        # optional: drop duplicates by (date, symbol)
-        combined = combined.unique(subset=["date", "symbol"], keep="last")
-        combined.write_parquet(self.timeseries_path, compression="snappy")
+        Returns:
+            The number of partitions compacted.
+        """
+        compacted = 0
+        for directory, parts in self._partitions(symbols).items():
+            if len(parts) < 2:
+                continue
+            merged = self._read_partition(parts)
+            self._write_part(directory, merged)
+            for part in parts:
+                os.remove(part)
+            compacted += 1
+        return compacted
+
+    def _read_partition(self, parts: List[str]) -> pl.DataFrame:
+        df = pl.concat([pl.read_parquet(part) for part in parts], how="vertical_relaxed")
+        return df.unique(subset=self.KEY, keep="last", maintain_order=True) if len(parts) > 1 else df
 
     def query_timeseries(self,
                          symbols: Optional[Iterable[str]] = None,
@@ -113,24 +221,52 @@ class StructuredStorage:
             limit: optionally limit rows
             sort_by: list of tuples (column, 'asc'|'desc')
         """
-        if not os.path.exists(self.timeseries_path):
+        scan = self.scan_timeseries(symbols, start, end)
+        if scan is None:
             return pl.DataFrame()
+        if sort_by:
+            scan = scan.sort([col for col, _ in sort_by], descending=[direction == "desc" for _, direction in sort_by])
+        if columns is not None:
+            scan = scan.select(columns)
+        if limit is not None:
+            scan = scan.head(limit)
+        return scan.collect()
+
+    def scan_timeseries(self,
+                        symbols: Optional[Iterable[str]] = None,
+                        start: Optional[date] = None,
+                        end: Optional[date] = None) -> Optional[pl.LazyFrame]:
+        """Lazily scan the timeseries rows of some symbols and dates, deduplicated as on `compact`.
+
+        Only the partitions that can hold the symbols and dates are scanned, and the symbol and date predicates
+        are pushed into the Parquet scans, so row groups whose statistics fall outside them are not read.
+        Further selections, such as columns, are pushed down too when added to the plan.
 
-        df = pl.read_parquet(self.timeseries_path)
+        Returns:
+            The lazy frame, or None if the storage is empty.
+        """
+        symbols = list(symbols) if symbols is not None else None
+        predicates = []
         if symbols is not None:
-            df = df.filter(pl.col("symbol").is_in(list(symbols)))
+            predicates.append(pl.col("symbol").is_in(symbols))
         if start is not None:
-            df = df.filter(pl.col("date") >= pl.lit(start))
+            predicates.append(pl.col("date") >= pl.lit(start))
         if end is not None:
-            df = df.filter(pl.col("date") <= pl.lit(end))
-        if sort_by:
-            for col, direction in sort_by:
-                df = df.sort(col, reverse=(direction == "desc"))
-        if columns is not None:
-            df = df.select(columns)
-        if limit is not None:
-            df = df.head(limit)
-        return df
+            predicates.append(pl.col("date") <= pl.lit(end))
+
+        def scan(parts: List[str]) -> pl.LazyFrame:
+            lf = pl.scan_parquet(parts)
+            return lf.filter(*predicates) if predicates else lf
+
+        partitions = [parts for parts in self._partitions(symbols, start, end).values() if parts]
+        # partitions of a single part are scanned together, the others each deduplicated on their own
+        single = [parts[0] for parts in partitions if len(parts) == 1]
+        scans = [scan(single)] if single else []
+        scans += [scan(parts).unique(subset=self.KEY, keep="last", maintain_order=True)
+                  for parts in partitions if len(parts) > 1]
+        if not scans:
+            return None
+        return pl.concat(scans, how="vertical_relaxed") if len(scans) > 1 else scans[0]
 
     # -------------------- Assets / Metadata --------------------
     def store_asset_metadata(self, assets: pl.DataFrame):
@@ -163,35 +299,35 @@ class StructuredStorage:
         """
         if not os.path.exists(self.assets_path):
             return pl.DataFrame()
-        df = pl.read_parquet(self.assets_path)
+        # a lazy plan, so that filters and the column selection are pushed into the Parquet scan
+        lf = pl.scan_parquet(self.assets_path)
         if symbols is not None:
-            df = df.filter(pl.col("symbol").is_in(list(symbols)))
+            lf = lf.filter(pl.col("symbol").is_in(list(symbols)))
         if filters:
             for col, op, val in filters:
                 if op == '==':
-                    df = df.filter(pl.col(col) == val)
+                    lf = lf.filter(pl.col(col) == val)
                 elif op == '!=':
-                    df = df.filter(pl.col(col) != val)
+                    lf = lf.filter(pl.col(col) != val)
                 elif op == '>':
-                    df = df.filter(pl.col(col) > val)
+                    lf = lf.filter(pl.col(col) > val)
                 elif op == '<':
-                    df = df.filter(pl.col(col) < val)
+                    lf = lf.filter(pl.col(col) < val)
                 elif op == '>=':
-                    df = df.filter(pl.col(col) >= val)
+                    lf = lf.filter(pl.col(col) >= val)
                 elif op == '<=':
-                    df = df.filter(pl.col(col) <= val)
+                    lf = lf.filter(pl.col(col) <= val)
                 elif op == 'in':
-                    df = df.filter(pl.col(col).is_in(list(val)))
+                    lf = lf.filter(pl.col(col).is_in(list(val)))
                 else:
                     raise ValueError(f"Unsupported op: {op}")
         if sort_by:
-            for col, direction in sort_by:
-                df = df.sort(col, reverse=(direction == 'desc'))
+            lf = lf.sort([col for col, _ in sort_by], descending=[direction == 'desc' for _, direction in sort_by])
         if columns:
-            df = df.select(columns)
+            lf = lf.select(columns)
         if limit:
-            df = df.head(limit)
-        return df
+            lf = lf.head(limit)
+        return lf.collect()
 
 
 # -------------------- Helper utilities --------------------
@@ -1,3 +1,4 @@
+import json
 from abc import ABCMeta
 from datetime import datetime
 
@@ -52,6 +53,26 @@ class Registry:
             except TypeError:
                 return value
 
+    @classmethod
+    def dumps(cls, value) -> bytes:
+        """
+        Serialize a value to bytes: with the binary format of its data model, if it has one, or else as JSON.
+        """
+        registry = _REGISTRY.get(type(value).__qualname__)
+        if registry is not None and hasattr(registry, "to_ipc"):
+            return registry.to_ipc(value)
+        return json.dumps(cls.serialize(value)).encode("utf-8")
+
+    @classmethod
+    def loads(cls, data: bytes, expected_type):
+        """
+        Deserialize bytes written by `dumps` to a value of `expected_type`.
+        """
+        registry = _REGISTRY.get(expected_type.__qualname__)
+        if registry is not None and hasattr(registry, "from_ipc"):
+            return registry.from_ipc(data)
+        return cls.deserialize(json.loads(data), expected_type)
+
     @staticmethod
     def registry():
         return _REGISTRY
@@ -2,6 +2,8 @@ from .bar import Bar
 from .history import History
 from .history_schema import HistorySchema
 from .history_view import HistoryView
+from .shared_history import SharedHistory
+from .mapped_history import MappedHistory
 
 from .history_dto import *
 
@@ -10,5 +12,7 @@ __all__ = [
     'History',
     'HistorySchema',
     'HistoryView',
+    'SharedHistory',
+    'MappedHistory',
 ]
 
@@ -1,5 +1,5 @@
 from functools import reduce
-from typing import Dict, List, Union, Optional, Literal, Callable, Any
+from typing import Dict, List, Union, Optional, Literal, Callable, Any, TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
@@ -9,13 +9,73 @@ from dxlib.types import TypeRegistry
 from dxlib.data.storage import Storable, StoredField, FieldFormat
 
 from .history_schema import HistorySchema
+from .history_buffer import HistoryBuffer, _extended_categories
+from .shared_history import SharedHistory
+from .mapped_history import MappedHistory
+from .level_index import LevelIndex, intersect
 from .dtype_validation import validate_series_dtype
 
+if TYPE_CHECKING:
+    from dxlib.core import InstrumentStore
+
 
 def indices(data: pd.DataFrame) -> List[str]:
     return data.index.names if data.index is not None else []
 
 
+def _align_categories(a: pd.DataFrame, b: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Give the categorical index levels of two frames the same categories where one's extend the other's,
+    so that they concatenate as categoricals instead of falling back to objects.
+    """
+    if isinstance(a.index, pd.MultiIndex) != isinstance(b.index, pd.MultiIndex):
+        return a, b
+    frames = [a, b]
+    if isinstance(a.index, pd.MultiIndex):
+        for i, name in enumerate(a.index.names):
+            if name not in b.index.names:
+                continue
+            j = b.index.names.index(name)
+            dtype = _extended_categories(a.index.levels[i].dtype, b.index.levels[j].dtype)
+            if dtype is None:
+                continue
+            for frame, k in ((0, i), (1, j)):
+                level = frames[frame].index.levels[k]
+                if level.dtype != dtype:
+                    frames[frame] = frames[frame].copy(deep=False)
+                    frames[frame].index = frames[frame].index.set_levels(
+                        level.set_categories(dtype.categories), level=k, verify_integrity=False)
+    elif (dtype := _extended_categories(a.index.dtype, b.index.dtype)) is not None:
+        for frame in (0, 1):
+            if frames[frame].index.dtype != dtype:
+                frames[frame] = frames[frame].copy(deep=False)
+                frames[frame].index = frames[frame].index.set_categories(dtype.categories)
+    return frames[0], frames[1]
+
+
+class _DataField(StoredField):
+    """
+    Stored field for `History.data` that, in columnar mode, keeps the rows in a `HistoryBuffer`
+    and only materializes the `pd.DataFrame` when read.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        buffer = instance.__dict__.get("_buffer")
+        if buffer is not None:
+            return buffer.frame()
+        return instance.__dict__.get("_data")
+
+    def __set__(self, instance, value):
+        if instance.__dict__.get("_columnar", False) and isinstance(value, pd.DataFrame):
+            instance.__dict__["_buffer"] = HistoryBuffer.from_frame(value)
+            instance.__dict__["_data"] = None
+        else:
+            instance.__dict__["_buffer"] = None
+            instance.__dict__["_data"] = value
+
+
 class History(TypeRegistry, Storable):
     """
     A history is a term used to describe a collection of data points.
@@ -27,11 +87,12 @@ class History(TypeRegistry, Storable):
     This is useful for easily storing, retrieving, backtesting and networking data.
     """
     history_schema: HistorySchema = StoredField(FieldFormat.SERIALIZABLE, HistorySchema)
-    data: pd.DataFrame = StoredField(FieldFormat.DATAFRAME, pd.DataFrame)
+    data: pd.DataFrame = _DataField(FieldFormat.DATAFRAME, pd.DataFrame)
 
     def __init__(self,
                  history_schema: Optional[HistorySchema | dict] = None,
-                 data: Optional[pd.DataFrame | dict | list] = None):
+                 data: Optional[pd.DataFrame | dict | list] = None,
+                 columnar: bool = False):
         """
         A history is a collection of dense mutable data points.
 
@@ -44,10 +105,14 @@ class History(TypeRegistry, Storable):
         Args:
             history_schema (HistorySchema): The schema that describes the data.
             data (pd.DataFrame | dict | list): The data for which this history is a container. Can be used elsewhere.
+            columnar (bool): Whether to store the data in an append-optimized `HistoryBuffer`.
+                Appends through `concat`, `concat_data` and `set` then cost O(new rows),
+                and `data` is only materialized into a `pd.DataFrame` when read.
 
         Returns:
             History: A history instance.
         """
+        self._columnar = columnar
         if isinstance(history_schema, HistorySchema):
             self.history_schema = history_schema
         elif isinstance(history_schema, dict):
@@ -169,6 +234,8 @@ class History(TypeRegistry, Storable):
         Returns:
             List[str]: The indices of the history.
         """
+        if self.buffer is not None:
+            return self.buffer.index_names
         return self.data.index.names if self.data is not None else []
 
     @property
@@ -179,8 +246,50 @@ class History(TypeRegistry, Storable):
         Returns:
             List[str]: The columns of the history.
         """
+        if self.buffer is not None:
+            return np.array(self.buffer.column_names, dtype=object)
         return self.data.columns.values if self.data is not None else []
 
+    def level_index(self, name: str) -> Optional[LevelIndex]:
+        """
+        Get the sorted offset index of a level, built on first use and cached until the data changes.
+        A columnar history appended in the level's order extends its level index on append instead.
+
+        Args:
+            name (str): The name of the index level.
+
+        Returns:
+            LevelIndex: The level index, or None if the level values can not be ordered.
+        """
+        buffer = self.buffer
+        if buffer is not None and (level_index := buffer.level_index(buffer.index_names.index(name))) is not None:
+            return level_index
+        index = self.data.index
+        cache = self.__dict__.setdefault("_level_indices", {})
+        cached = cache.get(name)
+        if cached is None or cached[0] is not index:
+            codes = np.asarray(index.codes[self.idx(name)]) if isinstance(index, pd.MultiIndex) else None
+            if codes is not None and not (codes < 0).any():  # missing values are coded -1
+                level_index = LevelIndex.build(index.levels[self.idx(name)], codes)
+            else:
+                level_index = LevelIndex.build(index.get_level_values(name))
+            cached = cache[name] = (index, level_index)
+        return cached[1]
+
+    @property
+    def buffer(self) -> Optional[HistoryBuffer]:
+        """
+        Get the columnar buffer backing the history, if any.
+
+        Returns:
+            HistoryBuffer: The buffer, or None if the history is not columnar.
+        """
+        return self.__dict__.get("_buffer")
+
+    @property
+    def columnar(self) -> bool:
+        return self.buffer is not None
+
     # endregion
 
     # region Manipulation
@@ -201,7 +310,12 @@ class History(TypeRegistry, Storable):
         elif self.history_schema != other.history_schema:
             raise ValueError("The schemas of the histories do not match.")
 
-        self.data = pd.concat([self.data if not self.data.empty else None, other.data])
+        if self.buffer is not None:
+            self.buffer.append(other.data, keep=keep)
+            return self
+
+        data, other_data = _align_categories(self.data, other.data)
+        self.data = pd.concat([data if not data.empty else None, other_data])
         self.data = self.data.loc[~self.data.index.duplicated(keep=keep)]
         return self
 
@@ -211,6 +325,9 @@ class History(TypeRegistry, Storable):
                     keep: Literal["first", "last"] = "first"
                     ) -> "History":
         data = pd.concat([rows], keys=keys)
+        if self.buffer is not None:
+            self.buffer.append(data.to_frame(), keep=keep)
+            return self
         self.data = pd.concat([self.data if not self.data.empty else None, data.to_frame()])
         self.data = self.data.loc[~self.data.index.duplicated(keep=keep)]
         return self
@@ -231,7 +348,7 @@ class History(TypeRegistry, Storable):
         self.history_schema.columns.update(other.history_schema.columns)
 
         self.data = pd.concat([self.data, other.data], axis=0)
-        self.data = self.data.groupby(level=self.data.index.names).first()
+        self.data = self.data.groupby(level=self.data.index.names, observed=True).first()
         # self.data.T.groupby(self.data.columns).first().T
         return self
 
@@ -287,19 +404,44 @@ class History(TypeRegistry, Storable):
         index = index or {}
         columns = columns or self.columns
 
-        index_filters = [self.data.index.get_level_values(idx).isin(values) for idx, values in index.items() if
-                         isinstance(values, list)]
-        index_slices = [index.get(level, slice(None)) for level in index.keys() if isinstance(index[level], slice)]
+        rows = None
+        unordered = {}
+        for level, values in index.items():
+            if not isinstance(values, (list, slice)):
+                continue
+            try:
+                level_index = self.level_index(level)
+                if level_index is None:
+                    raise TypeError(f"Level {level} can not be ordered.")
+                level_rows = level_index.rows(values) if isinstance(values, list) \
+                    else level_index.range(values.start, values.stop)
+            except TypeError:
+                unordered[level] = values
+                continue
+            rows = level_rows if rows is None else intersect(rows, level_rows)
 
-        data = self.data
+        if rows is None:
+            data = self.data
+        elif self.buffer is not None:
+            # only the selected rows are materialized, not the whole history
+            data = self.buffer.take(rows)
+        else:
+            data = self.data.iloc[rows]
 
-        if index_filters:
-            masks = reduce(lambda x, y: x & y, index_filters)
-            data = data[masks]
+        for level, values in unordered.items():
+            level_values = data.index.get_level_values(level)
+            if isinstance(values, list):
+                data = data[level_values.isin(values)]
+            else:
+                mask = np.ones(len(data), dtype=bool)
+                if values.start is not None:
+                    mask &= level_values >= values.start
+                if values.stop is not None:
+                    mask &= level_values <= values.stop
+                data = data[mask]
 
-        if index_slices:
-            idx = pd.IndexSlice
-            data = data.sort_index().loc[idx[tuple(index_slices), columns]]
+        if any(isinstance(values, slice) for values in index.values()) and not data.index.is_monotonic_increasing:
+            data = data.sort_index()
 
         schema = HistorySchema(
             self.history_schema.index.copy(),
@@ -325,9 +467,13 @@ class History(TypeRegistry, Storable):
         elif not isinstance(values, pd.DataFrame):
             raise ValueError("Values must be a dictionary or a DataFrame.")
 
+        if self.buffer is not None:
+            self.buffer.update(values)
+            return
+
         # update and then concat only new values, to not create repeated rows nor ignore existing column values
         self.data.update(values)
-        self.data = pd.concat([self.data, values], sort=False).groupby(level=self.data.index.names).first()
+        self.data = pd.concat([self.data, values], sort=False).groupby(level=self.data.index.names, observed=True).first()
 
     def on(self,
            other: "History",
@@ -381,7 +527,7 @@ class History(TypeRegistry, Storable):
         if len(idx) == 0:
             return f(data, *args, **kwargs)
         else:
-            return data.groupby(level=idx, group_keys=False).apply(f, *args, **kwargs)
+            return data.groupby(level=idx, group_keys=False, observed=True).apply(f, *args, **kwargs)
 
     @staticmethod
     def list_reduce(data, item):
@@ -418,6 +564,47 @@ class History(TypeRegistry, Storable):
     def op(self, func, *args, **kwargs) -> pd.DataFrame:
         return func(self.data, *args, **kwargs)
 
+    def categorize(self, name: str = "instrument", store: Optional["InstrumentStore"] = None) -> "History":
+        """
+        Store an index level, by default the instruments, as a categorical of integer ids from an `InstrumentStore`.
+
+        The level values are then hashed, compared and grouped as integers by `get`, `isin`, `groupby`, joins
+        and `duplicated`, and only mapped back to `Instrument` objects when read.
+        Categorized histories of the same store concatenate without decoding, even if the store grew in between,
+        as its ids only ever extend its categories.
+
+        Args:
+            name (str): The name of the index level.
+            store (InstrumentStore): The store assigning the ids, to which missing instruments are added.
+                Defaults to a new store.
+
+        Returns:
+            History: A history with the same data, and the level as a categorical.
+        """
+        from dxlib.core import InstrumentStore
+        store = store if store is not None else InstrumentStore()
+        index = self.data.index
+        if isinstance(index, pd.MultiIndex):
+            # only the unique level values are looked up, the row codes are remapped to ids
+            level = self.idx(name)
+            ids = store.ids(index.levels[level])
+            codes = np.asarray(index.codes[level])
+            categories = store.categories
+            index = pd.MultiIndex(
+                levels=[pd.CategoricalIndex(categories, categories=categories) if i == level else values
+                        for i, values in enumerate(index.levels)],
+                codes=[np.where(codes < 0, -1, ids[codes]) if i == level else level_codes
+                       for i, level_codes in enumerate(index.codes)],
+                names=index.names,
+                verify_integrity=False,
+            )
+        else:
+            index = pd.CategoricalIndex(store.categorical(index), name=index.name)
+
+        data = self.data.copy(deep=False)
+        data.index = index
+        return History(self.history_schema, data, columnar=self.columnar)
+
     def dropna(self):
         return History(self.history_schema, self.data.dropna())
 
@@ -429,13 +616,85 @@ class History(TypeRegistry, Storable):
     # region Properties
 
     def copy(self):
-        return History(history_schema=self.history_schema, data=self.data.copy())
+        return History(history_schema=self.history_schema, data=self.data.copy(), columnar=self.columnar)
+
+    # endregion
+
+    # region Shared Memory
+
+    def to_shared(self) -> SharedHistory:
+        """
+        Copy the history into a shared memory block, that other processes on this host can `attach` to by name.
+
+        Example:
+            >>> with history.to_shared() as shared:
+            ...     pool.map(work, [shared.name] * n)  # each worker calls History.attach(name)
+
+        Returns:
+            SharedHistory: The handle of the block, that frees it on `release`.
+        """
+        return SharedHistory(self.history_schema, self.data)
+
+    @classmethod
+    def attach(cls, name: str) -> "History":
+        """
+        Map a history placed in shared memory by `to_shared`.
+
+        Numeric columns and the index are read-only views of the shared block, so attaching does not copy them,
+        however large the history. The block stays mapped for as long as the data is in use.
+
+        Args:
+            name (str): The name of the block, `SharedHistory.name`.
+
+        Returns:
+            History: The shared history.
+        """
+        return History(*SharedHistory.load(name))
+
+    # endregion
+
+    # region Files
+
+    def to_file(self, path: str):
+        """
+        Write the history to a file, that `open` can map without reading it into memory.
+
+        Args:
+            path (str): The file, replaced if it exists.
+        """
+        MappedHistory.write(path, self.history_schema, self.data)
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True, columns: List[str] = None) -> "History":
+        """
+        Open a history written by `to_file`.
+
+        With `mmap`, numeric columns and the index are read-only views of the mapped file,
+        and only the parts that are used are read from disk, so histories larger than memory can be worked with.
+        Object columns are always read into memory. Use `copy` for a writable history.
+
+        Example:
+            >>> history = History.open("prices.dxh", columns=["close"])
+            >>> history.get({"instrument": [Instrument("AAPL")], "date": slice("2021-01-01", "2021-12-31")})
+            # Reads the close prices of AAPL in 2021, and the index, from disk.
+
+        Args:
+            path (str): The file.
+            mmap (bool): Whether to map the file, or read all of it into memory.
+            columns (List[str]): The columns to open. Defaults to all.
+
+        Returns:
+            History: The history.
+        """
+        return History(*MappedHistory.load(path, mmap, columns))
 
     # endregion
 
     # region Inbuilt Properties
 
     def __len__(self):
+        if self.buffer is not None:
+            return len(self.buffer)
         return len(self.data)
 
     def __contains__(self, key):
@@ -445,7 +704,12 @@ class History(TypeRegistry, Storable):
         return self.data[key]
 
     def __setitem__(self, key, value):
-        self.data[key] = value
+        if self.buffer is not None:
+            data = self.data.copy()
+            data[key] = value
+            self.data = data
+        else:
+            self.data[key] = value
         self.history_schema.columns[key] = type(value)
 
     def __str__(self):
@@ -0,0 +1,469 @@
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from .level_index import LevelIndex, _starts
+
+
+def _missing_dtype(dtype: np.dtype) -> np.dtype:
+    """Smallest dtype able to hold both `dtype` values and a missing marker."""
+    if dtype.kind in "iu":
+        return np.dtype(np.float64)
+    if dtype.kind == "b":
+        return np.dtype(object)
+    return dtype
+
+
+def _common_dtype(a: np.dtype, b: np.dtype) -> np.dtype:
+    if a == b:
+        return a
+    if a.kind in "iufc" and b.kind in "iufc":
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+
+def _as_numpy(values) -> np.ndarray:
+    array = np.asarray(values)
+    if array.dtype.kind in "USV":
+        return array.astype(object)
+    return array
+
+
+def _code_dtype(n: int) -> np.dtype:
+    """The dtype pandas gives the codes of a level of `n` values, so that codes of this dtype are used uncopied."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _extended_categories(a, b) -> Optional[pd.CategoricalDtype]:
+    """Whichever of two categorical dtypes has the categories of the other and more after them, if any."""
+    if not isinstance(a, pd.CategoricalDtype) or not isinstance(b, pd.CategoricalDtype) or a.ordered != b.ordered:
+        return None
+    short, long = sorted((a, b), key=lambda dtype: len(dtype.categories))
+    return long if long.categories[:len(short.categories)].equals(short.categories) else None
+
+
+def _grow(array: np.ndarray, size: int, used: int) -> np.ndarray:
+    """`array` if it holds `size` items, else a copy of its first `used` items with at least twice the capacity."""
+    if size <= len(array):
+        return array
+    grown = np.empty(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:used] = array[:used]
+    return grown
+
+
+class _Level:
+    """
+    One index level of a `HistoryBuffer`: its unique values in order of first appearance, and the code of each row.
+
+    The codes are kept in the dtype pandas would give them, so `pd.MultiIndex` is built over views of them.
+
+    While the rows are appended in order of this level, as times are in a backtest, each value holds a single run
+    of rows, and the row each run starts at is kept, so that the `LevelIndex` of the level is extended on append
+    instead of rebuilt. Once rows are appended out of order, the level no longer keeps them.
+    """
+
+    def __init__(self, capacity: int, values: bool):
+        """
+        Args:
+            capacity (int): The rows the level holds before it grows.
+            values (bool): Whether to also keep the value of each row, for an index of a single level.
+        """
+        self.dtype = None
+        self.lookup: Dict[object, int] = {}
+        self.uniques: np.ndarray = np.empty(0, dtype=object)
+        self.n_uniques = 0
+        self.codes: np.ndarray = np.empty(capacity, dtype=np.int8)
+        self.values: Optional[np.ndarray] = np.empty(capacity, dtype=object) if values else None
+        self._index: Optional[pd.Index] = None
+        # the row each value's run starts at, followed by the row count, while the rows are in order
+        self.offsets: Optional[np.ndarray] = np.zeros(1, dtype=np.intp)
+        self._level_index: Optional[LevelIndex] = None
+        self._shared = False
+
+    def reserve(self, capacity: int, size: int):
+        self.codes = _grow(self.codes, capacity, size)
+        if self.values is not None:
+            self.values = _grow(self.values, capacity, size)
+
+    def _store(self, values: pd.Index) -> np.ndarray:
+        if self.uniques.dtype == object:
+            return np.asarray(values.astype(object))
+        return values.to_numpy()
+
+    def _adopt(self, dtype, size: int):
+        """Store values of `dtype` from now on, as objects if the stored values are of another dtype."""
+        if self.dtype is None:
+            numeric = isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+            self.dtype = dtype
+            self.uniques = np.empty(len(self.uniques), dtype=dtype if numeric else object)
+            if self.values is not None:
+                self.values = np.empty(len(self.values), dtype=self.uniques.dtype)
+        elif dtype != self.dtype and (extended := _extended_categories(self.dtype, dtype)) is not None:
+            # categories of a store that grew: the stored values are objects, and read with the larger dtype
+            self.dtype = extended
+            self._index = None
+        elif dtype != self.dtype:
+            if self.uniques.dtype != object:
+                self.uniques = np.asarray(self.index().astype(object))
+                if self.values is not None:
+                    values = np.empty(len(self.values), dtype=object)
+                    values[:size] = np.asarray(self._as_index(self.values[:size]).astype(object))
+                    self.values = values
+            self.dtype = np.dtype(object)
+            self._index = None
+            self.offsets = None
+
+    def append(self, values: pd.Index, start: int):
+        """
+        Encode the `values` of the rows starting at position `start`.
+        """
+        self._adopt(values.dtype, start)
+        previous = self.n_uniques
+        codes, uniques = pd.factorize(values)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        added = []
+        for i, value in enumerate(uniques):
+            code = self.lookup.get(value)
+            if code is None:
+                code = self.lookup[value] = self.n_uniques + len(added)
+                added.append(i)
+            mapping[i] = code
+
+        if added:
+            n_uniques = self.n_uniques + len(added)
+            self.uniques = _grow(self.uniques, n_uniques, self.n_uniques)
+            self.uniques[self.n_uniques:n_uniques] = self._store(uniques[added])
+            self.n_uniques = n_uniques
+            self._index = None
+            dtype = _code_dtype(n_uniques)
+            if self.codes.dtype != dtype:
+                self.codes = self.codes.astype(dtype)
+
+        stop = start + len(values)
+        present = codes >= 0  # missing values are coded -1, as in pandas
+        codes[present] = mapping[codes[present]]
+        self.codes[start:stop] = codes
+        if self.values is not None:
+            self.values[start:stop] = self._store(values)
+        self._extend_runs(codes, start, previous)
+
+    def _extend_runs(self, codes: np.ndarray, start: int, previous: int):
+        """
+        Extend the runs with the `codes` of the rows starting at `start`, given the unique values held `previous`ly.
+        """
+        if self.offsets is None:
+            return
+        last = previous - 1
+        uniques = self.uniques[max(last, 0):self.n_uniques]
+        if (self.uniques.dtype == object or codes[0] < max(last, 0) or np.any(codes[1:] < codes[:-1])
+                or np.any(uniques[1:] <= uniques[:-1])):
+            # out of order: the level index is rebuilt from the codes when needed
+            self.offsets = None
+            return
+
+        if self._shared and codes[0] == last:
+            # the last run grows, and level indices handed out hold a view of where it ends
+            self.offsets = self.offsets.copy()
+        offsets = self.offsets
+        self.offsets = _grow(offsets, self.n_uniques + 1, previous + 1)
+        self._shared = self._shared and self.offsets is offsets and codes[0] != last
+        self._level_index = None
+        starts = _starts(codes)
+        starts = starts[codes[starts] > last]
+        self.offsets[codes[starts]] = start + starts
+        self.offsets[self.n_uniques] = start + len(codes)
+
+    def level_index(self) -> Optional[LevelIndex]:
+        """The level index of the rows, or None if they were appended out of order."""
+        if self.offsets is None or self.n_uniques == 0:
+            return None
+        if self._level_index is None:
+            self._level_index = LevelIndex.from_runs(self.index(), self.offsets[:self.n_uniques + 1])
+            self._shared = True
+        return self._level_index
+
+    def index(self) -> pd.Index:
+        """The unique values, in order of first appearance."""
+        if self._index is None:
+            self._index = self._as_index(self.uniques[:self.n_uniques])
+        return self._index
+
+    def _as_index(self, array: np.ndarray) -> pd.Index:
+        if array.dtype == object:
+            return pd.Index(array, dtype=self.dtype, copy=False)
+        return pd.Index(array, copy=False)
+
+    def rows(self, size: int, rows: slice | np.ndarray, name: str) -> pd.Index:
+        """The value of each of the `rows` among the first `size`, for an index of a single level."""
+        return self._as_index(self.values[:size][rows]).rename(name)
+
+
+class HistoryBuffer:
+    """
+    Append-optimized columnar storage backing a `History`.
+
+    Columns are kept in preallocated NumPy arrays that double in capacity when full,
+    and each index level as the integer code of each row, in arrays that grow the same way.
+    A dict of index keys to row positions replaces `index.duplicated`, so appending `k` rows costs O(k) amortized,
+    regardless of how many rows are already stored.
+
+    The pandas view is built lazily by `frame()` and cached until the next write. It is built over views of the
+    arrays rather than copies, so reading the frame after each append costs O(columns), not O(rows).
+    Appends only write past the rows of earlier frames, and a column is copied before rows a frame holds
+    are overwritten in place.
+    """
+
+    def __init__(self, index_names: List[str], column_names: List[str], capacity: int = 64):
+        self.index_names: List[str] = list(index_names)
+        self.column_names: List[str] = list(column_names)
+        self._capacity = max(int(capacity), 1)
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {}
+        self._levels: List[_Level] = self._new_levels()
+        self._rows: Dict[object, int] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        # columns whose arrays are viewed by a frame handed out
+        self._shared: set = set()
+
+    def _new_levels(self) -> List[_Level]:
+        return [_Level(self._capacity, values=len(self.index_names) == 1) for _ in self.index_names]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "HistoryBuffer":
+        """
+        Build a buffer holding exactly the rows of `frame`, repeated index entries included.
+        """
+        buffer = cls(list(frame.index.names), list(frame.columns), capacity=max(len(frame), 64))
+        if not frame.empty:
+            buffer._write(frame, np.arange(len(frame)), np.ones(len(frame), dtype=bool), skipna=False)
+            for row, key in enumerate(frame.index):
+                buffer._rows.setdefault(key, row)
+        buffer._frame = frame
+        return buffer
+
+    # region Properties
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    # endregion
+
+    # region Writes
+
+    def _align(self, frame: pd.DataFrame) -> pd.DataFrame:
+        names = list(frame.index.names)
+        if self._size == 0:
+            self.index_names = names
+            self.column_names = list(frame.columns)
+            self._columns = {}
+            self._levels = self._new_levels()
+            self._shared = set()
+            return frame
+        if names == self.index_names:
+            return frame
+        if set(names) == set(self.index_names) and isinstance(frame.index, pd.MultiIndex):
+            return frame.reorder_levels(self.index_names)
+        raise ValueError(f"The index names {names} do not match the buffer index names {self.index_names}.")
+
+    def _reserve(self, size: int):
+        if size <= self._capacity:
+            return
+        capacity = max(size, 2 * self._capacity)
+        for name, array in self._columns.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._columns[name] = grown
+        for level in self._levels:
+            level.reserve(capacity, self._size)
+        self._capacity = capacity
+        self._shared = set()
+
+    def _cast(self, name: str, dtype: np.dtype):
+        array = self._columns[name]
+        if array.dtype != dtype:
+            self._columns[name] = array.astype(dtype)
+            self._shared.discard(name)
+
+    def _unshare(self, name: str):
+        """Copy a column viewed by a frame handed out, before its stored rows are overwritten."""
+        if name in self._shared:
+            self._columns[name] = self._columns[name].copy()
+            self._shared.discard(name)
+
+    def _column(self, name: str, dtype: np.dtype) -> np.ndarray:
+        if name not in self._columns:
+            if self._size > 0:
+                dtype = _missing_dtype(dtype)
+            array = np.empty(self._capacity, dtype=dtype)
+            if self._size > 0:
+                array[:self._size] = np.nan
+            self._columns[name] = array
+            if name not in self.column_names:
+                self.column_names.append(name)
+        else:
+            self._cast(name, _common_dtype(self._columns[name].dtype, dtype))
+        return self._columns[name]
+
+    def _write(self, frame: pd.DataFrame, target: np.ndarray, new: np.ndarray, skipna: bool):
+        """
+        Write `frame` rows at the `target` positions. Rows flagged by `new` must be sequential from `size`.
+        Rows with `target < 0` are skipped.
+        """
+        valid = target >= 0
+        n_new = int(np.count_nonzero(new))
+        size = self._size + n_new
+        self._reserve(size)
+        overwrite = bool(np.any(valid & ~new))
+
+        for name in frame.columns:
+            values = _as_numpy(frame[name].to_numpy())
+            array = self._column(name, values.dtype)
+            if overwrite:
+                self._unshare(name)
+                array = self._columns[name]
+            if skipna:
+                mask = valid & ~pd.isna(values)
+                array[target[mask]] = values[mask]
+            else:
+                array[target[valid]] = values[valid]
+
+        if n_new:
+            positions = target[new]
+            for name in self.column_names:
+                if name in frame.columns:
+                    continue
+                if name not in self._columns:
+                    self._columns[name] = np.empty(self._capacity, dtype=object)
+                    self._columns[name][:self._size] = np.nan
+                self._cast(name, _missing_dtype(self._columns[name].dtype))
+                self._columns[name][positions] = np.nan
+
+            index = frame.index[new][np.argsort(positions, kind="stable")]
+            for i, level in enumerate(self._levels):
+                level.append(index.get_level_values(i) if isinstance(index, pd.MultiIndex) else index, self._size)
+
+        self._size = size
+        self._frame = None
+
+    def append(self, frame: pd.DataFrame, keep: Literal["first", "last"] = "first") -> "HistoryBuffer":
+        """
+        Append the rows of `frame`, resolving repeated index entries with the `keep` strategy.
+
+        Args:
+            frame (pd.DataFrame): The rows to append.
+            keep (Literal["first", "last"]): Whether already stored rows or incoming rows win on repeated index entries.
+
+        Returns:
+            HistoryBuffer: This buffer.
+        """
+        if frame is None or frame.empty:
+            return self
+        frame = self._align(frame)
+        target, new = self._targets(frame, keep)
+        self._write(frame, target, new, skipna=False)
+        return self
+
+    def update(self, frame: pd.DataFrame) -> "HistoryBuffer":
+        """
+        Overwrite stored rows with the non-missing values of `frame`, and append rows not yet stored.
+        """
+        if frame is None or frame.empty:
+            return self
+        frame = self._align(frame)
+        target, new = self._targets(frame, "last")
+        self._write(frame, target, new, skipna=True)
+        return self
+
+    def _targets(self, frame: pd.DataFrame, keep: Literal["first", "last"]):
+        rows = self._rows
+        target = np.empty(len(frame), dtype=np.intp)
+        new = np.zeros(len(frame), dtype=bool)
+        position = self._size
+        seen: Dict[object, int] = {}
+
+        for i, key in enumerate(frame.index):
+            row = rows.get(key)
+            if row is None:
+                rows[key] = row = position
+                position += 1
+                new[i] = True
+            elif keep == "first":
+                row = -1
+            elif (previous := seen.get(key)) is not None:
+                # repeated within the incoming frame: the latest row wins, but keeps the position of the first
+                new[i], new[previous] = new[previous], False
+                target[previous] = -1
+            seen[key] = i
+            target[i] = row
+        return target, new
+
+    # endregion
+
+    # region Reads
+
+    def level(self, i: int) -> pd.Index:
+        return self.index().get_level_values(i)
+
+    def index(self, rows: slice | np.ndarray = slice(None)) -> pd.Index:
+        """
+        Build the index of the stored rows, or of the `rows` positions among them, over views of the level codes.
+        """
+        if len(self.index_names) > 1:
+            return pd.MultiIndex(levels=[level.index() for level in self._levels],
+                                 codes=[level.codes[:self._size][rows] for level in self._levels],
+                                 names=self.index_names, verify_integrity=False)
+        return self._levels[0].rows(self._size, rows, self.index_names[0])
+
+    def level_index(self, i: int) -> Optional[LevelIndex]:
+        """
+        Get the `LevelIndex` of level `i`, extended as rows are appended in its order.
+
+        Returns:
+            LevelIndex: The level index, or None if rows were appended out of order, and it must be rebuilt.
+        """
+        return self._levels[i].level_index()
+
+    def take(self, rows: slice | np.ndarray) -> pd.DataFrame:
+        """
+        Materialize only the `rows` positions, as `frame().iloc[rows]` without building the whole frame.
+        """
+        columns = self.column_names
+        return pd.DataFrame({name: self._columns[name][:self._size][rows].copy() for name in columns},
+                            index=self.index(rows), columns=columns)
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Materialize the stored rows as a `pd.DataFrame`. The result is cached until the next write.
+        """
+        if self._frame is not None:
+            return self._frame
+        if self._size == 0:
+            index = pd.MultiIndex.from_tuples([], names=self.index_names)
+            self._frame = pd.DataFrame(index=index, columns=self.column_names)
+            return self._frame
+
+        self._frame = pd.DataFrame(
+            {name: self._columns[name][:self._size] for name in self.column_names},
+            index=self.index(),
+            columns=self.column_names,
+            copy=False,
+        )
+        self._shared = set(self.column_names)
+        return self._frame
+
+    # endregion
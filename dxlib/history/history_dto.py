@@ -1,6 +1,9 @@
+import json
 from typing import Dict, Type, Optional, ClassVar
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from pydantic import Field, BaseModel
 
 from dxlib.history import History, HistorySchema
@@ -72,3 +75,129 @@ class HistoryDto(BaseModel, Serializable[History]):
             data=cls.serialize(domain_obj.data),
             history_schema=cls.serialize(domain_obj.history_schema),
         )
+
+    # region Arrow
+
+    SCHEMA_KEY: ClassVar[bytes] = b"dxlib.history_schema"
+    INDEX_KEY: ClassVar[bytes] = b"dxlib.index"
+    ENCODING_KEY: ClassVar[bytes] = b"dxlib.encoding"
+
+    @staticmethod
+    def _native(dtype) -> bool:
+        return isinstance(dtype, pd.DatetimeTZDtype) or isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+    @classmethod
+    def _to_arrow(cls, values: pd.Index, factorized: tuple = None) -> tuple[pa.Array, Optional[str]]:
+        # numbers and datetimes are passed as their buffers, anything else dictionary-encoded
+        if cls._native(values.dtype):
+            return pa.Array.from_pandas(values), None
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, categories, encoding = values.codes, values.categories, "categorical"
+        else:
+            # the levels and codes of a MultiIndex spare factorizing its values again
+            codes, categories = factorized or pd.factorize(values)
+            encoding = "codes"
+        if all(isinstance(value, str) for value in categories):
+            dictionary = pa.array(list(categories), type=pa.string())
+        else:
+            dictionary = pa.array([json.dumps(cls.serialize(value)) for value in categories], type=pa.string())
+            encoding += ".json"
+        codes = np.asarray(codes, dtype=np.int32)
+        return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), dictionary), encoding
+
+    @classmethod
+    def _categories(cls, array: pa.DictionaryArray, encoding: str, expected_type: type) -> tuple[np.ndarray, pd.Index]:
+        categories = array.dictionary.to_pylist()
+        if encoding.endswith(".json"):
+            categories = [cls.deserialize(json.loads(value), expected_type) for value in categories]
+        return array.indices.fill_null(-1).to_numpy(zero_copy_only=False), pd.Index(categories, dtype=object)
+
+    @classmethod
+    def _from_arrow(cls, array: pa.Array, encoding: Optional[str], expected_type: type) -> pd.Index:
+        if encoding is None:
+            if pa.types.is_timestamp(array.type) or array.null_count:
+                return pd.Index(array.to_pandas())
+            return pd.Index(array.to_numpy(zero_copy_only=False), copy=False)
+
+        codes, categories = cls._categories(array, encoding, expected_type)
+        values = pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories))
+        if encoding.startswith("categorical"):
+            return pd.CategoricalIndex(values)
+        return pd.Index(np.asarray(values, dtype=object), dtype=object)
+
+    @classmethod
+    def to_ipc(cls, history: History) -> bytes:
+        """
+        Serialize a history to an Arrow IPC stream.
+
+        The schema is carried in the stream's metadata. Numeric and datetime columns and index levels are written
+        as their raw buffers, and only object ones, such as instruments, are dictionary-encoded.
+        """
+        from dxlib.core.instruments import instrument_dto  # noqa: F401, registers Instrument with the Registry
+
+        data, schema = history.data, history.history_schema
+        index_names = list(data.index.names)
+        fields, arrays = [], []
+        for i, (name, values) in enumerate([(name, data.index.get_level_values(i)) for i, name in enumerate(index_names)]
+                                           + [(name, pd.Index(data[name])) for name in data.columns]):
+            factorized = None
+            if isinstance(data.index, pd.MultiIndex) and i < len(index_names):
+                factorized = data.index.codes[i], data.index.levels[i]
+            array, encoding = cls._to_arrow(values, factorized)
+            metadata = {cls.ENCODING_KEY: encoding.encode()} if encoding else None
+            fields.append(pa.field(str(name), array.type, metadata=metadata))
+            arrays.append(array)
+
+        table = pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata={
+            cls.SCHEMA_KEY: HistorySchemaDto.from_domain(schema).model_dump_json().encode(),
+            cls.INDEX_KEY: json.dumps(index_names).encode(),
+        }))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @classmethod
+    def from_ipc(cls, data: bytes | memoryview | pa.Buffer) -> History:
+        """
+        Deserialize a history from an Arrow IPC stream written by `to_ipc`.
+
+        Numeric columns without nulls are read without copying, as read-only views of `data`.
+        """
+        from dxlib.core.instruments import instrument_dto  # noqa: F401, registers Instrument with the Registry
+
+        table = pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+        metadata = table.schema.metadata
+        schema = HistorySchemaDto.model_validate_json(metadata[cls.SCHEMA_KEY]).to_domain()
+        index_names = json.loads(metadata[cls.INDEX_KEY])
+        types = {**schema.index, **schema.columns}
+
+        def field(i: int) -> tuple[pa.Array, Optional[str], type]:
+            column = table.column(i)
+            encoding = (table.schema.field(i).metadata or {}).get(cls.ENCODING_KEY)
+            return (column.combine_chunks() if column.num_chunks != 1 else column.chunk(0),
+                    encoding.decode() if encoding else None,
+                    types.get(table.column_names[i]))
+
+        def read(i: int) -> pd.Index:
+            return cls._from_arrow(*field(i))
+
+        if len(index_names) > 1:
+            levels, codes = [], []
+            for i in range(len(index_names)):
+                array, encoding, expected_type = field(i)
+                if encoding is not None and encoding.startswith("codes"):
+                    # dictionary-encoded levels already are the codes and levels of the MultiIndex
+                    level_codes, level = cls._categories(array, encoding, expected_type)
+                else:
+                    level_codes, level = pd.factorize(cls._from_arrow(array, encoding, expected_type), sort=True)
+                codes.append(level_codes)
+                levels.append(level)
+            index = pd.MultiIndex(levels=levels, codes=codes, names=index_names, verify_integrity=False)
+        else:
+            index = read(0).rename(index_names[0])
+        columns = {name: read(i).array for i, name in enumerate(table.column_names) if i >= len(index_names)}
+        return History(schema, pd.DataFrame(columns, index=index, copy=False))
+
+    # endregion
@@ -0,0 +1,166 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class LevelIndex:
+    """
+    Sorted offset index over a single level of a `History` index.
+
+    The level values are sorted once (a stable argsort, skipped when the level is already sorted),
+    and each unique value is mapped to the range of rows it occupies in that order.
+    Lookups by value or by range are then `searchsorted` calls, instead of boolean masks over the whole index.
+
+    When the level is already sorted, as for a history appended in time order, lookups return plain row ranges,
+    which `pd.DataFrame.iloc` slices without copying.
+
+    Levels of a `pd.MultiIndex` are built from its integer codes, so that values such as instruments are only
+    compared once per unique value rather than once per row.
+    """
+
+    def __init__(self, values: pd.Index, codes: Optional[np.ndarray] = None):
+        """
+        Args:
+            values (pd.Index): The level value of each row, or with `codes`, the unique level values.
+            codes (np.ndarray): The position in `values` of each row's value, as in `pd.MultiIndex.codes`.
+                Only the unique values are then sorted and compared, and the rows are ordered by integer ranks.
+        """
+        if codes is None:
+            self.size = len(values)
+            self.order: Optional[np.ndarray] = None
+            if not values.is_monotonic_increasing:
+                self.order = np.argsort(values.to_numpy(), kind="stable")
+                values = values.take(self.order)
+            starts = _starts(values.to_numpy())
+            self.keys: pd.Index = values[starts]
+            self.offsets: np.ndarray = np.append(starts, len(values))
+            return
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # order categories by value, not by their codes
+            values = pd.Index(values.to_numpy(), dtype=object)
+        order = np.argsort(values.to_numpy(), kind="stable")
+        uniques = values.take(order)
+        change = np.zeros(len(uniques), dtype=bool)
+        change[_starts(uniques.to_numpy())] = True
+        rank = np.empty(len(values), dtype=codes.dtype)
+        rank[order] = np.cumsum(change) - 1
+
+        ranks = rank[codes]
+        self.size = len(ranks)
+        self.order = None
+        if np.any(ranks[1:] < ranks[:-1]):
+            self.order = np.argsort(ranks, kind="stable")
+            ranks = ranks[self.order]
+        starts = _starts(ranks)
+        # levels can hold values that no row uses anymore, only keep those that are present
+        self.keys = uniques[change].take(ranks[starts])
+        self.offsets = np.append(starts, len(ranks))
+
+    @classmethod
+    def build(cls, values: pd.Index, codes: Optional[np.ndarray] = None) -> Optional["LevelIndex"]:
+        """
+        Build the index, or return None if the level values can not be ordered.
+        """
+        try:
+            return cls(values, codes)
+        except TypeError:
+            return None
+
+    @classmethod
+    def from_runs(cls, keys: pd.Index, offsets: np.ndarray) -> "LevelIndex":
+        """
+        Build the index of an already sorted level, without sorting it again.
+
+        Args:
+            keys (pd.Index): The unique level values, sorted.
+            offsets (np.ndarray): The row each value's run starts at, followed by the number of rows.
+        """
+        level_index = cls.__new__(cls)
+        level_index.size = int(offsets[-1])
+        level_index.order = None
+        level_index.keys = keys
+        level_index.offsets = offsets
+        return level_index
+
+    @property
+    def sorted(self) -> bool:
+        return self.order is None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _positions(self, start: int, stop: int) -> slice | np.ndarray:
+        if self.order is None:
+            return slice(start, stop)
+        return np.sort(self.order[start:stop])
+
+    def locate(self, value) -> slice:
+        """
+        Get the range of sorted positions holding `value`. Empty if `value` is not in the level.
+        """
+        i = self.keys.searchsorted(value, side="left")
+        if i < len(self.keys) and self.keys[i] == value:
+            return slice(self.offsets[i], self.offsets[i + 1])
+        return slice(0, 0)
+
+    def rows(self, values: List) -> slice | np.ndarray:
+        """
+        Get the rows whose level value is in `values`, in their original order.
+
+        Args:
+            values (List): The desired level values.
+
+        Returns:
+            slice | np.ndarray: A row range if possible, else an array of row positions.
+        """
+        ranges = [self.locate(value) for value in values]
+        ranges = [r for r in ranges if r.stop > r.start]
+        if not ranges:
+            return slice(0, 0)
+        if len(ranges) == 1:
+            return self._positions(ranges[0].start, ranges[0].stop)
+
+        positions = np.concatenate([np.arange(r.start, r.stop) for r in ranges])
+        positions = self.order[positions] if self.order is not None else positions
+        return np.unique(positions)
+
+    def range(self, start=None, stop=None) -> slice | np.ndarray:
+        """
+        Get the rows whose level value lies between `start` and `stop`, both inclusive, as with `pd.DataFrame.loc`.
+
+        Args:
+            start: The lower bound, or None for unbounded.
+            stop: The upper bound, or None for unbounded.
+
+        Returns:
+            slice | np.ndarray: A row range if possible, else an array of row positions.
+        """
+        lo = 0 if start is None else self.keys.searchsorted(start, side="left")
+        hi = len(self.keys) if stop is None else self.keys.searchsorted(stop, side="right")
+        if hi <= lo:
+            return slice(0, 0)
+        return self._positions(self.offsets[lo], self.offsets[hi])
+
+    def key(self, i: int):
+        """
+        Get the `i`-th unique level value in sorted order. Negative values count from the last.
+        """
+        return self.keys[i]
+
+
+def _starts(array: np.ndarray) -> np.ndarray:
+    """Positions where a run of equal values starts in a sorted array."""
+    change = np.empty(len(array), dtype=bool)
+    change[:1] = True
+    np.not_equal(array[1:], array[:-1], out=change[1:])
+    return np.flatnonzero(change)
+
+
+def intersect(a: slice | np.ndarray, b: slice | np.ndarray) -> slice | np.ndarray:
+    if isinstance(a, slice) and isinstance(b, slice):
+        return slice(max(a.start, b.start), max(max(a.start, b.start), min(a.stop, b.stop)))
+    a = np.arange(a.start, a.stop) if isinstance(a, slice) else a
+    b = np.arange(b.start, b.stop) if isinstance(b, slice) else b
+    return np.intersect1d(a, b, assume_unique=True)
@@ -0,0 +1,50 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .history_schema import HistorySchema
+from .shared_history import pack, write, unpack
+
+
+class MappedHistory:
+    """
+    A history in a file, written by `History.to_file` and opened by `History.open`.
+
+    The file holds the same block as `SharedHistory`, so opening it with `mmap` maps the file instead of reading it:
+    numeric and datetime columns and the index codes are read-only views of the mapping,
+    and only the pages of the rows and columns that are used are read from disk.
+    This keeps histories larger than memory usable through the usual `get`, `loc` and `levels`,
+    whose results are copies of only the rows they select.
+
+    Object columns are decoded into memory when opened, so pass `columns` to skip those that are not needed.
+    The file's layout is a JSON header, with object values serialized through the `Registry`, so opening a file
+    never runs code from it.
+    """
+
+    @staticmethod
+    def write(path: str, history_schema: HistorySchema, data: pd.DataFrame):
+        """
+        Write a history to `path`, replacing any file there.
+        """
+        header, arrays, size = pack(history_schema, data)
+        block = np.memmap(path, dtype=np.uint8, mode="w+", shape=size)
+        write(memoryview(block), header, arrays)
+        block.flush()
+        del block
+
+    @staticmethod
+    def load(path: str, mmap: bool = True, columns: Optional[List[str]] = None) -> Tuple[HistorySchema, pd.DataFrame]:
+        """
+        Read a history written by `write`.
+
+        Args:
+            path (str): The file.
+            mmap (bool): Whether to map the file, or read it into memory.
+            columns (List[str]): The columns to read. Defaults to all.
+
+        Returns:
+            Tuple[HistorySchema, pd.DataFrame]: The schema and the data.
+        """
+        block = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+        return unpack(block, columns)
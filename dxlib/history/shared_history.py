@@ -0,0 +1,227 @@
+import json
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dxlib.data.registry import Registry
+from .history_schema import HistorySchema
+
+ALIGNMENT = 64
+HEADER_SIZE = 8  # length of the JSON layout that follows it
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def _shareable(dtype) -> bool:
+    """Whether values of a dtype can be read straight from a buffer: numpy bools, numbers and datetimes."""
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:  # track was added in python 3.13
+        return SharedMemory(name=name)
+
+
+def _register_types():
+    # instruments are serialized through their DTO, whose module depends on dxlib.core, which depends on this one
+    from dxlib.core.instruments import instrument_dto  # noqa: F401
+
+
+class _Block(np.ndarray):
+    """
+    The bytes of a mapped block. Arrays read from it keep it as their base, and it keeps the `SharedMemory`,
+    whose collection would unmap the block under them.
+    """
+    shm: SharedMemory
+
+
+def pack(history_schema: HistorySchema, data: pd.DataFrame) -> Tuple[bytes, List[Tuple[int, np.ndarray]], int]:
+    """
+    Lay out a history as a block: the length of a JSON header, the header, then the arrays, aligned to `ALIGNMENT`.
+
+    Numeric and datetime columns, the index codes and the numeric index levels are stored as raw arrays.
+    Object and categorical columns and index levels, such as instruments, are stored as codes, with their unique
+    values serialized through the `Registry` in the header, along with the schema.
+
+    Returns:
+        Tuple[bytes, List[Tuple[int, np.ndarray]], int]: The header, the position of each array in the block,
+            and the size of the block.
+
+    Raises:
+        TypeError: If a column has a dtype that cannot be laid out, such as a nullable extension dtype.
+    """
+    _register_types()
+    arrays: List[Tuple[int, np.ndarray]] = []
+    size = 0
+
+    def uniques(values) -> list:
+        return Registry.serialize(list(values))
+
+    def place(values: Any, name) -> dict:
+        # where values go: raw into the block, or as codes into the block with their unique values in the header
+        nonlocal size
+        dtype = values.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            return {"kind": "categorical", "codes": place(np.asarray(values.codes), name),
+                    "categories": uniques(values.categories), "ordered": bool(dtype.ordered)}
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            return {"kind": "datetime", "dtype": str(dtype), "values": place(np.asarray(values.asi8), name)}
+        if dtype == object:
+            codes, unique = pd.factorize(np.asarray(values, dtype=object))
+            return {"kind": "factorized", "codes": place(codes, name), "uniques": uniques(unique)}
+        if not _shareable(dtype):
+            raise TypeError(f"Values of {name!r} have dtype {dtype}, which cannot be shared.")
+        array = np.ascontiguousarray(values)
+        arrays.append((size, array))
+        size = _align(size + array.nbytes)
+        return {"kind": "array", "dtype": array.dtype.str, "shape": list(array.shape), "offset": arrays[-1][0]}
+
+    index = data.index
+    if isinstance(index, pd.MultiIndex):
+        levels = [place(level, name) for level, name in zip(index.levels, index.names)]
+        codes = [place(np.asarray(level_codes), name) for level_codes, name in zip(index.codes, index.names)]
+    else:
+        levels, codes = [place(index, index.name)], None
+    layout = {
+        "schema": Registry.serialize(history_schema),
+        "columns": [[column, place(data[column].to_numpy() if isinstance(data[column].dtype, np.dtype)
+                                   else data[column].array, column)]
+                    for column in data.columns],
+        "names": list(index.names),
+        "levels": levels,
+        "codes": codes,
+    }
+
+    header = json.dumps(layout).encode("utf-8")
+    start = _align(HEADER_SIZE + len(header))
+    return header, [(start + offset, array) for offset, array in arrays], start + size
+
+
+def write(buffer, header: bytes, arrays: List[Tuple[int, np.ndarray]]):
+    """
+    Write a block laid out by `pack` into a writable buffer of at least its size.
+    """
+    buffer[:HEADER_SIZE] = len(header).to_bytes(HEADER_SIZE, "little")
+    buffer[HEADER_SIZE:HEADER_SIZE + len(header)] = header
+    for offset, array in arrays:
+        np.ndarray(array.shape, array.dtype, buffer=buffer, offset=offset)[...] = array
+
+
+def unpack(block: np.ndarray, columns: Optional[List[str]] = None) -> Tuple[HistorySchema, pd.DataFrame]:
+    """
+    Rebuild a history from the bytes of a block laid out by `pack`, with read-only arrays that are views of `block`.
+
+    Args:
+        block (np.ndarray): The bytes of the block.
+        columns (List[str]): The columns to read. Defaults to all.
+
+    Returns:
+        Tuple[HistorySchema, pd.DataFrame]: The schema and the data.
+    """
+    _register_types()
+    length = int.from_bytes(block[:HEADER_SIZE].tobytes(), "little")
+    layout = json.loads(block[HEADER_SIZE:HEADER_SIZE + length].tobytes())
+    start = _align(HEADER_SIZE + length)
+    schema: HistorySchema = Registry.deserialize(layout["schema"], HistorySchema)
+
+    def values_of(serialized: list, expected_type) -> pd.Index:
+        if expected_type is not None:
+            serialized = [Registry.deserialize(value, expected_type) for value in serialized]
+        return pd.Index(serialized, dtype=object)
+
+    def read(location: dict, expected_type=None) -> Any:
+        kind = location["kind"]
+        if kind == "categorical":
+            dtype = pd.CategoricalDtype(values_of(location["categories"], expected_type), location["ordered"])
+            return pd.Categorical.from_codes(read(location["codes"]), dtype=dtype)
+        if kind == "datetime":
+            dtype = pd.api.types.pandas_dtype(location["dtype"])
+            ticks = read(location["values"])
+            return pd.DatetimeIndex(ticks.view(f"M8[{dtype.unit}]")).tz_localize("UTC").tz_convert(dtype.tz).array
+        if kind == "factorized":
+            return pd.api.extensions.take(np.asarray(values_of(location["uniques"], expected_type)),
+                                          read(location["codes"]), allow_fill=True)
+        array = np.ndarray(tuple(location["shape"]), np.dtype(location["dtype"]), buffer=block,
+                           offset=start + location["offset"])
+        array.flags.writeable = False
+        return array
+
+    names = layout["names"]
+    levels = [pd.Index(read(level, schema.index.get(name)), copy=False)
+              for level, name in zip(layout["levels"], names)]
+    if layout["codes"] is not None:
+        index = pd.MultiIndex(levels=levels, codes=[read(codes) for codes in layout["codes"]],
+                              names=names, verify_integrity=False)
+    else:
+        index = levels[0].rename(names[0])
+
+    stored = layout["columns"]
+    if columns is not None:
+        missing = set(columns) - {column for column, _ in stored}
+        if missing:
+            raise KeyError(f"Columns {sorted(missing)} are not in the history.")
+        stored = [(column, location) for column, location in stored if column in columns]
+        schema = HistorySchema(schema.index.copy(), {column: schema.columns[column] for column, _ in stored})
+
+    data = pd.DataFrame({column: read(location, schema.columns.get(column)) for column, location in stored},
+                        index=index, columns=[column for column, _ in stored], copy=False)
+    return schema, data
+
+
+class SharedHistory:
+    """
+    A copy of a history's data in one shared memory block, created by `History.to_shared`.
+
+    The block is laid out by `pack`: its raw arrays, such as numeric columns and the index codes,
+    are mapped by `History.attach` in other processes without copying.
+    Object columns are decoded into a copy on attach.
+
+    The block lives until `release` is called, so keep this handle while other processes use the history.
+    Use as a context manager, or call `release`.
+    """
+
+    def __init__(self, history_schema: HistorySchema, data: pd.DataFrame):
+        header, arrays, size = pack(history_schema, data)
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        write(self.shm.buf, header, arrays)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def size(self) -> int:
+        return self.shm.size
+
+    def release(self):
+        """
+        Unlink the block. Histories already attached to it stay readable, and the memory is freed once they are gone.
+        """
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedHistory":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @staticmethod
+    def load(name: str) -> Tuple[HistorySchema, pd.DataFrame]:
+        """
+        Map the block `name` and rebuild its data, with read-only arrays backed by the block.
+        The block stays mapped in this process for as long as any of them is in use.
+
+        Returns:
+            Tuple[HistorySchema, pd.DataFrame]: The schema and the data.
+        """
+        shm = _attach(name)
+        block = _Block(shm.size, np.uint8, buffer=shm.buf)
+        block.shm = shm
+        return unpack(block)
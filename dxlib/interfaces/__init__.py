@@ -8,5 +8,6 @@ from .trading_interface import TradingInterface
 
 from .services import *
 from .external import *
+from .cached_market import CachedMarket
 
 from .backtest import BacktestInterface
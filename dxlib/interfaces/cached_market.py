@@ -0,0 +1,236 @@
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+from dxlib.core import Instrument, InstrumentStore
+from dxlib.history import History, HistorySchema
+from .market_interface import MarketInterface
+from .external.utils import concat_histories, resolve_instruments
+
+Range = Tuple[pd.Timestamp, pd.Timestamp]
+
+
+def merge_ranges(ranges: List[Range]) -> List[Range]:
+    """Sort half-open ranges and merge those that overlap or touch."""
+    merged: List[Range] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def gaps(held: List[Range], start: pd.Timestamp, end: pd.Timestamp) -> List[Range]:
+    """The parts of [start, end) not covered by the merged ranges `held`."""
+    missing = []
+    for held_start, held_end in held:
+        if held_end <= start:
+            continue
+        if held_start >= end:
+            break
+        if held_start > start:
+            missing.append((start, held_start))
+        start = max(start, held_end)
+    if start < end:
+        missing.append((start, end))
+    return missing
+
+
+class CachedMarket(MarketInterface):
+    """
+    A market interface that serves `historical` bars from a persistent cache, and fetches only what it lacks.
+
+    For each provider, interval and symbol, the cache records the date ranges it holds, and keeps their bars
+    in Parquet parts, one per fetch and year:
+
+        root/
+          provider=yfinance/interval=1d/symbol=AAPL/
+            coverage.json           <- the ranges held
+            year=2024/
+              part-000001.parquet   <- bars of 2024, indexed by time
+
+    A request only reads the parts of the years it spans.
+
+    A request is served from disk for the ranges held, and the missing gaps are fetched from `market`,
+    one call per distinct gap for all the symbols lacking it. Re-running a request the next day fetches
+    only the new bars.
+
+    A range is only recorded as held from the first bar fetched for it: providers may return fewer bars than
+    asked, such as the latest ones up to a cap per request, and the part before the first bar is fetched
+    again by the next request for it. If no bars are fetched for a range, none of it is recorded as held.
+    Bars of a range reaching into the present may still change, so the last bar fetched for such a range
+    is not recorded as held either, and is fetched again, and replaced, by the next request.
+
+    Example:
+        >>> market = CachedMarket(YFinance(), ".dx/bars")
+        >>> market.start()
+        >>> market.historical(["AAPL", "MSFT"], datetime(2020, 1, 1), datetime(2024, 1, 1), "1d")  # fetches all
+        >>> market.historical(["AAPL", "MSFT"], datetime(2020, 1, 1), datetime(2024, 2, 1), "1d")  # fetches January
+    """
+
+    def __init__(self, market: MarketInterface, root: str = ".dx/bars", provider: Optional[str] = None,
+                 max_parts: int = 8):
+        """
+        Args:
+            market (MarketInterface): The market interface to fetch bars from.
+            root (str): The directory of the cache.
+            provider (str): The name of the provider in the cache. Defaults to the name of the market's class.
+            max_parts (int): The parts a symbol can have before they are merged into one.
+        """
+        self.market = market
+        self.root = root
+        self.provider = provider or type(market).__name__.lower()
+        self.max_parts = max_parts
+
+    def start(self):
+        self.market.start()
+
+    def stop(self):
+        self.market.stop()
+
+    def quote(self, symbols):
+        return self.market.quote(symbols)
+
+    def symbols(self, query: str) -> List[str]:
+        return self.market.symbols(query)
+
+    @property
+    def history_schema(self) -> HistorySchema:
+        return self.market.history_schema
+
+    # region Cache
+
+    def _dir(self, interval: str, symbol: str) -> str:
+        return os.path.join(self.root, *(f"{name}={quote(str(value), safe='')}" for name, value in
+                                         (("provider", self.provider), ("interval", interval), ("symbol", symbol))))
+
+    def coverage(self, symbol: str, interval: str) -> List[Range]:
+        """
+        Get the half-open ranges of bars held for a symbol and interval, merged and sorted.
+        """
+        path = os.path.join(self._dir(interval, symbol), "coverage.json")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as file:
+            return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in json.load(file)]
+
+    def _hold(self, symbol: str, interval: str, ranges: List[Range]):
+        directory = self._dir(interval, symbol)
+        os.makedirs(directory, exist_ok=True)
+        held = merge_ranges(self.coverage(symbol, interval) + ranges)
+        path = os.path.join(directory, "coverage.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump([[start.isoformat(), end.isoformat()] for start, end in held], file)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _parts(directory: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+
+    @staticmethod
+    def _years(directory: str, start: pd.Timestamp, end: pd.Timestamp) -> List[str]:
+        """The year directories of the bars in [start, end)."""
+        last = (end - pd.Timedelta(1, "ns")).year
+        return [path for path in sorted(glob.glob(os.path.join(directory, "year=*")))
+                if start.year <= int(os.path.basename(path)[5:]) <= last]
+
+    def _read_parts(self, directory: str) -> Optional[pd.DataFrame]:
+        parts = self._parts(directory)
+        if not parts:
+            return None
+        bars = pd.concat([pd.read_parquet(part) for part in parts])
+        # later parts hold refetched bars, which replace earlier ones
+        return bars[~bars.index.duplicated(keep="last")].sort_index()
+
+    def _read(self, directory: str, start: pd.Timestamp, end: pd.Timestamp) -> Optional[pd.DataFrame]:
+        years = [bars for path in self._years(directory, start, end)
+                 if (bars := self._read_parts(path)) is not None]
+        if not years:
+            return None
+        bars = pd.concat(years)
+        return bars[(bars.index >= start) & (bars.index < end)]
+
+    @staticmethod
+    def _write_part(directory: str, parts: List[str], bars: pd.DataFrame) -> str:
+        number = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 1
+        path = os.path.join(directory, f"part-{number:06d}.parquet")
+        bars.to_parquet(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return path
+
+    def _write(self, directory: str, bars: pd.DataFrame):
+        for year, rows in bars.groupby(bars.index.year):
+            path = os.path.join(directory, f"year={year}")
+            os.makedirs(path, exist_ok=True)
+            parts = self._parts(path)
+            parts.append(self._write_part(path, parts, rows))
+            if len(parts) > self.max_parts:
+                # the merged part is written before the parts it replaces are removed
+                self._write_part(path, parts, self._read_parts(path))
+                for part in parts:
+                    os.remove(part)
+
+    # endregion
+
+    def _levels(self) -> Tuple[str, str]:
+        """The names of the time and instrument levels of the market's histories."""
+        index = self.history_schema.index
+        instrument = next((name for name, type_ in index.items() if type_ is Instrument), "instrument")
+        time = next(name for name in index if name != instrument)
+        return time, instrument
+
+    def historical(self,
+                   symbols: List[str] | str | Instrument | List[Instrument],
+                   start: datetime,
+                   end: datetime,
+                   interval: str = '1d',
+                   store: Optional[InstrumentStore] = None) -> History:
+        """
+        Get the historical bars of the instruments between `start` and `end`, fetching only those not yet held.
+        """
+        store = store if store is not None else InstrumentStore()
+        instruments = resolve_instruments(symbols, store)
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        time_level, instrument_level = self._levels()
+
+        missing: Dict[Range, List[Instrument]] = {}
+        for instrument in instruments:
+            for gap in gaps(self.coverage(instrument.symbol, interval), start, end):
+                missing.setdefault(gap, []).append(instrument)
+
+        now = pd.Timestamp.now(tz=start.tz)
+        for (gap_start, gap_end), lacking in missing.items():
+            fetched = self.market.historical(lacking, gap_start.to_pydatetime(), gap_end.to_pydatetime(),
+                                             interval, store)
+            by_instrument = {
+                instrument: rows.droplevel(instrument_level)
+                for instrument, rows in fetched.data.groupby(level=instrument_level, observed=True, sort=False)
+            }
+            for instrument in lacking:
+                bars = by_instrument.get(instrument)
+                if bars is None or bars.empty:
+                    continue
+                self._write(self._dir(interval, instrument.symbol), bars)
+                # providers that cap the bars of a request drop the oldest, so only what follows the first is held
+                held_start = max(gap_start, bars.index.min())
+                # the last bar may still change, so it is fetched again next time
+                held_end = gap_end if gap_end <= now else bars.index.max()
+                if held_end > held_start:
+                    self._hold(instrument.symbol, interval, [(held_start, held_end)])
+
+        histories = []
+        for instrument in instruments:
+            bars = self._read(self._dir(interval, instrument.symbol), start, end)
+            if bars is None:
+                continue
+            index = {time_level: bars.index, instrument_level: [instrument] * len(bars)}
+            bars.index = pd.MultiIndex.from_arrays([index[name] for name in self.history_schema.index_names],
+                                                   names=self.history_schema.index_names)
+            histories.append(History(self.history_schema, bars))
+        return concat_histories(self.history_schema, histories)
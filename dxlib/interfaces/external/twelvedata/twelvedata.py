@@ -1,5 +1,5 @@
 import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 import httpx
 import pandas as pd
@@ -7,13 +7,31 @@ import pandas as pd
 from dxlib.core import Instrument, InstrumentStore
 from dxlib.history import History, HistorySchema
 from dxlib.interfaces import MarketInterface
+from ..utils import TokenBucket, gather_bounded, concat_histories, resolve_instruments
 
 
 class TwelveData(MarketInterface):
-    def __init__(self, api_key=None):
+    def __init__(self,
+                 api_key=None,
+                 rate: float = 8 / 60,
+                 burst: int = 8,
+                 concurrency: int = 8,
+                 transport: Optional[httpx.BaseTransport] = None):
+        """
+        Args:
+            api_key: The Twelve Data api key.
+            rate (float): The requests per second allowed on average, shared by all calls on this instance.
+                Defaults to the 8 requests per minute of the free plan.
+            burst (int): The requests allowed at once before `rate` applies.
+            concurrency (int): The most requests in flight at once in `historical_async`.
+            transport (httpx.BaseTransport): The transport of the http clients, such as a mock for tests.
+        """
         self._crumb = None
         self.client = None
         self.key = api_key
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.transport = transport
 
     @property
     def base_url(self) -> str:
@@ -27,7 +45,7 @@ class TwelveData(MarketInterface):
         }
 
     def start(self):
-        self.client = httpx.Client(headers=self.headers, follow_redirects=True, timeout=10)
+        self.client = httpx.Client(headers=self.headers, follow_redirects=True, timeout=10, transport=self.transport)
 
     def stop(self):
         if self.client is not None:
@@ -70,15 +88,28 @@ class TwelveData(MarketInterface):
         df.set_index(['datetime', 'instrument'], inplace=True)
         return History(self.history_schema, df)
 
-    def _historical(self, symbol: str, start: int, end: int, interval: str, version="v8") -> Dict[str, Any]:
-        assert self.client is not None, "Start the Api instance first."
+    def _historical_request(self, symbol: str, start: int, end: int, interval: str) -> Tuple[str, Dict]:
         url = f"{self.base_url}/time_series"
         params = {
             "symbol": symbol,
             "interval": interval,
             "apikey": self.key,
-            "outputsize": 30,
+            "start_date": self._date(start),
+            "end_date": self._date(end),
+            "timezone": "UTC",
+            # the most bars a request returns, latest first
+            "outputsize": 5000,
         }
+        return url, params
+
+    @staticmethod
+    def _date(timestamp: int) -> str:
+        return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _historical(self, symbol: str, start: int, end: int, interval: str, version="v8") -> Dict[str, Any]:
+        assert self.client is not None, "Start the Api instance first."
+        url, params = self._historical_request(symbol, start, end, interval)
+        self.bucket.wait()
         r = self.client.get(url, params=params, timeout=10)
         r.raise_for_status()
         return r.json()
@@ -91,20 +122,45 @@ class TwelveData(MarketInterface):
                    store: InstrumentStore = None,
                    ) -> History:
         assert self.client is not None, "Start the Api instance first."
-        store = store or InstrumentStore()
-        if isinstance(symbols, list):
-            instruments = [store.setdefault(symbol, Instrument(symbol)) for symbol in symbols]
-        else:
-            instruments = [store.setdefault(symbols, Instrument(symbols))]
-        history = History(history_schema=self.history_schema)
-
-        for instrument in instruments:
-            response = self._historical(
+        instruments = resolve_instruments(symbols, store)
+        histories = [
+            self._format_history(instrument, self._historical(
                 instrument.symbol,
                 int(start.timestamp()),
                 int(end.timestamp()),
                 interval
-            )
-            history.extend(self._format_history(instrument, response))
-
-        return history
\ No newline at end of file
+            ))
+            for instrument in instruments
+        ]
+        return concat_histories(self.history_schema, histories)
+
+    async def historical_async(self,
+                               symbols: List[str] | str | Instrument | List[Instrument],
+                               start: datetime.datetime,
+                               end: datetime.datetime,
+                               interval: str = '1d',
+                               store: InstrumentStore = None,
+                               ) -> History:
+        """
+        Get the historical prices of many instruments concurrently, as `historical`.
+
+        Requests run `concurrency` at a time within the rate limit.
+        """
+        instruments = resolve_instruments(symbols, store)
+
+        async with httpx.AsyncClient(headers=self.headers, follow_redirects=True, timeout=10,
+                                     transport=self.transport) as client:
+            async def fetch(instrument: Instrument) -> History:
+                url, params = self._historical_request(
+                    instrument.symbol,
+                    int(start.timestamp()),
+                    int(end.timestamp()),
+                    interval
+                )
+                r = await client.get(url, params=params)
+                r.raise_for_status()
+                return self._format_history(instrument, r.json())
+
+            histories = await gather_bounded([lambda i=instrument: fetch(i) for instrument in instruments],
+                                             self.concurrency, self.bucket)
+        return concat_histories(self.history_schema, histories)
@@ -1,7 +1,17 @@
+import asyncio
 import inspect
-from typing import Any, Callable, Dict, List, Tuple, Union
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 from functools import wraps
 
+import pandas as pd
+
+from dxlib.core import Instrument, InstrumentStore
+from dxlib.history import History, HistorySchema
+
+T = TypeVar("T")
+
 
 class CallbackBase:
     def __init__(self):
@@ -71,4 +81,87 @@ class StoreBase:
                 self.store_data(identifier, data)
                 return data
             return wrapper
-        return decorator
\ No newline at end of file
+        return decorator
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: `rate` requests per second on average, in bursts of up to `capacity`.
+
+    Each call reserves its token right away, going into debt if the bucket is empty, and then waits for the debt
+    to be repaid. Reservations are taken under a lock, so callers are served in order, from threads or asyncio
+    tasks of any event loop.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket.
+
+        Returns:
+            float: The seconds to wait before using them.
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+    def wait(self, tokens: float = 1.0):
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire(self, tokens: float = 1.0):
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+async def gather_bounded(calls: Iterable[Callable[[], Awaitable[T]]],
+                         concurrency: int,
+                         bucket: Optional[TokenBucket] = None) -> List[T]:
+    """
+    Run coroutine functions with at most `concurrency` of them at once, each started once `bucket` allows it.
+
+    Returns:
+        List[T]: The results, in the order of `calls`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(call: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            if bucket is not None:
+                await bucket.acquire()
+            return await call()
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+
+def resolve_instruments(symbols: List[str] | str | Instrument | List[Instrument],
+                        store: Optional[InstrumentStore] = None) -> List[Instrument]:
+    """
+    Get the instruments of one or many symbols or instruments, from `store`, to which missing symbols are added.
+    """
+    store = store if store is not None else InstrumentStore()
+    return [store.setdefault(symbol, Instrument(symbol)) if isinstance(symbol, str) else symbol
+            for symbol in (symbols if isinstance(symbols, list) else [symbols])]
+
+
+def concat_histories(history_schema: HistorySchema, histories: Iterable[History]) -> History:
+    """
+    Combine the histories fetched for each instrument with a single concat, keeping the first of repeated rows.
+    """
+    frames = [history.data for history in histories if not history.data.empty]
+    if not frames:
+        return History(history_schema)
+    data = pd.concat(frames)
+    return History(history_schema, data[~data.index.duplicated(keep="first")].sort_index())
@@ -5,14 +5,28 @@ import re
 import httpx
 import pandas as pd
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from dxlib.interfaces import MarketInterface
 from dxlib.history import History, HistorySchema
 from dxlib.core import Instrument, InstrumentStore
+from ..utils import TokenBucket, gather_bounded, concat_histories, resolve_instruments
 
 
 class YFinance(MarketInterface):
-    def __init__(self, cookie=None):
+    def __init__(self,
+                 cookie=None,
+                 rate: float = 10,
+                 burst: int = 10,
+                 concurrency: int = 8,
+                 transport: Optional[httpx.BaseTransport] = None):
+        """
+        Args:
+            cookie: The Yahoo session cookie.
+            rate (float): The requests per second allowed on average, shared by all calls on this instance.
+            burst (int): The requests allowed at once before `rate` applies.
+            concurrency (int): The most requests in flight at once in `historical_async`.
+            transport (httpx.BaseTransport): The transport of the http clients, such as a mock for tests.
+        """
         self.cookie = cookie
         self.cookies = {
             "A1": self.cookie,
@@ -21,9 +35,13 @@ class YFinance(MarketInterface):
         }
         self._crumb = None
         self.client = None
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.transport = transport
 
     def start(self):
-        self.client = httpx.Client(headers=self.headers, cookies=self.cookies, follow_redirects=True, timeout=10)
+        self.client = httpx.Client(headers=self.headers, cookies=self.cookies, follow_redirects=True, timeout=10,
+                                   transport=self.transport)
         self._refresh_cookies_and_crumb()
 
     def stop(self):
@@ -117,7 +135,7 @@ class YFinance(MarketInterface):
         assert self.client, "Start the Api instance first."
         return self._format_quote(self._quote(symbols))
 
-    def _historical(self, symbol: str, start: int, end: int, interval: str, version="v8") -> Dict[str, Any]:
+    def _historical_request(self, symbol: str, start: int, end: int, interval: str, version="v8") -> Tuple[str, Dict]:
         url = f"{self.base_url}/{version}/finance/chart/{symbol}"
         params = {
             "interval": interval,
@@ -128,6 +146,11 @@ class YFinance(MarketInterface):
             "region": "US",
             "formatted": "false",
         }
+        return url, params
+
+    def _historical(self, symbol: str, start: int, end: int, interval: str, version="v8") -> Dict[str, Any]:
+        url, params = self._historical_request(symbol, start, end, interval, version)
+        self.bucket.wait()
         r = self.client.get(url, params=params, timeout=10)
         r.raise_for_status()
         return r.json()
@@ -179,23 +202,51 @@ class YFinance(MarketInterface):
                    store: InstrumentStore = None,
                    ) -> History:
         assert self.client, "Start the Api instance first."
-        store = store or InstrumentStore()
-        if isinstance(symbols, list):
-            instruments = [store.setdefault(symbol, Instrument(symbol)) for symbol in symbols]
-        else:
-            instruments = [store.setdefault(symbols, Instrument(symbols))]
-        history = History(history_schema=self.history_schema)
-
-        for instrument in instruments:
-            response = self._historical(
+        instruments = resolve_instruments(symbols, store)
+        histories = [
+            self._format_history(instrument, self._historical(
                 instrument.symbol,
                 int(start.timestamp()),
                 int(end.timestamp()),
                 interval
-            )
-            history.extend(self._format_history(instrument, response))
+            ))
+            for instrument in instruments
+        ]
+        return concat_histories(self.history_schema, histories)
+
+    async def historical_async(self,
+                               symbols: List[str] | str | Instrument | List[Instrument],
+                               start: datetime.datetime,
+                               end: datetime.datetime,
+                               interval: str = '1d',
+                               store: InstrumentStore = None,
+                               ) -> History:
+        """
+        Get the historical prices of many instruments concurrently, as `historical`.
+
+        Requests share the session of the started client, and run `concurrency` at a time within the rate limit.
+        """
+        assert self.client, "Start the Api instance first."
+        instruments = resolve_instruments(symbols, store)
+        self.crumb()  # fetched once, before the requests that need it
+
+        async with httpx.AsyncClient(headers=self.headers, cookies=self.client.cookies, follow_redirects=True,
+                                     timeout=10, transport=self.transport) as client:
+            async def fetch(instrument: Instrument) -> History:
+                url, params = self._historical_request(
+                    instrument.symbol,
+                    int(start.timestamp()),
+                    int(end.timestamp()),
+                    interval
+                )
+                r = await client.get(url, params=params)
+                r.raise_for_status()
+                return self._format_history(instrument, r.json())
+
+            histories = await gather_bounded([lambda i=instrument: fetch(i) for instrument in instruments],
+                                             self.concurrency, self.bucket)
+        return concat_histories(self.history_schema, histories)
 
-        return history
 
     def _symbols(self, query: str, crumb=None, version="v1", lang="en-US") -> Dict[str, Any]:
         # crumb = crumb or self.crumb()
@@ -1,4 +1,5 @@
-from .order_book import OrderBook, PriceLevel
+from .order_book import OrderBook, PriceLevel, TickOrderBook
 from .transaction import Transaction
 
 from .order import *
+from .exchange import Exchange, ShardedExchange
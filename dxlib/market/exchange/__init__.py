@@ -0,0 +1,3 @@
+from .exchange import Exchange
+from .shared_ring import SharedRing
+from .sharded_exchange import ShardedExchange, SHARD_MESSAGE_DTYPE
@@ -0,0 +1,86 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+from uuid import UUID
+
+from dxlib.core import Instrument, Portfolio
+from ..order import Order, OrderTransaction, OrderEngine
+from ..order_book import OrderBook
+
+
+class Exchange:
+    """
+    Multi-instrument matching engine, with one `OrderBook` per instrument.
+
+    Clients register with a `Portfolio`, and every fill is settled into the portfolios of both the taker
+    and the resting order's owner through `OrderEngine.record`, in the instrument and in the engine's cash leg.
+    """
+
+    def __init__(self, tick_size: float = 1e-2, engine: Optional[OrderEngine] = None):
+        self.tick_size = tick_size
+        self.engine = engine or OrderEngine()
+        self.books: Dict[Instrument, OrderBook] = {}
+        self.portfolios: Dict[Hashable, Portfolio] = {}
+        # resting order -> owner, the glue for settling fills
+        self.order_owners: Dict[UUID, Hashable] = {}
+
+    def register(self, client: Hashable, portfolio: Optional[Portfolio] = None) -> Portfolio:
+        portfolio = portfolio if portfolio is not None else Portfolio()
+        self.portfolios[client] = portfolio
+        return portfolio
+
+    def add_instrument(self, instrument: Instrument, tick_size: Optional[float] = None) -> OrderBook:
+        book = self.books.get(instrument)
+        if book is None:
+            book = self.books[instrument] = OrderBook(tick_size or self.tick_size)
+        return book
+
+    def _book(self, instrument: Instrument) -> OrderBook:
+        book = self.books.get(instrument)
+        if book is None:
+            raise KeyError(f"Instrument {instrument} is not listed")
+        return book
+
+    def _owner(self, client: Hashable):
+        if client not in self.portfolios:
+            raise KeyError(f"Client {client} is not registered")
+
+    def send_limit(self, order: Order, client: Hashable) -> List[OrderTransaction]:
+        """
+        Send a limit order, matching what crosses the book and resting the remainder.
+
+        Returns:
+            List[OrderTransaction]: The transactions of the incoming order, one per fill.
+        """
+        self._owner(client)
+        fills = self._book(order.instrument).match(order)
+        if order.quantity > 0:
+            self.order_owners[order.uuid] = client
+        return self._settle(order, client, fills)
+
+    def send_market(self, order: Order, client: Hashable) -> List[OrderTransaction]:
+        """
+        Send a market order, matching against the book until filled or the book runs out.
+
+        Returns:
+            List[OrderTransaction]: The transactions of the incoming order, one per fill.
+        """
+        self._owner(client)
+        fills = self._book(order.instrument).match(order, market=True)
+        return self._settle(order, client, fills)
+
+    def cancel_order(self, instrument: Instrument, order_id: UUID):
+        self._book(instrument).cancel_order(order_id)
+        self.order_owners.pop(order_id, None)
+
+    def _settle(self, order: Order, client: Hashable, fills: List[Tuple[Order, float, float]]) -> List[OrderTransaction]:
+        transactions = [OrderTransaction(order, price, quantity) for _, price, quantity in fills]
+        if not transactions:
+            return transactions
+
+        settled: Dict[Hashable, List[OrderTransaction]] = {client: list(transactions)}
+        for resting, price, quantity in fills:
+            owner = self.order_owners[resting.uuid] if resting.quantity > 0 else self.order_owners.pop(resting.uuid)
+            settled.setdefault(owner, []).append(OrderTransaction(resting, price, quantity))
+
+        for owner, owner_transactions in settled.items():
+            self.engine.record(self.portfolios[owner], owner_transactions)
+        return transactions
@@ -0,0 +1,242 @@
+import itertools
+import multiprocessing
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from dxlib.core import Instrument, Portfolio
+from ..order import Order, OrderTransaction, OrderEngine
+from ..order_book import OrderBook, MessageType, MESSAGE_DTYPE, FILL_DTYPE
+from .shared_ring import SharedRing
+
+# A book message tagged with the id of the book it goes to.
+SHARD_MESSAGE_DTYPE = np.dtype(MESSAGE_DTYPE.descr + [("book", np.int32)])
+
+
+def _wait():
+    time.sleep(1e-5)
+
+
+def _serve(inbox_name: str, outbox_name: str, capacity: int, tick_size: float):
+    """
+    Shard process loop: apply incoming messages to the shard's books, and write back their fills.
+    """
+    inbox = SharedRing.attach(inbox_name, SHARD_MESSAGE_DTYPE, capacity)
+    outbox = SharedRing.attach(outbox_name, FILL_DTYPE, capacity)
+    books: Dict[int, OrderBook] = {}
+
+    while True:
+        msgs = inbox.peek()
+        if not len(msgs):
+            if inbox.closed and not len(inbox):
+                break
+            _wait()
+            continue
+
+        ids = msgs["book"]
+        fills = []
+        for book_id in np.unique(ids):
+            book = books.get(book_id)
+            if book is None:
+                book = books[book_id] = OrderBook(tick_size)
+            fills.append(book.apply_batch(msgs[ids == book_id]))
+        fills = np.concatenate(fills)
+
+        written = 0
+        while written < len(fills):
+            written += outbox.put(fills[written:])
+            if written < len(fills):
+                _wait()
+        # consume the messages only once their fills are visible, so an empty inbox means a settled shard
+        inbox.advance(len(msgs))
+
+    inbox.release()
+    outbox.release()
+
+
+class ShardedExchange:
+    """
+    Multi-instrument matching engine with its books sharded across processes.
+
+    Each shard process owns the books of a subset of the instruments, and receives order messages
+    and sends back fills through `SharedRing` buffers in shared memory.
+    Orders are buffered until `flush`, which sends them to the shards, waits for the shards to process them,
+    and settles the fills into the clients' portfolios through `OrderEngine.record`, as `Exchange` does.
+
+    Orders are matched as in `Exchange`, with each order matched in the order it was sent within its book.
+    Use as a context manager, or call `start` and `close`.
+    """
+
+    def __init__(self,
+                 instruments: Iterable[Instrument],
+                 n_shards: Optional[int] = None,
+                 tick_size: float = 1e-2,
+                 engine: Optional[OrderEngine] = None,
+                 capacity: int = 1 << 16,
+                 context: Optional[str] = None):
+        self.instruments: List[Instrument] = list(instruments)
+        self.book_ids: Dict[Instrument, int] = {instrument: i for i, instrument in enumerate(self.instruments)}
+        self.n_shards = max(1, min(n_shards or multiprocessing.cpu_count(), len(self.instruments)))
+        self.tick_size = tick_size
+        self.engine = engine or OrderEngine()
+        self.capacity = capacity
+        self._context = multiprocessing.get_context(context)
+
+        self.portfolios: Dict[Hashable, Portfolio] = {}
+        # order id -> (order, owner), for orders sent and not yet fully filled or cancelled
+        self.orders: Dict[int, Tuple[Order, Hashable]] = {}
+        self._ids = itertools.count()
+        # orders that leave the book at the next flush, even if not fully filled
+        self._done: Set[int] = set()
+        self._pending: List[List[tuple]] = [[] for _ in range(self.n_shards)]
+
+        self._inboxes: List[SharedRing] = []
+        self._outboxes: List[SharedRing] = []
+        self._processes = []
+
+    def shard(self, instrument: Instrument) -> int:
+        return self.book_ids[instrument] % self.n_shards
+
+    # region Lifecycle
+
+    def start(self):
+        for _ in range(self.n_shards):
+            inbox = SharedRing(SHARD_MESSAGE_DTYPE, self.capacity)
+            outbox = SharedRing(FILL_DTYPE, self.capacity)
+            process = self._context.Process(
+                target=_serve, args=(inbox.name, outbox.name, self.capacity, self.tick_size), daemon=True
+            )
+            process.start()
+            self._inboxes.append(inbox)
+            self._outboxes.append(outbox)
+            self._processes.append(process)
+        return self
+
+    def close(self):
+        for inbox in self._inboxes:
+            inbox.close()
+        for process in self._processes:
+            process.join()
+        for ring in self._inboxes + self._outboxes:
+            ring.release()
+        self._inboxes, self._outboxes, self._processes = [], [], []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # endregion
+
+    # region Orders
+
+    def register(self, client: Hashable, portfolio: Optional[Portfolio] = None) -> Portfolio:
+        portfolio = portfolio if portfolio is not None else Portfolio()
+        self.portfolios[client] = portfolio
+        return portfolio
+
+    def _send(self, kind: MessageType, order: Order, client: Hashable) -> int:
+        if client not in self.portfolios:
+            raise KeyError(f"Client {client} is not registered")
+        if order.instrument not in self.book_ids:
+            raise KeyError(f"Instrument {order.instrument} is not listed")
+        OrderBook.validate_order(order)
+
+        order.price = round(order.price / self.tick_size) * self.tick_size
+        order_id = next(self._ids)
+        self.orders[order_id] = (order, client)
+        book_id = self.book_ids[order.instrument]
+        self._pending[book_id % self.n_shards].append(
+            (kind, order_id, order.side.value, order.price, order.quantity, book_id)
+        )
+        return order_id
+
+    def send_limit(self, order: Order, client: Hashable) -> int:
+        """
+        Queue a limit order, which matches what crosses the book and rests the remainder.
+
+        Returns:
+            int: The order id, to cancel it with.
+        """
+        return self._send(MessageType.LIMIT, order, client)
+
+    def send_market(self, order: Order, client: Hashable) -> int:
+        order_id = self._send(MessageType.MARKET, order, client)
+        self._done.add(order_id)
+        return order_id
+
+    def cancel_order(self, order_id: int):
+        if order_id not in self.orders:
+            raise KeyError(f"Order {order_id} not found")
+        order, _ = self.orders[order_id]
+        book_id = self.book_ids[order.instrument]
+        self._pending[book_id % self.n_shards].append(
+            (MessageType.CANCEL, order_id, order.side.value, order.price, 0, book_id)
+        )
+        self._done.add(order_id)
+
+    # endregion
+
+    # region Settlement
+
+    def _drain(self, fills: List[np.ndarray]):
+        for outbox in self._outboxes:
+            if len(outbox):
+                fills.append(outbox.get())
+
+    def flush(self) -> List[OrderTransaction]:
+        """
+        Send the queued messages to their shards, wait for all of them to be processed and settle the fills.
+
+        Returns:
+            List[OrderTransaction]: The transactions of the incoming orders, one per fill.
+        """
+        if not self._processes:
+            raise RuntimeError("ShardedExchange is not started")
+
+        fills: List[np.ndarray] = []
+        for shard, pending in enumerate(self._pending):
+            records = np.array(pending, dtype=SHARD_MESSAGE_DTYPE)
+            written = 0
+            while written < len(records):
+                written += self._inboxes[shard].put(records[written:])
+                if written < len(records):
+                    # keep the shard's outbox from filling up while it works through the inbox
+                    self._drain(fills)
+                    _wait()
+            pending.clear()
+
+        while any(len(inbox) for inbox in self._inboxes):
+            self._drain(fills)
+            _wait()
+        self._drain(fills)
+
+        transactions = self._settle(np.concatenate(fills) if fills else np.empty(0, dtype=FILL_DTYPE))
+        for order_id in self._done:
+            self.orders.pop(order_id, None)
+        self._done.clear()
+        return transactions
+
+    def _settle(self, fills: np.ndarray) -> List[OrderTransaction]:
+        transactions = []
+        settled: Dict[Hashable, List[OrderTransaction]] = {}
+        for taker_id, maker_id, price, quantity in zip(
+                fills["taker"].tolist(), fills["maker"].tolist(), fills["price"].tolist(), fills["quantity"].tolist()
+        ):
+            for order_id in (taker_id, maker_id):
+                order, client = self.orders[order_id]
+                order.quantity -= quantity
+                transaction = OrderTransaction(order, price, quantity)
+                settled.setdefault(client, []).append(transaction)
+                if order_id == taker_id:
+                    transactions.append(transaction)
+                if order.quantity <= 0:
+                    del self.orders[order_id]
+
+        for client, client_transactions in settled.items():
+            self.engine.record(self.portfolios[client], client_transactions)
+        return transactions
+
+    # endregion
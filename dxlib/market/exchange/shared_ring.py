@@ -0,0 +1,104 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+HEADER_SIZE = 64
+HEAD, TAIL, CLOSED = 0, 1, 2
+
+
+class SharedRing:
+    """
+    Single-producer, single-consumer ring buffer of structured records in shared memory.
+
+    The header holds two counters, the consumer's `head` and the producer's `tail`, each written by only one side,
+    so records are passed between processes without locks or pickling.
+    The producer writes records before moving `tail`, and the consumer reads them before moving `head`.
+    """
+
+    def __init__(self, dtype: np.dtype, capacity: int, name: Optional[str] = None):
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * self.dtype.itemsize
+        if name is None:
+            self.shm = SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            try:
+                self.shm = SharedMemory(name=name, track=False)
+            except TypeError:  # track was added in python 3.13
+                self.shm = SharedMemory(name=name)
+            self.owner = False
+        self._header = np.ndarray(3, dtype=np.int64, buffer=self.shm.buf)
+        self._records = np.ndarray(capacity, dtype=self.dtype, buffer=self.shm.buf, offset=HEADER_SIZE)
+        if self.owner:
+            self._header[:] = 0
+
+    @classmethod
+    def attach(cls, name: str, dtype: np.dtype, capacity: int) -> "SharedRing":
+        return cls(dtype, capacity, name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self):
+        return int(self._header[TAIL] - self._header[HEAD])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._header[CLOSED])
+
+    def close(self):
+        """Mark the ring as closed, telling the consumer no more records will be put."""
+        self._header[CLOSED] = 1
+
+    def put(self, records: np.ndarray) -> int:
+        """
+        Write as many records as fit, in order.
+
+        Returns:
+            int: The number of records written.
+        """
+        head, tail = self._header[HEAD], self._header[TAIL]
+        n = min(len(records), self.capacity - int(tail - head))
+        if n <= 0:
+            return 0
+        start = int(tail % self.capacity)
+        first = min(n, self.capacity - start)
+        self._records[start:start + first] = records[:first]
+        self._records[:n - first] = records[first:n]
+        self._header[TAIL] = tail + n
+        return n
+
+    def peek(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Copy up to `n` records from the front of the ring, without consuming them.
+        """
+        head, tail = self._header[HEAD], self._header[TAIL]
+        n = int(tail - head) if n is None else min(n, int(tail - head))
+        start = int(head % self.capacity)
+        first = min(n, self.capacity - start)
+        if first == n:
+            return self._records[start:start + n].copy()
+        return np.concatenate([self._records[start:], self._records[:n - first]])
+
+    def advance(self, n: int):
+        """
+        Consume `n` records, freeing their space for the producer.
+        """
+        self._header[HEAD] += n
+
+    def get(self, n: Optional[int] = None) -> np.ndarray:
+        records = self.peek(n)
+        self.advance(len(records))
+        return records
+
+    def release(self):
+        """
+        Detach from the shared memory, and free it if this side created it.
+        """
+        del self._header, self._records
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
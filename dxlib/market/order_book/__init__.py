@@ -1,2 +1,4 @@
+from .messages import MessageType, MESSAGE_DTYPE, FILL_DTYPE
 from .order_book import OrderBook
-from .price_level import PriceLevel
\ No newline at end of file
+from .price_level import PriceLevel
+from .tick_order_book import TickOrderBook
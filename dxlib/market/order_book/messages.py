@@ -0,0 +1,33 @@
+from enum import IntEnum
+
+import numpy as np
+
+
+class MessageType(IntEnum):
+    ADD = 0
+    CANCEL = 1
+    MODIFY = 2
+    MARKET = 3
+    LIMIT = 4
+
+
+# One order book message per record, as consumed by `OrderBook.apply_batch`.
+# `side` holds `Side.value` (1 buy, -1 sell), and `id` is the integer reference of the order the message acts on.
+MESSAGE_DTYPE = np.dtype([
+    ("type", np.uint8),
+    ("id", np.int64),
+    ("side", np.int8),
+    ("price", np.float64),
+    ("quantity", np.float64),
+])
+
+# One fill per record, as returned by `OrderBook.apply_batch`.
+# `message` is the position of the market or limit message in the batch, `taker` its order id and `maker` the resting order id,
+# or -1 if the resting order was not sent with an integer id.
+FILL_DTYPE = np.dtype([
+    ("message", np.int64),
+    ("taker", np.int64),
+    ("maker", np.int64),
+    ("price", np.float64),
+    ("quantity", np.float64),
+])
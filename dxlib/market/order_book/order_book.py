@@ -1,11 +1,13 @@
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
 from sortedcontainers import SortedDict
 
 from ..transaction import Transaction
 from ..order.order import Order, Side
 
+from .messages import MessageType, FILL_DTYPE
 from .price_level import PriceLevel
 
 
@@ -15,11 +17,16 @@ class OrderBook:
         self.bids: Dict[float, PriceLevel] = SortedDict()
         self.orders: Dict[UUID, Order] = {}
         self.tick_size = tick_size
+        # best prices, kept up to date on insert, fill and cancel
+        self.best_bid: Optional[float] = None
+        self.best_ask: Optional[float] = None
 
     def clear(self):
         self.asks.clear()
         self.bids.clear()
         self.orders = {}
+        self.best_bid = None
+        self.best_ask = None
 
     def round(self, price: float):
         return round(price / self.tick_size) * self.tick_size
@@ -28,15 +35,46 @@ class OrderBook:
         if order_id not in self.orders:
             raise KeyError(f"Order {order_id} not found")
 
-        order = self.orders[order_id]
+        self._remove(self.orders[order_id])
+
+    def _remove(self, order: Order):
         side = self.asks if order.side == Side.SELL else self.bids
 
         level = side[order.price]
         level.pop(order)
-        del self.orders[order_id]
+        del self.orders[order.uuid]
+        if level.empty():
+            self._remove_level(side, order.price)
+
+    def _remove_level(self, side, price):
+        del side[price]
+        if side is self.bids:
+            if price == self.best_bid:
+                self.best_bid = self.bids.peekitem(-1)[0] if self.bids else None
+        elif price == self.best_ask:
+            self.best_ask = self.asks.peekitem(0)[0] if self.asks else None
 
-    def _quantity(self, level):
-        return sum(order.quantity for order in level)
+    def best(self, side: Side) -> Optional[PriceLevel]:
+        """
+        Get the best level of a side, or None if the side is empty.
+        """
+        if side == Side.BUY:
+            return self.bids[self.best_bid] if self.best_bid is not None else None
+        if side == Side.SELL:
+            return self.asks[self.best_ask] if self.best_ask is not None else None
+        raise ValueError("side must be Side.BUY or Side.SELL")
+
+    @property
+    def midprice(self) -> Optional[float]:
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return self.best_ask - self.best_bid
 
     def quantity(self, price: float, side: Side):
         if side not in (Side.BUY, Side.SELL):
@@ -45,7 +83,7 @@ class OrderBook:
         side = self.asks if side == Side.SELL else self.bids
         price = self.round(price)
         level = side.get(price)
-        return self._quantity(level) if level is not None else 0
+        return level.quantity if level is not None else 0
 
     @property
     def shape(self):
@@ -67,46 +105,162 @@ class OrderBook:
         self.validate_order(order)
 
         order.price = self.round(order.price)  # think about a better way to do without editing input order
+        self._insert(order)
+
+    def _insert(self, order: Order):
         side = self.asks if order.side == Side.SELL else self.bids
 
         level = side.get(order.price)
         if level is None:
             side[order.price] = PriceLevel(order.price)
             level = side[order.price]
+            if order.side == Side.SELL:
+                if self.best_ask is None or order.price < self.best_ask:
+                    self.best_ask = order.price
+            elif self.best_bid is None or order.price > self.best_bid:
+                self.best_bid = order.price
 
         self.orders[order.uuid] = order
         level.add_order(order)
 
-    def send_market(self, order: Order):
-        self.validate_order(order)
+    def _match(self, selling: bool, quantity, limit: Optional[float] = None) -> Tuple[List[Tuple[Order, float, float]], float]:
+        """
+        Match an incoming quantity against the opposite side, best price first and FIFO within a level,
+        up to the `limit` price if given.
 
-        order.price = self.round(order.price)
-        matching = self.bids if order.side == Side.SELL else self.asks
-
-        transactions = []
+        Returns:
+            Tuple[List[Tuple[Order, float, float]], float]: The fills as (resting order, price, quantity),
+                and the quantity left unmatched.
+        """
+        matching = self.bids if selling else self.asks
+        fills = []
 
-        for price, level in matching.items():
-            while not level.empty() and order.quantity > 0:
+        while quantity > 0:
+            price = self.best_bid if selling else self.best_ask
+            if price is None or (limit is not None and (price < limit if selling else price > limit)):
+                break
+            level = matching[price]
+            while not level.empty() and quantity > 0:
                 best_order = level.top()
-                transactions.append(Transaction(order.client, best_order.client, order.price, min(order.quantity, best_order.quantity)))
-                diff = min(order.quantity, best_order.quantity)
-                order.quantity -= diff
-                best_order.quantity -= diff
+                diff = min(quantity, best_order.quantity)
+                fills.append((best_order, price, diff))
+                quantity -= diff
+                level.fill(best_order, diff)
                 if best_order.quantity <= 0:
                     level.pop(best_order)
+                    self.orders.pop(best_order.uuid, None)
 
-            if order.quantity <= 0:
-                break
+            if level.empty():
+                self._remove_level(matching, price)
+
+        return fills, quantity
 
+    def match(self, order: Order, market: bool = False) -> List[Tuple[Order, float, float]]:
+        """
+        Match an incoming order against the book.
+        A limit order matches up to its price and rests what is left, a market order matches until filled.
+
+        Returns:
+            List[Tuple[Order, float, float]]: The fills as (resting order, price, quantity).
+        """
+        self.validate_order(order)
+
+        order.price = self.round(order.price)
+        fills, order.quantity = self._match(order.side == Side.SELL, order.quantity, None if market else order.price)
+        if not market and order.quantity > 0:
+            self._insert(order)
+        return fills
+
+    @staticmethod
+    def _transactions(order: Order, fills: List[Tuple[Order, float, float]]) -> List[Transaction]:
+        selling = order.side == Side.SELL
+        transactions = []
+        for best_order, price, quantity in fills:
+            seller, buyer = (order.client, best_order.client) if selling else (best_order.client, order.client)
+            transactions.append(Transaction(seller, buyer, price, quantity))
         return transactions
 
+    def send_market(self, order: Order):
+        return self._transactions(order, self.match(order, market=True))
+
+    def send_order(self, order: Order) -> List[Transaction]:
+        return self._transactions(order, self.match(order))
+
+    def apply_batch(self, msgs: np.ndarray) -> np.ndarray:
+        """
+        Apply a batch of order book messages in order, as when replaying recorded order flow.
+
+        Prices are rounded to the tick size for the whole batch at once, and the messages skip the per-order
+        validation of `send_limit` and `send_market`. Orders are keyed by their integer id in `orders`.
+        Adds rest without matching, as in exchange feeds, while limit messages match up to their price
+        and rest the remainder, as `match` does.
+        Cancels and modifies of ids not in the book, such as orders added before the replay started, are ignored,
+        as are adds and limits with the id of an order already in the book, which would otherwise orphan that order.
+        A modify that keeps the price and does not increase the quantity keeps the order's queue priority,
+        any other modify moves the order to the back of its new level.
+
+        Args:
+            msgs (np.ndarray): A structured array of `MESSAGE_DTYPE` records.
+
+        Returns:
+            np.ndarray: The fills of the market and limit messages, as a structured array of `FILL_DTYPE` records.
+        """
+        kinds = msgs["type"].tolist()
+        ids = msgs["id"].tolist()
+        sides = msgs["side"].tolist()
+        prices = (np.round(msgs["price"] / self.tick_size) * self.tick_size).tolist()
+        quantities = msgs["quantity"].tolist()
+
+        add, cancel, modify, market, limit = (
+            MessageType.ADD, MessageType.CANCEL, MessageType.MODIFY, MessageType.MARKET, MessageType.LIMIT
+        )
+        buy, sell = Side.BUY, Side.SELL
+        orders = self.orders
+        fills = []
+
+        for i, (kind, order_id, side, price, quantity) in enumerate(zip(kinds, ids, sides, prices, quantities)):
+            if kind == add:
+                if order_id in orders:
+                    continue
+                self._insert(Order(None, price, quantity, buy if side > 0 else sell, uuid=order_id))
+            elif kind == cancel:
+                order = orders.get(order_id)
+                if order is not None:
+                    self._remove(order)
+            elif kind == modify:
+                order = orders.get(order_id)
+                if order is None:
+                    continue
+                if quantity <= 0:
+                    self._remove(order)
+                elif price == order.price and quantity <= order.quantity:
+                    levels = self.asks if order.side == sell else self.bids
+                    levels[price].fill(order, order.quantity - quantity)
+                else:
+                    self._remove(order)
+                    order.price, order.quantity = price, quantity
+                    self._insert(order)
+            elif kind == market or kind == limit:
+                if kind == limit and order_id in orders:
+                    continue
+                matched, quantity = self._match(side < 0, quantity, price if kind == limit else None)
+                for best_order, fill_price, fill_quantity in matched:
+                    maker = best_order.uuid if isinstance(best_order.uuid, int) else -1
+                    fills.append((i, order_id, maker, fill_price, fill_quantity))
+                if kind == limit and quantity > 0:
+                    self._insert(Order(None, price, quantity, buy if side > 0 else sell, uuid=order_id))
+            else:
+                raise ValueError(f"Unknown message type {kind} at position {i}")
+
+        return np.array(fills, dtype=FILL_DTYPE)
+
     def depth(self, n_levels, side: Side):
         if side not in (Side.BUY, Side.SELL):
             raise ValueError("side must be Side.BUY or Side.SELL")
-        side = self.asks if side == Side.SELL else self.bids
-        i = 0
-        for price, level in side.items():
-            i += 1
-            if i > n_levels:
+        # best first: highest bids, lowest asks
+        prices = reversed(self.bids) if side == Side.BUY else iter(self.asks)
+        levels = self.bids if side == Side.BUY else self.asks
+        for i, price in enumerate(prices):
+            if i >= n_levels:
                 return
-            yield price, self._quantity(level)
+            yield price, levels[price].quantity
@@ -8,17 +8,29 @@ class PriceLevel:
         self.orders = dllist()
         # hash map/dict
         self.order_map = {}
+        # running total of the resting quantity, kept up to date on add, fill and pop
+        self.quantity = 0
 
     def add_order(self, order):
         node = self.orders.append(order)
         self.order_map[order.uuid] = node
+        self.quantity += order.quantity
 
     def top(self):
         return self.orders.first.value
 
+    def fill(self, order, quantity):
+        order.quantity -= quantity
+        self.quantity -= quantity
+
     def pop(self, order):
         node = self.order_map.pop(order.uuid)
         self.orders.remove(node)
+        self.quantity -= order.quantity
+
+    @property
+    def count(self):
+        return self.orders.size
 
     def __getitem__(self, idx):
         return self.orders[idx]
@@ -30,4 +42,4 @@ class PriceLevel:
         return iter(self.orders)
 
     def empty(self):
-        return len(self.orders) == 0
\ No newline at end of file
+        return len(self.orders) == 0
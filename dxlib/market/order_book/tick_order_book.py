@@ -0,0 +1,348 @@
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from ..transaction import Transaction
+from ..order.order import Order, Side
+
+BID = 0
+ASK = 1
+NULL = -1
+
+
+class TickOrderBook:
+    """
+    Limit order book over integer price ticks, with the same `send_limit`, `send_market`, `cancel_order`,
+    `quantity` and `depth` API as `OrderBook`.
+
+    Orders live in slots of flat arrays (quantity, tick, side, client, and next/previous slot links),
+    and each price level is an intrusive FIFO queue threaded through those links, from its head to its tail slot.
+    Freed slots are chained into a free list and reused, so steady-state adding and cancelling does not allocate.
+    Levels are flat arrays indexed by tick, holding the queue ends, the total quantity and the order count,
+    and the best bid and ask ticks are kept up to date on every insert, fill and cancel.
+
+    Besides the `Order` API, `add`, `cancel` and `match` work directly with ticks and slot ids, skipping
+    the `Order` objects, uuids and price rounding.
+    """
+
+    def __init__(self, tick_size: int | float = 1e-2, capacity: int = 1024, n_ticks: int = 1024):
+        self.tick_size = tick_size
+
+        # order slots, with the `Order` objects of orders sent through the `Order` API
+        self._objects: List[Optional[Order]] = []
+        self._qty: List[float] = []
+        self._tick: List[int] = []
+        self._side: List[int] = []
+        self._next: List[int] = []
+        self._prev: List[int] = []
+        self._client: List = []
+        self._live: List[bool] = []
+        self._free = NULL
+        self._grow_slots(max(capacity, 1))
+
+        # price levels, per side
+        self._head: Tuple[List[int], List[int]] = ([], [])
+        self._tail: Tuple[List[int], List[int]] = ([], [])
+        self._level_qty: Tuple[List[float], List[float]] = ([], [])
+        self._level_count: Tuple[List[int], List[int]] = ([], [])
+        self._n_levels = [0, 0]
+        self._grow_ticks(max(n_ticks, 1))
+
+        self.best_bid = NULL
+        self.best_ask = NULL
+
+        self.orders: Dict[UUID, Order] = {}
+        self._ids: Dict[UUID, int] = {}
+
+    # region Storage
+
+    def _grow_slots(self, capacity: int):
+        start = len(self._qty)
+        extra = capacity - start
+        self._qty.extend([0.0] * extra)
+        self._tick.extend([0] * extra)
+        self._side.extend([0] * extra)
+        self._prev.extend([NULL] * extra)
+        self._client.extend([None] * extra)
+        self._objects.extend([None] * extra)
+        self._live.extend([False] * extra)
+        # chain the new slots in front of the free list
+        self._next.extend(range(start + 1, capacity + 1))
+        self._next[-1] = self._free
+        self._free = start
+
+    def _grow_ticks(self, n_ticks: int):
+        extra = n_ticks - len(self._head[BID])
+        for side in (BID, ASK):
+            self._head[side].extend([NULL] * extra)
+            self._tail[side].extend([NULL] * extra)
+            self._level_qty[side].extend([0.0] * extra)
+            self._level_count[side].extend([0] * extra)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._qty)
+
+    @property
+    def n_ticks(self) -> int:
+        return len(self._head[BID])
+
+    def clear(self):
+        tick_size = self.tick_size
+        self.__init__(tick_size, len(self._qty), len(self._head[BID]))
+
+    # endregion
+
+    # region Tick API
+
+    def to_tick(self, price: float) -> int:
+        return int(round(price / self.tick_size))
+
+    def round(self, price: float):
+        return round(price / self.tick_size) * self.tick_size
+
+    def add(self, side: int, tick: int, quantity: float, client=None) -> int:
+        """
+        Rest a limit order at the back of its level.
+
+        Args:
+            side (int): `BID` or `ASK`.
+            tick (int): The price, in ticks. Must be non-negative.
+            quantity (float): The order quantity.
+            client: Optional owner of the order, reported in transactions.
+
+        Returns:
+            int: The slot id of the order, to cancel it with.
+        """
+        if tick < 0:
+            raise ValueError("Tick must be non-negative")
+        if tick >= len(self._head[BID]):
+            self._grow_ticks(max(tick + 1, 2 * len(self._head[BID])))
+        slot = self._free
+        if slot == NULL:
+            self._grow_slots(2 * len(self._qty))
+            slot = self._free
+        self._free = self._next[slot]
+
+        self._qty[slot] = quantity
+        self._tick[slot] = tick
+        self._side[slot] = side
+        self._client[slot] = client
+        self._objects[slot] = None
+        self._live[slot] = True
+        self._next[slot] = NULL
+
+        tail = self._tail[side]
+        last = tail[tick]
+        self._prev[slot] = last
+        if last == NULL:
+            self._head[side][tick] = slot
+            self._n_levels[side] += 1
+            if side == BID:
+                if tick > self.best_bid:
+                    self.best_bid = tick
+            elif self.best_ask == NULL or tick < self.best_ask:
+                self.best_ask = tick
+        else:
+            self._next[last] = slot
+        tail[tick] = slot
+        self._level_qty[side][tick] += quantity
+        self._level_count[side][tick] += 1
+        return slot
+
+    def _unlink(self, slot: int):
+        side = self._side[slot]
+        tick = self._tick[slot]
+        prev = self._prev[slot]
+        nxt = self._next[slot]
+        if prev == NULL:
+            self._head[side][tick] = nxt
+        else:
+            self._next[prev] = nxt
+        if nxt == NULL:
+            self._tail[side][tick] = prev
+        else:
+            self._prev[nxt] = prev
+
+        count = self._level_count[side]
+        count[tick] -= 1
+        if count[tick] == 0:
+            self._level_qty[side][tick] = 0.0
+            self._n_levels[side] -= 1
+            if side == BID and tick == self.best_bid:
+                self.best_bid = self._next_level(BID, tick)
+            elif side == ASK and tick == self.best_ask:
+                self.best_ask = self._next_level(ASK, tick)
+
+        # the freed slot keeps its client and order until reused, so fills can still report them
+        self._live[slot] = False
+        self._next[slot] = self._free
+        self._free = slot
+
+    def _next_level(self, side: int, tick: int) -> int:
+        """Next non-empty level away from the spread, or `NULL`."""
+        if self._n_levels[side] == 0:
+            return NULL
+        count = self._level_count[side]
+        if side == BID:
+            for t in range(tick - 1, -1, -1):
+                if count[t]:
+                    return t
+        else:
+            for t in range(tick + 1, len(count)):
+                if count[t]:
+                    return t
+        return NULL
+
+    def cancel(self, slot: int):
+        """
+        Cancel a resting order by slot id.
+
+        Raises:
+            KeyError: If no order rests in the slot, such as one already filled or cancelled.
+        """
+        if not 0 <= slot < len(self._live) or not self._live[slot]:
+            raise KeyError(f"No resting order in slot {slot}")
+        side = self._side[slot]
+        self._level_qty[side][self._tick[slot]] -= self._qty[slot]
+        self._unlink(slot)
+
+    def match(self, side: int, quantity: float, limit: Optional[int] = None) -> Tuple[List[Tuple[int, int, float]], float]:
+        """
+        Match an incoming order against the opposite side, best price first and FIFO within a level.
+
+        Args:
+            side (int): The side of the incoming order, `BID` to buy or `ASK` to sell.
+            quantity (float): The quantity to match.
+            limit (int): Optional worst tick to match at.
+
+        Returns:
+            Tuple[List[Tuple[int, int, float]], float]: The fills as (resting slot, tick, quantity),
+                and the quantity left unmatched.
+        """
+        fills = []
+        book = ASK if side == BID else BID
+        head = self._head[book]
+        level_qty = self._level_qty[book]
+        qty = self._qty
+        nxt = self._next
+
+        while quantity > 0:
+            tick = self.best_ask if book == ASK else self.best_bid
+            if tick == NULL or (limit is not None and (tick > limit if book == ASK else tick < limit)):
+                break
+            slot = head[tick]
+            while slot != NULL and quantity > 0:
+                resting = qty[slot]
+                following = nxt[slot]
+                if resting <= quantity:
+                    fills.append((slot, tick, resting))
+                    quantity -= resting
+                    level_qty[tick] -= resting
+                    self._unlink(slot)
+                else:
+                    fills.append((slot, tick, quantity))
+                    qty[slot] = resting - quantity
+                    level_qty[tick] -= quantity
+                    quantity = 0
+                slot = following
+
+        return fills, quantity
+
+    def level(self, side: int, tick: int) -> Tuple[float, int]:
+        """
+        Get the total quantity and order count resting at a tick.
+        """
+        if tick < 0 or tick >= len(self._head[BID]):
+            return 0.0, 0
+        return self._level_qty[side][tick], self._level_count[side][tick]
+
+    def levels(self, side: int, n_levels: int) -> List[Tuple[int, float, int]]:
+        """
+        Get up to `n_levels` non-empty levels of a side, best first, as (tick, quantity, count).
+        """
+        count = self._level_count[side]
+        level_qty = self._level_qty[side]
+        result = []
+        tick = self.best_bid if side == BID else self.best_ask
+        step = -1 if side == BID else 1
+        end = -1 if side == BID else len(count)
+        if tick == NULL:
+            return result
+        for t in range(tick, end, step):
+            if count[t]:
+                result.append((t, level_qty[t], count[t]))
+                if len(result) == n_levels:
+                    break
+        return result
+
+    # endregion
+
+    # region Order API
+
+    @staticmethod
+    def _side_of(side: Side) -> int:
+        if side == Side.BUY:
+            return BID
+        if side == Side.SELL:
+            return ASK
+        raise ValueError("side must be Side.BUY or Side.SELL")
+
+    @staticmethod
+    def validate_order(order: Order):
+        if order.price <= 0:
+            raise ValueError("Price must be positive")
+        if order.quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        if order.side not in (Side.BUY, Side.SELL):
+            raise ValueError("side must be Side.BUY or Side.SELL")
+
+    def send_limit(self, order: Order):
+        self.validate_order(order)
+
+        tick = self.to_tick(order.price)
+        order.price = tick * self.tick_size
+        slot = self.add(self._side_of(order.side), tick, order.quantity, order.client)
+        self._objects[slot] = order
+        self.orders[order.uuid] = order
+        self._ids[order.uuid] = slot
+
+    def send_market(self, order: Order) -> List[Transaction]:
+        self.validate_order(order)
+
+        order.price = self.round(order.price)
+        side = self._side_of(order.side)
+        fills, remaining = self.match(side, order.quantity)
+
+        transactions = []
+        for slot, tick, quantity in fills:
+            resting = self._objects[slot]
+            client = self._client[slot]
+            if resting is not None:
+                resting.quantity -= quantity
+                if resting.quantity <= 0:
+                    self.orders.pop(resting.uuid, None)
+                    self._ids.pop(resting.uuid, None)
+            seller, buyer = (order.client, client) if side == ASK else (client, order.client)
+            transactions.append(Transaction(seller, buyer, tick * self.tick_size, quantity))
+        order.quantity = remaining
+        return transactions
+
+    def cancel_order(self, order_id):
+        if order_id not in self._ids:
+            raise KeyError(f"Order {order_id} not found")
+
+        self.cancel(self._ids.pop(order_id))
+        del self.orders[order_id]
+
+    def quantity(self, price: float, side: Side):
+        return self.level(self._side_of(side), self.to_tick(price))[0]
+
+    @property
+    def shape(self):
+        return self._n_levels[BID], self._n_levels[ASK]
+
+    def depth(self, n_levels, side: Side):
+        for tick, quantity, _ in self.levels(self._side_of(side), n_levels):
+            yield tick * self.tick_size, quantity
+
+    # endregion
@@ -71,3 +71,7 @@ class FillModelRegistry:
 
     def get(self, instrument: Instrument) -> FillModel:
         return self._by_instrument.get(instrument, self.default)
+
+    def has_overrides(self) -> bool:
+        """Whether any instrument is registered with its own model, instead of the default."""
+        return bool(self._by_instrument)
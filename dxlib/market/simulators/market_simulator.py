@@ -94,17 +94,22 @@ class MarketSimulator:
             inventory=starting_inventory
         )
 
-        self.next_event = self.event_process.sample(
-            0, self.dt, np.array(self.market_variables.events))
+        self.next_event = self.event_process.sample(0, self.dt)
         self.previous_event = 0
 
     def reset(self):
         self.bid_process.mean = self.risk_free_mean - self.spread_mean / 2 / self.dt
         self.ask_process.mean = self.risk_free_mean + self.spread_mean / 2 / self.dt
         self.lob = OrderBook(self.tick_size)
-        self.market_variables = MarketVariables()
+        self.market_variables = MarketVariables(
+            last_transaction=self.starting_value,
+            midprice=[self.starting_value],
+            risk_free_rate=self.risk_free_mean,
+            spread=self.spread_mean,
+        )
         self.user_variables = UserVariables()
-        self.next_event = self.event_process.sample(0, self.dt, np.array([]))
+        self.event_process.reset()
+        self.next_event = self.event_process.sample(0, self.dt)
 
     def fill(self, n):
         # generate n events to fill the order book
@@ -116,23 +121,15 @@ class MarketSimulator:
             self.market_variables.timestep += self.dt
 
     def midprice(self):
-        best_ask = self.lob.asks.bottom(
-        ).value.price if self.lob.asks.bottom() is not None else None
-        best_bid = self.lob.bids.top().value.price if self.lob.bids.top() is not None else None
-
-        if best_ask is not None and best_bid is not None:
-            return (best_ask + best_bid) / 2
+        midprice = self.lob.midprice
+        if midprice is not None:
+            return midprice
         # else, return mean of last 5 midprices
         return np.mean(self.market_variables.midprice[-5:])
 
     def spread(self):
-        best_ask = self.lob.asks.bottom(
-        ).value.price if self.lob.asks.bottom() is not None else None
-        best_bid = self.lob.bids.top().value.price if self.lob.bids.top() is not None else None
-
-        if best_ask is not None and best_bid is not None:
-            return best_ask - best_bid
-        return self.spread_mean
+        spread = self.lob.spread
+        return spread if spread is not None else self.spread_mean
 
     def _sample_orders(self, price):
         bid_size = self.event_size_distribution(self.event_size_mean)
@@ -175,16 +172,16 @@ class MarketSimulator:
                 existing_order = self.lob.orders.get(existing_order.uuid, None)
             if existing_order is None:
                 self.lob.send_order(ask)
-                self.user_variables["ask_order"] = ask
+                self.user_variables.ask_order = ask
             elif abs(existing_order.price - ask.price) > self.order_eps:
                 self.lob.cancel_order(existing_order.uuid)
                 self.lob.send_order(ask)
-                self.user_variables["ask_order"] = ask
+                self.user_variables.ask_order = ask
 
     def _participated_side(self, transaction):
-        if self.user_variables["bid_order"] and transaction.buyer == self.user_variables["bid_order"].uuid:
+        if self.user_variables.bid_order and transaction.buyer == self.user_variables.bid_order.uuid:
             return 'bid'
-        elif self.user_variables["ask_order"] and transaction.seller == self.user_variables["ask_order"].uuid:
+        elif self.user_variables.ask_order and transaction.seller == self.user_variables.ask_order.uuid:
             return 'ask'
         return None
 
@@ -210,8 +207,8 @@ class MarketSimulator:
         return transaction_pnl, delta_inventory
 
     def best(self, side):
-        best = self.lob.bids.top() if side == 'bid' else self.lob.asks.bottom()
-        return best.value.price if best is not None else self.midprice()
+        best = self.lob.best_bid if side == 'bid' else self.lob.best_ask
+        return best if best is not None else self.midprice()
 
     def virtual_pnl(self, pnl, quantity):
         # pnl + (inventory value - liquidation premium) -> liquidation premium assumes no large lob walking
@@ -221,7 +218,7 @@ class MarketSimulator:
         return pnl + liquidation_pnl
 
     def position(self):
-        return self.user_variables["inventory"] * self.midprice(), self.user_variables["cash"]
+        return self.user_variables.inventory * self.midprice(), self.user_variables.cash
 
     def step(self, action=None):
         transactions = []
@@ -231,42 +228,43 @@ class MarketSimulator:
             ask = OrderEngine.limit.ask(self.instrument, action[2], action[3])
             self.set_order(bid, ask)
 
-        if self.market_variables['timestep'] + self.dt >= self.next_event:
-            self.market_variables['events'].append(self.next_event)
+        if self.market_variables.timestep + self.dt >= self.next_event:
+            self.market_variables.events.append(self.next_event)
+            # the process keeps the recursive kernel state, so sampling does not go over the event history
+            self.event_process.update(self.next_event, self.dt)
             self.previous_event = self.next_event
             orders = self._sample_orders(self.midprice())
-            self.next_event = self.event_process.sample(self.market_variables['timestep'], self.dt,
-                                                        np.array(self.market_variables['events']))
+            self.next_event = self.event_process.sample(self.market_variables.timestep, self.dt)
             np.random.shuffle(orders)
             for order in orders:
                 transactions += self.lob.send_order(order)
 
-            self.market_variables['timestep'] = self.next_event
+            self.market_variables.timestep = self.next_event
         else:
-            self.market_variables['timestep'] += self.dt
+            self.market_variables.timestep += self.dt
 
-        self.market_variables['midprice'].append(self.midprice())
-        self.market_variables['risk_free_rate'] = self.risk_free_process.sample(self.market_variables['risk_free_rate'],
+        self.market_variables.midprice.append(self.midprice())
+        self.market_variables.risk_free_rate = self.risk_free_process.sample(self.market_variables.risk_free_rate,
                                                                                 self.dt)
-        self.market_variables['spread'] = self.spread_process.sample(
-            self.market_variables['spread'], self.dt)
-        self.ask_process.mean = float(self.market_variables['risk_free_rate'] + \
-            self.market_variables['spread'] / 2)
-        self.bid_process.mean = float(self.market_variables['risk_free_rate'] - \
-            self.market_variables['spread'] / 2)
+        self.market_variables.spread = self.spread_process.sample(
+            self.market_variables.spread, self.dt)
+        self.ask_process.mean = float(self.market_variables.risk_free_rate + \
+            self.market_variables.spread / 2)
+        self.bid_process.mean = float(self.market_variables.risk_free_rate - \
+            self.market_variables.spread / 2)
 
         transaction_pnl = 0
         if transactions:
             transaction_pnl, delta_inventory = self._calculate_pnl(
                 transactions)
-            self.user_variables["cash"] += transaction_pnl
-            self.user_variables["inventory"] += delta_inventory
+            self.user_variables.cash += transaction_pnl
+            self.user_variables.inventory += delta_inventory
 
         return transactions, self.position(), transaction_pnl
 
     @property
     def market_timestep(self):
-        return self.market_variables['timestep']
+        return self.market_variables.timestep
 
 
 if __name__ == "__main__":
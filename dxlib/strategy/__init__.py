@@ -4,6 +4,7 @@ from . import views
 from . import rule
 
 from .executor import Executor
+from .sweep import Sweep
 from .order_generator import  OrderGenerator
 from .strategy import *
 from .context import *
@@ -1,10 +1,15 @@
 from typing import Tuple, Callable, Iterator, Optional
 
+import numpy as np
+import pandas as pd
+
 from dxlib.core.portfolio import PortfolioHistory
 from dxlib.history import History, HistoryView, HistorySchema
+from .signal import SignalStrategy
 from .strategy import Strategy
 from ..interfaces import TradingInterface
-from ..market import OrderTransaction
+from ..market import OrderTransaction, Size, SizeType
+from ..market.simulators.fill_model import ImmediateMarketFillModel
 
 
 class Executor:
@@ -60,13 +65,13 @@ class Executor:
             ) -> Tuple[History, PortfolioHistory]:
         input_schema = self.strategy.output_schema(history_view.history_schema(self.market.history_schema()))
         output_schema = self.output_schema(input_schema)
-        result = History(output_schema)
+        result = History(output_schema, columnar=True)
         portfolio_history = PortfolioHistory(result.history_schema.copy().index)
 
         if history is None:
             if (observation := next(observer, None)) is None:
                 return History(history_schema=output_schema), PortfolioHistory(output_schema.index.copy())
-            history = observation.copy()
+            history = History(observation.history_schema, observation.data.copy(), columnar=True)
             result = result.concat(
                 self._execute(observation, history, history_view)
             )
@@ -79,3 +84,119 @@ class Executor:
             portfolio_history.update(observation.data.index, self.account.portfolio())
 
         return result, portfolio_history
+
+    def run_vectorized(self,
+                       history_view: HistoryView,
+                       history: Optional[History] = None,
+                       ) -> Tuple[History, PortfolioHistory]:
+        """
+        Backtest over the whole history at once, instead of observation by observation.
+
+        Signals and orders are generated once over the full panel. Orders are filled at each timestamp's price,
+        sized against the equity at that timestamp, which is the only state carried from one timestamp to the next.
+        The result matches `run` with one observation per timestamp, where the strategy sees the history up to
+        and including each observation.
+
+        Only `SignalStrategy` instances with a stateless `SignalGenerator`, traded on a backtest interface
+        with immediate market fills, can be run this way.
+
+        Args:
+            history_view (HistoryView): The view to generate signals and prices with. Must have a `time_index`.
+            history (History): The history to backtest over. Defaults to the interface history.
+
+        Returns:
+            Tuple[History, PortfolioHistory]: The filled transactions and the portfolio after each timestamp.
+        """
+        strategy = self.strategy
+        if not isinstance(strategy, SignalStrategy) or not strategy.signal_generator.stateless:
+            raise ValueError("Vectorized runs require a SignalStrategy with a stateless SignalGenerator.")
+        fill_registry = getattr(self.interface.order, "fill_registry", None)
+        if fill_registry is None or fill_registry.has_overrides() \
+                or not isinstance(fill_registry.default, ImmediateMarketFillModel):
+            raise ValueError("Vectorized runs require a backtest interface with immediate market fills.")
+
+        history = history if history is not None else self.interface.history
+        input_schema = strategy.output_schema(history_view.history_schema(self.market.history_schema()))
+        output_schema = self.output_schema(input_schema)
+        if len(history) == 0:
+            return History(history_schema=output_schema), PortfolioHistory(output_schema.index.copy())
+
+        # price panel, timestamps x instruments, carrying the last known price forward
+        time_index = history_view.time_index
+        times = history.level_index(time_index).keys
+        time_codes = times.get_indexer(history.level_values(time_index))
+        instrument_codes, instruments = pd.factorize(history.level_values("instrument"))
+        prices, _ = history_view.price(history)
+        panel = np.full((len(times), len(instruments)), np.nan)
+        panel[time_codes, instrument_codes] = prices.to_numpy(dtype=float)
+        panel = pd.DataFrame(panel).ffill().to_numpy()
+
+        orders = strategy.execute(history, history, history_view)
+        orders_by_time = orders.level_index(time_index)
+        order_time_codes = times.get_indexer(orders_by_time.keys)
+        order_data = orders.data.to_numpy()
+        if orders_by_time.order is not None:
+            order_data = order_data[orders_by_time.order]
+        positions_of = {instrument: i for i, instrument in enumerate(instruments)}
+
+        portfolio = self.account.portfolio()
+        base = self.interface.order_engine.default_leg
+        cash = float(portfolio.get(base)) if base in portfolio.securities else 0.0
+        positions = np.zeros(len(instruments))
+        for instrument in portfolio.securities:
+            if instrument == base:
+                continue
+            if instrument not in positions_of:
+                raise ValueError(f"Missing prices for: {instrument}")
+            positions[positions_of[instrument]] = portfolio.get(instrument)
+
+        transactions = {}
+        quantities = np.empty((len(times), len(instruments)))
+        balances = np.empty(len(times))
+        for t in range(len(times)):
+            k = np.searchsorted(order_time_codes, t)
+            if k < len(order_time_codes) and order_time_codes[k] == t:
+                filled = [order for order in order_data[orders_by_time.offsets[k]:orders_by_time.offsets[k + 1]].ravel()
+                          if order is not None and not order.is_none()]
+                codes = np.array([positions_of[order.instrument] for order in filled], dtype=np.intp)
+                sides = np.array([order.side.value for order in filled], dtype=float)
+                price = panel[t, codes]
+                equity = cash + np.nansum(positions * panel[t])
+
+                size = np.empty(len(filled))
+                for j, order in enumerate(filled):
+                    if not isinstance(order.quantity, Size):
+                        size[j] = float(order.quantity)
+                    elif order.quantity.kind == SizeType.PercentOfEquity:
+                        size[j] = order.quantity.value * equity / price[j]
+                    elif order.quantity.kind == SizeType.Absolute:
+                        size[j] = float(order.quantity.value)
+                    else:
+                        raise NotImplementedError()
+
+                amount = sides * size
+                np.add.at(positions, codes, amount)
+                cash -= float(np.sum(amount * price))
+                transactions.update({
+                    order.uuid: OrderTransaction(order, price[j], size[j]) for j, order in enumerate(filled)
+                })
+            quantities[t] = positions
+            balances[t] = cash
+
+        # portfolio after each timestamp, with the base leg first and zero positions dropped
+        quantities = pd.DataFrame(
+            np.column_stack([balances, quantities]),
+            index=pd.Index(times, name=time_index),
+            columns=pd.Index([base, *instruments], name="instrument"),
+        ).stack()
+        quantities = quantities.loc[quantities != 0].to_frame("quantity")
+        portfolio_history = PortfolioHistory(output_schema.index.copy(), quantities)
+
+        result = History(
+            output_schema,
+            orders.data.map(lambda order: transactions.get(order.uuid) if order is not None else None).dropna(),
+        )
+
+        held = pd.Series(np.append(cash, positions), index=[base, *instruments], dtype=float)
+        portfolio.quantities = held.loc[held != 0]
+        return result, portfolio_history
@@ -1,5 +1,7 @@
 from typing import List
 
+import pandas as pd
+
 from dxlib.core import Portfolio
 from dxlib.history import History, HistorySchema
 from dxlib.market import OrderEngine, Order, Side
@@ -9,24 +11,31 @@ class OrderGenerator:
     def __init__(self, percent=0.05):
         self.percent = percent
 
-    def to_order(self, row):
-        return row.drop("instrument").map(
-            lambda v: None if Side.from_signal(v) is Side.NONE
-            else OrderEngine.market.percent_of_equity(row["instrument"], self.percent, Side.from_signal(v))
-        )
-
     def generate(self, signals: History) -> History:
-        columns = signals.columns
-        if 'instrument' not in signals.columns and 'instrument' in signals.indices:
-            signals['instrument'] = signals.level_values('instrument')
-        assert "instrument" in signals, ("This OrderGenerator requires a instruments per signal. "
-                                          "Try passing with `signals.reset_index('instruments')` if 'instruments' is in the index.")
-        orders = signals.apply([(self.to_order, (), {"axis":1}), (lambda x: x.dropna(),)],
-                               output_schema=HistorySchema(
-                                   index=signals.history_schema.index.copy(),
-                                   columns={key: Order for key in columns if key != "instrument"},
-                               ))
-        return orders
+        columns = [key for key in signals.columns if key != "instrument"]
+        if "instrument" in signals.columns:
+            instruments = signals["instrument"]
+        elif "instrument" in signals.indices:
+            instruments = signals.level_values("instrument")
+        else:
+            raise AssertionError("This OrderGenerator requires a instruments per signal. "
+                                 "Try passing with `signals.reset_index('instruments')` if 'instruments' is in the index.")
+
+        orders = pd.DataFrame({
+            column: [
+                None if side is Side.NONE else OrderEngine.market.percent_of_equity(instrument, self.percent, side)
+                for instrument, side in zip(instruments, map(Side.from_signal, signals[column]))
+            ]
+            for column in columns
+        }, index=signals.index, columns=columns)
+
+        return History(
+            HistorySchema(
+                index=signals.history_schema.index.copy(),
+                columns={key: Order for key in columns},
+            ),
+            orders.dropna(),
+        )
 
     def from_target(self, current: Portfolio, target: Portfolio) -> List[Order]:
         orders = []
@@ -5,10 +5,10 @@ Public API
 ──────────
 from rule import (
     # Types
-    LOBSnapshot, Level, Order, OrderSide, OrderType, DType,
+    LOBSnapshot, LOBBatch, Level, Order, OrderSide, OrderType, DType,
 
     # Base
-    Node, Context, Graph, StrategyRunner,
+    Node, Context, Graph, StrategyRunner, MultiRunner, ExecutionPlan,
 
     # Source nodes
     LOBSource, LevelExtractor, Constant, TickCounter,
@@ -34,7 +34,7 @@ from rule import (
 """
 
 from .types import (
-    DType, Level, LOBSnapshot,
+    DType, Level, LOBSnapshot, LOBBatch,
     Order, OrderSide, OrderType,
     Port, PortDirection,
 )
@@ -48,15 +48,17 @@ from .nodes import (
     RollingWindow, EWMA, Crossover,
     LimitOrderGen, MarketOrderGen, CancelOrderGen, QuoteGen,
 )
+from .plan import ExecutionPlan
 from .graph import Edge, Graph, StrategyRunner
+from .multi import MultiRunner
 
 __all__ = [
     # Types
-    "DType", "Level", "LOBSnapshot",
+    "DType", "Level", "LOBSnapshot", "LOBBatch",
     "Order", "OrderSide", "OrderType",
     "Port", "PortDirection",
     # Base
-    "Node", "Context", "Graph", "Edge", "StrategyRunner",
+    "Node", "Context", "Graph", "Edge", "StrategyRunner", "MultiRunner", "ExecutionPlan",
     "input_port", "output_port",
     # Nodes
     "LOBSource", "LevelExtractor", "Constant", "TickCounter",
@@ -10,20 +10,23 @@ Graph
   Runs a single tick: creates a Context, evaluates all sink nodes
   (pull-based - upstream nodes are evaluated on demand via the cache),
   returns the Context (with orders, variable state, etc.).
+  compile() freezes the same evaluation into an ExecutionPlan (plan.py).
 
 StrategyRunner
 ──────────────
   Wraps a Graph and maintains persistent variable state across ticks.
-  Single public method: step(lob_snapshot) → list[Order].
+  Single public method: step(lob_snapshot) → list[Order], which runs the
+  graph's compiled plan - or run_batch(snapshots) for a block of ticks.
 """
 import json
 import logging
 from collections import defaultdict, deque
-from typing import Any, Optional
+from typing import Any, Optional, Sequence, Union
 
 from .node import Context, Node
 from .nodes import LOBSource
-from .types import LOBSnapshot, Order
+from .plan import ExecutionPlan
+from .types import LOBBatch, LOBSnapshot, Order
 
 
 # ---------------------------------------------------------------------------
@@ -84,6 +87,8 @@ class Graph:
         self._nodes: dict[str, Node] = {}
         self._edges: list[Edge] = []
         self.logger = logger if logger is not None else logging.getLogger()
+        # Compiled plan, dropped whenever nodes or edges change
+        self._plan: Optional[ExecutionPlan] = None
 
     # ------------------------------------------------------------------
     # Node management
@@ -94,6 +99,7 @@ class Graph:
         if node.node_id in self._nodes:
             raise ValueError(f"Node {node.node_id!r} is already in this graph.")
         self._nodes[node.node_id] = node
+        self._plan = None
         return node
 
     def remove(self, node: Node) -> None:
@@ -103,6 +109,7 @@ class Graph:
             if e.src_node is not node and e.dst_node is not node
         ]
         self._nodes.pop(node.node_id, None)
+        self._plan = None
 
     @property
     def nodes(self) -> list[Node]:
@@ -132,12 +139,14 @@ class Graph:
 
         edge = Edge(src_node, src_port, dst_node, dst_port)
         self._edges.append(edge)
+        self._plan = None
         return edge
 
     def disconnect(self, edge: Edge) -> None:
         self._edges.remove(edge)
         # Unwire from destination node
         edge.dst_node._wiring.pop(edge.dst_port, None)
+        self._plan = None
 
     def edges_from(self, node: Node) -> list[Edge]:
         return [e for e in self._edges if e.src_node is node]
@@ -305,6 +314,21 @@ class Graph:
 
         return ctx
 
+    def compile(self) -> ExecutionPlan:
+        """
+        Freeze the two-pass evaluation of ``run_tick`` into an ExecutionPlan.
+
+        The plan evaluates the same nodes in the same order with the same
+        deferred Variable writes, but as a flat list of steps over integer
+        value slots, with inputs bound at compile time and no per-tick
+        validation or logging.
+
+        The plan is cached until the graph's nodes or edges change.
+        """
+        if self._plan is None:
+            self._plan = ExecutionPlan.build(self.sink_nodes())
+        return self._plan
+
     # ------------------------------------------------------------------
     # Serialisation
     # ------------------------------------------------------------------
@@ -364,6 +388,7 @@ class StrategyRunner:
         self.metadata = metadata or {}
         self._variables: dict[str, Any] = {}
         self._tick_index: int = 0
+        self._ctx: Optional[Context] = None
 
         if validate:
             warnings = graph.validate()
@@ -384,21 +409,51 @@ class StrategyRunner:
         list[Order]
             Orders to submit to the exchange this tick.
         """
-        ctx = self.graph.run_tick(
-            lob,
+        ctx = self._ctx
+        if ctx is None:
+            # Shares self._variables, so variable state persists across ticks
+            ctx = self._ctx = Context(lob, self._tick_index, self._variables, self.metadata)
+        else:
+            ctx.next_tick(lob, self._tick_index)
+
+        self.graph.compile().run(ctx)
+        self._tick_index += 1
+        return ctx.orders
+
+    def run_batch(self, snapshots: Union[LOBBatch, Sequence[LOBSnapshot]]) -> list[list[Order]]:
+        """
+        Advance one tick per snapshot, evaluating the graph column-wise.
+
+        Stateless (VECTORIZED) nodes are evaluated once over the whole
+        block; stateful nodes are scanned tick by tick. Equivalent to
+        calling ``step`` on each snapshot in turn.
+
+        Parameters
+        ----------
+        snapshots : LOBBatch | Sequence[LOBSnapshot]
+            Columnar block of top-of-book fields, or snapshots to convert
+            into one.
+
+        Returns
+        -------
+        list[list[Order]]
+            Orders to submit, per tick.
+        """
+        batch = snapshots if isinstance(snapshots, LOBBatch) else LOBBatch.from_snapshots(snapshots)
+        orders = self.graph.compile().run_batch(
+            batch,
             tick_index=self._tick_index,
             variables=self._variables,
             metadata=self.metadata,
         )
-        # Persist variable state for next tick
-        self._variables = ctx.variables
-        self._tick_index += 1
-        return ctx.orders
+        self._tick_index += len(batch)
+        return orders
 
     def reset(self) -> None:
         """Reset all stateful variable to their initial values."""
         self._variables = {}
         self._tick_index = 0
+        self._ctx = None
 
     @property
     def tick_index(self) -> int:
@@ -0,0 +1,270 @@
+"""
+Running many strategy graphs against the same LOB stream.
+
+MultiRunner
+───────────
+  Evaluates N graphs per tick - typically parameterisations of the same
+  strategy - as one merged ExecutionPlan. Nodes that compute the same thing
+  in different graphs (same type, same parameters, equivalent inputs) are
+  evaluated once and shared: every graph's LOBSource, an EWMA(span=20) on
+  the mid that all of them use, and so on.
+
+  With ``processes``, the graphs are split across worker processes, each
+  running a MultiRunner of its own over its share of the graphs.
+
+Sharing rules
+─────────────
+  Two nodes are merged when their type, public attributes (parameters) and
+  input wiring are equal, recursively. Variables and order generators are
+  never merged: Variables close cross-tick loops that belong to one graph,
+  and each graph needs its own orders.
+"""
+import multiprocessing
+from typing import Any, Hashable, Optional, Sequence, Union
+
+from .graph import Graph
+from .node import Context, Node
+from .nodes import Variable, BoolVariable
+from .plan import ExecutionPlan
+from .types import LOBBatch, LOBSnapshot, Order
+
+# Attributes that identify a node rather than parameterise it
+_IDENTITY_ATTRS = ("node_id", "label", "INPUT_PORTS", "OUTPUT_PORTS")
+
+
+def _signature(node: Node, memo: dict[Node, Hashable]) -> Hashable:
+    """Structural key of a node - equal keys compute equal outputs."""
+    if node in memo:
+        return memo[node]
+    if isinstance(node, (Variable, BoolVariable)) or node.CATEGORY == "order":
+        key = ("unshared", id(node))
+    else:
+        params = tuple(sorted(
+            (name, repr(value)) for name, value in vars(node).items()
+            if not name.startswith("_") and name not in _IDENTITY_ATTRS
+        ))
+        wiring = tuple(sorted(
+            (port, _signature(src, memo), out) for port, (src, out) in node._wiring.items()
+        ))
+        key = (type(node), params, wiring)
+    memo[node] = key
+    return key
+
+
+def merge_graphs(graphs: Sequence[Graph]) -> ExecutionPlan:
+    """
+    Compile several graphs into one ExecutionPlan, sharing their common
+    subexpressions. The plan's owners are the indices of ``graphs``.
+    """
+    memo: dict[Node, Hashable] = {}
+    shared: dict[Hashable, Node] = {}
+    canonical: dict[Node, Node] = {}
+    owners: dict[str, set[int]] = {}
+
+    for g, graph in enumerate(graphs):
+        graph.compile()  # surfaces unconnected required ports per graph
+        for node in graph.nodes:
+            rep = canonical[node] = shared.setdefault(_signature(node, memo), node)
+            owners.setdefault(rep.node_id, set()).add(g)
+
+    ids = [node.node_id for node in shared.values()]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Graphs share node ids between different nodes - node ids must be unique.")
+
+    sinks = [sink for graph in graphs for sink in graph.sink_nodes()]
+    plan = ExecutionPlan.build(
+        sinks,
+        canonical=canonical.__getitem__,
+        owners={node_id: tuple(sorted(gs)) for node_id, gs in owners.items()},
+    )
+    plan.n_owners = len(graphs)
+    return plan
+
+
+def _serve(conn, graphs: list[Graph], symbol: str, metadata: Optional[dict[str, Any]]) -> None:
+    """Worker process loop: run requests against this worker's graphs."""
+    runner = MultiRunner(graphs, symbol=symbol, metadata=metadata, validate=False)
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        method, args = request
+        try:
+            conn.send((True, getattr(runner, method)(*args)))
+        except Exception as e:
+            conn.send((False, e))
+    conn.close()
+
+
+class MultiRunner:
+    """
+    StrategyRunner over several graphs at once.
+
+    ``step`` and ``run_batch`` return one order list per graph, in the
+    order the graphs were given - each identical to what a StrategyRunner
+    of that graph alone would return.
+
+    Example
+    -------
+    graphs = [mean_reversion_graph(window=w) for w in (10, 20, 50, 100)]
+    with MultiRunner(graphs, processes=4) as runner:
+        orders = runner.run_batch(snapshots)   # orders[g][t]
+
+    With ``processes``, graphs are sent to worker processes, so with the
+    spawn or forkserver start methods they must be picklable. Use as a
+    context manager, or call ``start`` and ``close``.
+    """
+
+    def __init__(
+            self,
+            graphs: Sequence[Graph],
+            symbol: str = "SIM",
+            metadata: Optional[dict[str, Any]] = None,
+            validate: bool = True,
+            processes: Optional[int] = None,
+            context: Optional[str] = None,
+    ) -> None:
+        self.graphs = list(graphs)
+        self.symbol = symbol
+        self.metadata = metadata or {}
+        self.processes = min(processes, len(self.graphs)) if processes and processes > 1 else None
+        self._context = multiprocessing.get_context(context)
+
+        self._variables: dict[str, Any] = {}
+        self._tick_index: int = 0
+        self._ctx: Optional[Context] = None
+        self._plan: Optional[ExecutionPlan] = None
+        # plans of the individual graphs the merged plan was built from
+        self._compiled: list[ExecutionPlan] = []
+
+        # (process, connection, graph indices) per worker
+        self._workers: list[tuple[Any, Any, list[int]]] = []
+
+        if validate:
+            for graph in self.graphs:
+                for w in graph.validate():
+                    print(w)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "MultiRunner":
+        """Start the worker processes. A no-op without ``processes``."""
+        if self.processes is None or self._workers:
+            return self
+        for w in range(self.processes):
+            indices = list(range(w, len(self.graphs), self.processes))
+            conn, child = self._context.Pipe()
+            process = self._context.Process(
+                target=_serve,
+                args=(child, [self.graphs[i] for i in indices], self.symbol, self.metadata),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._workers.append((process, conn, indices))
+        return self
+
+    def close(self) -> None:
+        for process, conn, _ in self._workers:
+            conn.send(None)
+            process.join()
+            conn.close()
+        self._workers = []
+
+    def __enter__(self) -> "MultiRunner":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _call(self, method: str, *args) -> list:
+        """Run a method on every worker, and reassemble the per-graph results."""
+        if not self._workers:
+            raise RuntimeError("MultiRunner is not started")
+        for _, conn, _ in self._workers:
+            conn.send((method, args))
+
+        results: list = [None] * len(self.graphs)
+        error = None
+        for _, conn, indices in self._workers:
+            ok, result = conn.recv()
+            if not ok:
+                error = error or result
+                continue
+            if result is not None:
+                for i, graph_result in zip(indices, result):
+                    results[i] = graph_result
+        if error is not None:
+            raise error
+        return results
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        """Merged plan of all graphs, rebuilt when any of them changes."""
+        compiled = [graph.compile() for graph in self.graphs]
+        if self._plan is None or any(a is not b for a, b in zip(compiled, self._compiled)):
+            self._plan = merge_graphs(self.graphs)
+            self._compiled = compiled
+        return self._plan
+
+    def step(self, lob: LOBSnapshot) -> list[list[Order]]:
+        """
+        Advance one tick.
+
+        Returns
+        -------
+        list[list[Order]]
+            Orders to submit this tick, per graph.
+        """
+        if self.processes is not None:
+            orders = self._call("step", lob)
+        else:
+            ctx = self._ctx
+            if ctx is None:
+                ctx = self._ctx = Context(lob, self._tick_index, self._variables, self.metadata)
+            else:
+                ctx.next_tick(lob, self._tick_index)
+            orders = self.plan.run_owned(ctx)
+        self._tick_index += 1
+        return orders
+
+    def run_batch(self, snapshots: Union[LOBBatch, Sequence[LOBSnapshot]]) -> list[list[list[Order]]]:
+        """
+        Advance one tick per snapshot, as StrategyRunner.run_batch.
+
+        Returns
+        -------
+        list[list[list[Order]]]
+            Orders to submit, per graph and then per tick.
+        """
+        batch = snapshots if isinstance(snapshots, LOBBatch) else LOBBatch.from_snapshots(snapshots)
+        if self.processes is not None:
+            orders = self._call("run_batch", batch)
+        else:
+            orders = self.plan.run_batch(
+                batch,
+                tick_index=self._tick_index,
+                variables=self._variables,
+                metadata=self.metadata,
+                by_owner=True,
+            )
+        self._tick_index += len(batch)
+        return orders
+
+    def reset(self) -> None:
+        """Reset all stateful variables to their initial values."""
+        if self._workers:
+            self._call("reset")
+        self._variables = {}
+        self._tick_index = 0
+        self._ctx = None
+
+    @property
+    def tick_index(self) -> int:
+        return self._tick_index
@@ -55,6 +55,14 @@ class Context:
         self.orders:    list[Order]     = []
         self.metadata:  dict[str, Any]  = metadata if metadata is not None else {}
 
+    def next_tick(self, lob: LOBSnapshot, tick_index: int) -> None:
+        """Reuse this context for a new tick, keeping variables and metadata."""
+        self.lob        = lob
+        self.tick_index = tick_index
+        self.timestamp  = lob.timestamp
+        self._cache     = {}
+        self.orders     = []
+
     # ------------------------------------------------------------------
     # Cache helpers (used by Node.evaluate)
     # ------------------------------------------------------------------
@@ -194,7 +202,24 @@ class Node(abc.ABC):
         if ctx.has_result(self.node_id):
             return ctx.get_result(self.node_id)
 
-        # Resolve all inputs
+        result = self._compute(ctx, self._resolve_inputs(ctx))
+
+        # Validate outputs are complete
+        for port in self.OUTPUT_PORTS:
+            if port.name not in result:
+                raise RuntimeError(
+                    f"Node {self.label!r}: _compute did not produce output {port.name!r}."
+                )
+
+        ctx.set_result(self.node_id, result)
+        logger.info(f"Node {self.label} outputted {result}")
+        return result
+
+    def _resolve_inputs(self, ctx: Context) -> dict[str, Any]:
+        """
+        Pull every input port's value from its upstream node, falling back
+        to ``Port.default`` for unconnected optional ports.
+        """
         resolved: dict[str, Any] = {}
         for port in self.INPUT_PORTS:
             if port.name in self._wiring:
@@ -207,19 +232,7 @@ class Node(abc.ABC):
                 raise RuntimeError(
                     f"Node {self.label!r}: required input port {port.name!r} is not connected."
                 )
-
-        result = self._compute(ctx, resolved)
-
-        # Validate outputs are complete
-        for port in self.OUTPUT_PORTS:
-            if port.name not in result:
-                raise RuntimeError(
-                    f"Node {self.label!r}: _compute did not produce output {port.name!r}."
-                )
-
-        ctx.set_result(self.node_id, result)
-        logger.info(f"Node {self.label} outputted {result}")
-        return result
+        return resolved
 
     @abc.abstractmethod
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
@@ -231,6 +244,20 @@ class Node(abc.ABC):
         Do not cache results here - the base class handles caching.
         """
 
+    # Stateless nodes set this and implement _compute_batch, so that
+    # StrategyRunner.run_batch evaluates them over all ticks at once
+    VECTORIZED: bool = False
+
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        """
+        Vectorized ``_compute`` over a block of ticks.
+
+        Inputs are equal-length columns (one value per tick); outputs are
+        numpy arrays of the same length, or scalars broadcast to every tick.
+        ``ctx.lob`` is the LOBBatch and ``ctx.tick_index`` an array.
+        """
+        raise NotImplementedError
+
     # ------------------------------------------------------------------
     # Serialisation stub (for graph XML round-trip)
     # ------------------------------------------------------------------
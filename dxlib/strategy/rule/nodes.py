@@ -17,8 +17,11 @@ base class handles caching + input resolution (see node.py).
 import math
 import operator
 from collections import deque
+from dataclasses import dataclass, field
 from typing import Any, Callable, Optional
 
+import numpy as np
+
 from .types import DType, LOBSnapshot, Order, OrderSide, OrderType
 from .node import Node, Context, input_port, output_port
 
@@ -35,6 +38,7 @@ class LOBSource(Node):
     """
 
     CATEGORY = "source"
+    VECTORIZED = True
     INPUT_PORTS = []
     OUTPUT_PORTS = [
         output_port("lob",        DType.LOB,   doc="Full LOB snapshot"),
@@ -68,6 +72,12 @@ class LOBSource(Node):
             "tick_index": ctx.tick_index,
         }
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        # Same fields, read off the LOBBatch columns
+        result = self._compute(ctx, inputs)
+        result["lob"] = ctx.lob.snapshots
+        return result
+
 
 class LevelExtractor(Node):
     """
@@ -113,6 +123,7 @@ class Constant(Node):
     """Emits a fixed scalar value every tick. Useful for thresholds."""
 
     CATEGORY = "source"
+    VECTORIZED = True
     INPUT_PORTS  = []
     OUTPUT_PORTS = [output_port("value", DType.FLOAT)]
 
@@ -124,6 +135,8 @@ class Constant(Node):
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         return {"value": self.value}
 
+    _compute_batch = _compute
+
     def to_dict(self) -> dict:
         d = super().to_dict()
         d["params"] = {"value": self.value}
@@ -134,6 +147,7 @@ class TickCounter(Node):
     """Outputs current tick_index mod period - useful for periodic logic."""
 
     CATEGORY = "source"
+    VECTORIZED = True
     INPUT_PORTS  = []
     OUTPUT_PORTS = [
         output_port("tick",   DType.INT),
@@ -150,6 +164,8 @@ class TickCounter(Node):
             "period_hit": (ctx.tick_index % self.period) == 0,
         }
 
+    _compute_batch = _compute
+
 
 # ===========================================================================
 # Variable nodes - cross-tick stateful storage
@@ -184,14 +200,14 @@ class Variable(Node):
         self.initial   = initial
         self._prev_key = f"{self.node_id}__prev"
 
-    def evaluate(self, ctx: Context) -> dict[str, Any]:
+    # Outputs rewritten by the deferred write (see ExecutionPlan)
+    DEFERRED_OUTPUTS: list[str] = []
+
+    def evaluate(self, ctx: Context, logger=None) -> dict[str, Any]:
         if ctx.has_result(self.node_id):
             return ctx.get_result(self.node_id)
 
-        current = ctx.get_var(self.node_id,    self.initial)
-        prev    = ctx.get_var(self._prev_key,  self.initial)
-
-        result = {"value": current, "prev": prev}
+        result = self._load(ctx, {})
         ctx.set_result(self.node_id, result)
 
         if not hasattr(ctx, "_deferred"):
@@ -201,22 +217,21 @@ class Variable(Node):
         return result
 
     def _deferred_write(self, ctx: Context) -> None:
-        current = ctx.get_var(self.node_id, self.initial)
-
-        new_val    = None
-        write_gate = True
-
-        if "update" in self._wiring:
-            src_node, src_out = self._wiring["update"]
-            new_val = src_node.evaluate(ctx).get(src_out)
+        self._store(ctx, self._resolve_inputs(ctx))
 
-        if "write_enable" in self._wiring:
-            src_node, src_out = self._wiring["write_enable"]
-            write_gate = src_node.evaluate(ctx).get(src_out, True)
+    def _load(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Outputs at the start of the tick - no inputs are read."""
+        return {
+            "value": ctx.get_var(self.node_id,   self.initial),
+            "prev":  ctx.get_var(self._prev_key, self.initial),
+        }
 
-        if new_val is not None and write_gate:
-            ctx.set_var(self._prev_key, current)
-            ctx.set_var(self.node_id,   new_val)
+    def _store(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Deferred write from resolved inputs. Returns the DEFERRED_OUTPUTS."""
+        if inputs["update"] is not None and inputs["write_enable"]:
+            ctx.set_var(self._prev_key, ctx.get_var(self.node_id, self.initial))
+            ctx.set_var(self.node_id,   inputs["update"])
+        return {}
 
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         raise NotImplementedError
@@ -272,7 +287,10 @@ class BoolVariable(Node):
         super().__init__(**kwargs)
         self.initial = initial
 
-    def evaluate(self, ctx: Context) -> dict[str, Any]:
+    # Outputs rewritten by the deferred write (see ExecutionPlan)
+    DEFERRED_OUTPUTS: list[str] = ["rose", "fell"]
+
+    def evaluate(self, ctx: Context, logger=None) -> dict[str, Any]:
         """
         Override: return the stored (prev-tick) value immediately without
         resolving upstream set/clear inputs.  The write is deferred.
@@ -280,11 +298,7 @@ class BoolVariable(Node):
         if ctx.has_result(self.node_id):
             return ctx.get_result(self.node_id)
 
-        current = ctx.get_var(self.node_id, self.initial)
-        # We don't know rose/fell yet (depends on writes that haven't happened)
-        # Emit preliminary result with no transition flags - deferred write will
-        # update ctx.variables for *next* tick.
-        result = {"value": current, "rose": False, "fell": False}
+        result = self._load(ctx, {})
         ctx.set_result(self.node_id, result)
 
         # Schedule the deferred write: resolve set/clear after main pass
@@ -296,30 +310,30 @@ class BoolVariable(Node):
 
     def _deferred_write(self, ctx: Context) -> None:
         """Called after main evaluation pass - resolve set/clear and persist."""
-        current = ctx.get_var(self.node_id, self.initial)
-        prev    = current
-
-        set_val   = None
-        clear_val = None
+        # Patch the already-cached result with transition flags
+        ctx.get_result(self.node_id).update(self._store(ctx, self._resolve_inputs(ctx)))
 
-        if "set" in self._wiring:
-            src_node, src_out = self._wiring["set"]
-            set_val = src_node.evaluate(ctx).get(src_out)
+    def _load(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        # We don't know rose/fell yet (depends on writes that haven't happened)
+        # Emit preliminary result with no transition flags - deferred write will
+        # update ctx.variables for *next* tick.
+        current = ctx.get_var(self.node_id, self.initial)
+        return {"value": current, "rose": False, "fell": False}
 
-        if "clear" in self._wiring:
-            src_node, src_out = self._wiring["clear"]
-            clear_val = src_node.evaluate(ctx).get(src_out)
+    def _store(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        prev    = ctx.get_var(self.node_id, self.initial)
+        current = prev
 
-        if set_val is True:
+        if inputs["set"] is True:
             current = True
-        if clear_val is True:
+        if inputs["clear"] is True:
             current = False
 
         ctx.set_var(self.node_id, current)
-        # Patch the already-cached result with transition flags
-        cached = ctx.get_result(self.node_id)
-        cached["rose"] = (not prev) and current
-        cached["fell"] = prev and (not current)
+        return {
+            "rose": (not prev) and current,
+            "fell": prev and (not current),
+        }
 
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         # Never called - evaluate() is overridden
@@ -342,6 +356,24 @@ _BINARY_OPS: dict[str, Callable] = {
 }
 
 
+def _where_zero(b: np.ndarray, result: np.ndarray) -> np.ndarray:
+    # Python raises ZeroDivisionError, which BinaryOp maps to NaN
+    return np.where(b == 0, np.nan, result)
+
+
+# Vectorized _BINARY_OPS, with the same min/max tie and NaN behaviour as the builtins
+_BATCH_BINARY_OPS: dict[str, Callable] = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": lambda a, b: _where_zero(b, a / b),
+    "mod": lambda a, b: _where_zero(b, np.mod(a, b)),
+    "pow": lambda a, b: np.where((a == 0) & (b < 0), np.nan, np.power(a, b)),
+    "min": lambda a, b: np.where(b < a, b, a),
+    "max": lambda a, b: np.where(b > a, b, a),
+}
+
+
 class BinaryOp(Node):
     """
     Two-input arithmetic operation.
@@ -349,6 +381,7 @@ class BinaryOp(Node):
     """
 
     CATEGORY = "math"
+    VECTORIZED = True
     INPUT_PORTS = [
         input_port("a", DType.FLOAT),
         input_port("b", DType.FLOAT),
@@ -370,12 +403,22 @@ class BinaryOp(Node):
         except ZeroDivisionError:
             return {"result": float("nan")}
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        a = np.asarray(inputs["a"], dtype=float)
+        b = np.asarray(inputs["b"], dtype=float)
+        with np.errstate(all="ignore"):
+            return {"result": _BATCH_BINARY_OPS[self.op](a, b)}
+
     def to_dict(self) -> dict:
         d = super().to_dict()
         d["params"] = {"op": self.op}
         return d
 
 
+def _sign(x):
+    return math.copysign(1.0, x)
+
+
 class UnaryOp(Node):
     """Unary math: abs | neg | sqrt | log | exp | floor | ceil | sign"""
 
@@ -388,7 +431,7 @@ class UnaryOp(Node):
         "exp":   math.exp,
         "floor": math.floor,
         "ceil":  math.ceil,
-        "sign":  lambda x: math.copysign(1.0, x),
+        "sign":  _sign,
     }
     INPUT_PORTS  = [input_port("x", DType.FLOAT)]
     OUTPUT_PORTS = [output_port("result", DType.FLOAT)]
@@ -416,6 +459,7 @@ class Clamp(Node):
     """Clamp a value to [lo, hi]. lo and hi can be wired or fixed."""
 
     CATEGORY = "math"
+    VECTORIZED = True
     INPUT_PORTS = [
         input_port("x",  DType.FLOAT),
         input_port("lo", DType.FLOAT, required=False, default=0.0),
@@ -426,6 +470,11 @@ class Clamp(Node):
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         return {"result": max(inputs["lo"], min(inputs["hi"], inputs["x"]))}
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        x, lo, hi = (np.asarray(inputs[k], dtype=float) for k in ("x", "lo", "hi"))
+        clipped = np.where(x < hi, x, hi)
+        return {"result": np.where(clipped > lo, clipped, lo)}
+
 
 class Select(Node):
     """
@@ -434,6 +483,7 @@ class Select(Node):
     """
 
     CATEGORY = "math"
+    VECTORIZED = True
     INPUT_PORTS = [
         input_port("condition", DType.BOOL),
         input_port("a",         DType.FLOAT, doc="Value when True"),
@@ -444,11 +494,24 @@ class Select(Node):
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         return {"result": inputs["a"] if inputs["condition"] else inputs["b"]}
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        condition = np.asarray(inputs["condition"], dtype=bool)
+        return {"result": np.where(condition, inputs["a"], inputs["b"])}
+
 
 # ===========================================================================
 # Condition nodes - boolean predicates
 # ===========================================================================
 
+_BATCH_CMP_OPS = {
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "lt": np.less,
+    "le": np.less_equal,
+    "eq": np.equal,
+    "ne": np.not_equal,
+}
+
 _CMP_OPS = {
     "gt": operator.gt,
     "ge": operator.ge,
@@ -466,6 +529,7 @@ class Compare(Node):
     """
 
     CATEGORY = "condition"
+    VECTORIZED = True
     INPUT_PORTS = [
         input_port("a",  DType.FLOAT),
         input_port("b",  DType.FLOAT),
@@ -482,6 +546,10 @@ class Compare(Node):
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         return {"result": self._fn(inputs["a"], inputs["b"])}
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        a, b = np.asarray(inputs["a"]), np.asarray(inputs["b"])
+        return {"result": _BATCH_CMP_OPS[self.op](a, b)}
+
     def to_dict(self) -> dict:
         d = super().to_dict()
         d["params"] = {"op": self.op}
@@ -533,6 +601,7 @@ class InRange(Node):
     """True when lo <= value <= hi (inclusive, both ends wirable)."""
 
     CATEGORY = "condition"
+    VECTORIZED = True
     INPUT_PORTS = [
         input_port("value", DType.FLOAT),
         input_port("lo",    DType.FLOAT, required=False, default=0.0),
@@ -543,6 +612,18 @@ class InRange(Node):
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         return {"result": inputs["lo"] <= inputs["value"] <= inputs["hi"]}
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        value = np.asarray(inputs["value"])
+        return {"result": (np.asarray(inputs["lo"]) <= value) & (value <= np.asarray(inputs["hi"]))}
+
+
+# Named rather than lambdas, so that nodes holding them can be pickled
+def _logic_and(a, b):  return a and b
+def _logic_or(a, b):   return a or b
+def _logic_nand(a, b): return not (a and b)
+def _logic_nor(a, b):  return not (a or b)
+def _logic_not(a, b):  return not a
+
 
 class LogicGate(Node):
     """
@@ -551,6 +632,7 @@ class LogicGate(Node):
     """
 
     CATEGORY = "condition"
+    VECTORIZED = True
     INPUT_PORTS = [
         input_port("a", DType.BOOL),
         input_port("b", DType.BOOL, required=False, default=False),
@@ -558,12 +640,20 @@ class LogicGate(Node):
     OUTPUT_PORTS = [output_port("result", DType.BOOL)]
 
     _OPS = {
-        "and":  lambda a, b: a and b,
-        "or":   lambda a, b: a or b,
-        "xor":  lambda a, b: a ^ b,
-        "nand": lambda a, b: not (a and b),
-        "nor":  lambda a, b: not (a or b),
-        "not":  lambda a, b: not a,
+        "and":  _logic_and,
+        "or":   _logic_or,
+        "xor":  operator.xor,
+        "nand": _logic_nand,
+        "nor":  _logic_nor,
+        "not":  _logic_not,
+    }
+    _BATCH_OPS = {
+        "and":  np.logical_and,
+        "or":   np.logical_or,
+        "xor":  np.logical_xor,
+        "nand": lambda a, b: ~np.logical_and(a, b),
+        "nor":  lambda a, b: ~np.logical_or(a, b),
+        "not":  lambda a, b: ~a,
     }
 
     def __init__(self, op: str = "and", **kwargs) -> None:
@@ -576,6 +666,11 @@ class LogicGate(Node):
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
         return {"result": self._fn(inputs["a"], inputs["b"])}
 
+    def _compute_batch(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
+        a = np.asarray(inputs["a"], dtype=bool)
+        b = np.asarray(inputs["b"], dtype=bool)
+        return {"result": self._BATCH_OPS[self.op](a, b)}
+
     def to_dict(self) -> dict:
         d = super().to_dict()
         d["params"] = {"op": self.op}
@@ -743,12 +838,28 @@ class StateMachine(Node):
 # Aggregator nodes - rolling window statistics
 # ===========================================================================
 
+@dataclass(slots=True)
+class _WindowState:
+    """RollingWindow state, kept in ctx.variables between ticks."""
+    buf:   list[float]                    # ring of the last ``window`` values
+    head:  int = 0                        # slot of the next write (the oldest value once full)
+    n:     int = 0                        # values in the window
+    seen:  int = 0                        # values appended so far, ever
+    mean:  float = 0.0
+    m2:    float = 0.0                    # sum of squared deviations from the mean
+    mins:  deque = field(default_factory=deque)   # (seen, value), increasing values
+    maxs:  deque = field(default_factory=deque)   # (seen, value), decreasing values
+
+
 class RollingWindow(Node):
     """
     Maintains a fixed-length FIFO buffer of float values.
     Emits SMA, standard deviation, min, max, and the raw latest value.
 
-    The window fills with the initial value on the first ``window`` ticks.
+    Every output is updated in O(1) amortized per tick: the buffer is a
+    preallocated ring, mean and variance are updated Welford-style as values
+    enter and leave the window (resynced from the ring once per lap), and
+    min/max come from monotonic deques. None and NaN values are skipped.
     """
 
     CATEGORY = "aggregator"
@@ -764,32 +875,67 @@ class RollingWindow(Node):
 
     def __init__(self, window: int = 20, **kwargs) -> None:
         super().__init__(**kwargs)
+        if window < 1:
+            raise ValueError("window must be at least 1")
         self.window   = window
         self._buf_key = f"{self.node_id}__buf"
 
+    def _push(self, state: _WindowState, v: float) -> None:
+        window = self.window
+        if state.n == window:
+            # Slide: replace the oldest value, in one Welford update
+            old = state.buf[state.head]
+            mean = state.mean + (v - old) / window
+            state.m2 = max(state.m2 + (v - old) * (v - mean + old - state.mean), 0.0)
+            state.mean = mean
+        else:
+            state.n += 1
+            delta = v - state.mean
+            state.mean += delta / state.n
+            state.m2 += delta * (v - state.mean)
+        state.buf[state.head] = v
+        state.head = (state.head + 1) % window
+        if state.head == 0 and state.n == window:
+            # Once per lap of the ring, resync from the buffer so rounding errors don't accumulate
+            state.mean = math.fsum(state.buf) / window
+            state.m2 = math.fsum((x - state.mean) ** 2 for x in state.buf)
+
+        i = state.seen
+        state.seen += 1
+        mins, maxs = state.mins, state.maxs
+        while mins and mins[-1][1] >= v:
+            mins.pop()
+        mins.append((i, v))
+        while maxs and maxs[-1][1] <= v:
+            maxs.pop()
+        maxs.append((i, v))
+        # Drop extrema that left the window
+        if mins[0][0] <= i - window:
+            mins.popleft()
+        if maxs[0][0] <= i - window:
+            maxs.popleft()
+
     def _compute(self, ctx: Context, inputs: dict[str, Any]) -> dict[str, Any]:
-        buf: deque = ctx.get_var(self._buf_key, None)
-        if buf is None:
-            buf = deque(maxlen=self.window)
-            ctx.set_var(self._buf_key, buf)
+        state: _WindowState = ctx.get_var(self._buf_key, None)
+        if state is None:
+            state = _WindowState([0.0] * self.window)
+            ctx.set_var(self._buf_key, state)
 
         v = inputs["value"]
         if v is not None and not (isinstance(v, float) and math.isnan(v)):
-            buf.append(v)
+            self._push(state, v)
 
-        n = len(buf)
+        n = state.n
         if n == 0:
             return {"sma": float("nan"), "std": float("nan"),
                     "min": float("nan"), "max": float("nan"),
                     "value": v, "full": False}
 
-        sma = sum(buf) / n
-        std = math.sqrt(sum((x - sma) ** 2 for x in buf) / max(n - 1, 1))
         return {
-            "sma":   sma,
-            "std":   std,
-            "min":   min(buf),
-            "max":   max(buf),
+            "sma":   state.mean,
+            "std":   math.sqrt(state.m2 / max(n - 1, 1)),
+            "min":   state.mins[0][1],
+            "max":   state.maxs[0][1],
             "value": v,
             "full":  n == self.window,
         }
@@ -0,0 +1,469 @@
+"""
+Compiled execution plan for a strategy Graph.
+
+ExecutionPlan
+─────────────
+  A frozen, flat schedule of the work ``Graph.run_tick`` does per tick.
+  Compiling replays the pull-based evaluation once, statically:
+
+    - every node reached from the sinks becomes one step, in the order
+      the pull evaluator would compute it (a topological order);
+    - every port gets an integer slot in a single flat value list, with
+      unconnected optional inputs bound to constant slots holding their
+      ``Port.default``;
+    - Variable nodes become a load step (pass 1) plus a store step that
+      runs after the main pass (pass 2), exactly like their deferred writes.
+
+  Running the plan is then a single loop over (fn, inputs, outputs) steps:
+  no recursion, no per-tick cache, output validation or logging.
+
+  run_batch evaluates a whole LOBBatch column by column instead: each
+  VECTORIZED node runs once over all ticks, other nodes are scanned tick by
+  tick on their own, and only the steps caught in a cross-tick Variable
+  feedback loop are scanned together, tick by tick. Ticks with a field
+  LOBSnapshot returns as None, which the batch holds as NaN, are run with
+  ``run`` on their own.
+
+  A plan can also be merged from several graphs (see MultiRunner): nodes
+  are mapped to a canonical representative before scheduling, and each
+  step records the graphs ("owners") its orders belong to.
+"""
+from operator import itemgetter
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .node import Context, Node
+from .types import LOBBatch, Order
+
+# fn(ctx, inputs) -> outputs, the input (port, slot) bindings, the output (port, slot) bindings
+Step = tuple[Callable[[Context, dict[str, Any]], dict[str, Any]],
+             tuple[tuple[str, int], ...],
+             tuple[tuple[str, int], ...]]
+
+# Step kinds
+LOAD, COMPUTE, STORE = "load", "compute", "store"
+
+
+class ExecutionPlan:
+    """
+    Frozen evaluation schedule produced by ``Graph.compile()``.
+
+    The plan holds references to the graph's nodes, so node parameters
+    changed in place are picked up, but rewiring the graph requires
+    compiling again (``Graph`` does this automatically on its next
+    ``compile()`` call).
+
+    Usage
+    -----
+    plan = graph.compile()
+    ctx  = Context(lob, tick_index, variables)
+    plan.run(ctx)
+    ctx.orders
+    """
+
+    def __init__(
+            self,
+            nodes: list[Node],
+            steps: list[Step],
+            kinds: list[tuple[Node, str]],
+            values: list[Any],
+            slots: dict[tuple[str, str], int],
+            owners: list[tuple[int, ...]],
+    ) -> None:
+        self.nodes = nodes
+        self._steps = tuple(steps)
+        self._kinds = tuple(kinds)
+        self._values = values
+        self._slots = slots
+        self._owners = tuple(owners)
+        self.n_owners = 1 + max((g for step in owners for g in step), default=0)
+        # (leading, feedback, trailing) step indices for run_batch, built on first use
+        self._groups: Optional[tuple[list[int], list[int], list[int]]] = None
+
+    @classmethod
+    def build(
+            cls,
+            sinks: list[Node],
+            canonical: Optional[Callable[[Node], Node]] = None,
+            owners: Optional[dict[str, tuple[int, ...]]] = None,
+    ) -> "ExecutionPlan":
+        """
+        Schedule the nodes reachable from ``sinks``.
+
+        Parameters
+        ----------
+        sinks : list[Node]
+            Roots of the pull evaluation, in evaluation order.
+        canonical : Callable[[Node], Node], optional
+            Maps every node to the node that is scheduled in its place -
+            equivalent nodes mapped to the same one are computed once.
+        owners : dict[str, tuple[int, ...]], optional
+            Graph indices each scheduled node id belongs to, for
+            attributing orders with run_owned. Defaults to graph 0.
+
+        Raises RuntimeError if a scheduled node has an unconnected
+        required input port.
+        """
+        canonical = canonical or (lambda node: node)
+        owners = owners or {}
+        from .nodes import Variable, BoolVariable
+        _deferred_types = (Variable, BoolVariable)
+
+        values: list[Any] = []
+        slots: dict[tuple[str, str], int] = {}
+        steps: list[Step] = []
+        kinds: list[tuple[Node, str]] = []
+        step_owners: list[tuple[int, ...]] = []
+        order: list[Node] = []
+        deferred: list[Node] = []
+        visited: set[str] = set()
+
+        def slot(node: Node, port: str) -> int:
+            key = (node.node_id, port)
+            if key not in slots:
+                slots[key] = len(values)
+                values.append(None)
+            return slots[key]
+
+        def bind_inputs(node: Node) -> tuple[tuple[str, int], ...]:
+            bindings = []
+            for port in node.INPUT_PORTS:
+                if port.name in node._wiring:
+                    src_node, src_out = node._wiring[port.name]
+                    bindings.append((port.name, slot(canonical(src_node), src_out)))
+                elif not port.required:
+                    # Constant slot, written once here and never by a step
+                    bindings.append((port.name, len(values)))
+                    values.append(port.default)
+                else:
+                    raise RuntimeError(
+                        f"Node {node.label!r}: required input port {port.name!r} is not connected."
+                    )
+            return tuple(bindings)
+
+        def bind_outputs(node: Node, names: list[str]) -> tuple[tuple[str, int], ...]:
+            return tuple((name, slot(node, name)) for name in names)
+
+        def visit(node: Node) -> None:
+            # Same traversal as Node.evaluate: inputs in port order, depth first
+            node = canonical(node)
+            if node.node_id in visited:
+                return
+            visited.add(node.node_id)
+            order.append(node)
+
+            if isinstance(node, _deferred_types):
+                steps.append((node._load, (), bind_outputs(node, node.output_port_names)))
+                kinds.append((node, LOAD))
+                step_owners.append(owners.get(node.node_id, (0,)))
+                deferred.append(node)
+                return
+
+            for port in node.INPUT_PORTS:
+                if port.name in node._wiring:
+                    visit(node._wiring[port.name][0])
+            steps.append((node._compute, bind_inputs(node), bind_outputs(node, node.output_port_names)))
+            kinds.append((node, COMPUTE))
+            step_owners.append(owners.get(node.node_id, (0,)))
+
+        # Pass 1: pull from every sink
+        for sink in sinks:
+            visit(sink)
+
+        # Pass 2: deferred writes, which may schedule nodes (and Variables) of their own
+        i = 0
+        while i < len(deferred):
+            var = deferred[i]
+            for port in var.INPUT_PORTS:
+                if port.name in var._wiring:
+                    visit(var._wiring[port.name][0])
+            steps.append((var._store, bind_inputs(var), bind_outputs(var, var.DEFERRED_OUTPUTS)))
+            kinds.append((var, STORE))
+            step_owners.append(owners.get(var.node_id, (0,)))
+            i += 1
+
+        return cls(order, steps, kinds, values, slots, step_owners)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def run(self, ctx: Context) -> Context:
+        """
+        Execute one tick against ``ctx``. Orders and variable writes land
+        on the context, same as ``Graph.run_tick``; ``ctx._cache`` is not
+        populated.
+        """
+        values = self._values
+        for fn, inputs, outputs in self._steps:
+            result = fn(ctx, {name: values[i] for name, i in inputs})
+            for name, i in outputs:
+                values[i] = result[name]
+        return ctx
+
+    def run_owned(self, ctx: Context) -> list[list[Order]]:
+        """
+        Execute one tick like ``run``, returning the orders emitted for
+        each owner graph instead of leaving them on ``ctx.orders``.
+        """
+        values = self._values
+        orders: list[list[Order]] = [[] for _ in range(self.n_owners)]
+        for (fn, inputs, outputs), owners in zip(self._steps, self._owners):
+            result = fn(ctx, {name: values[i] for name, i in inputs})
+            for name, i in outputs:
+                values[i] = result[name]
+            if ctx.orders:
+                for g in owners:
+                    orders[g].extend(ctx.orders)
+                ctx.orders = []
+        return orders
+
+    def _batch_groups(self) -> tuple[list[int], list[int], list[int]]:
+        """
+        Split the steps for run_batch.
+
+        A Variable's load at tick t depends on its store at t-1, so the
+        steps between them - downstream of a load and upstream of a store,
+        plus the readers of values a store rewrites - form a feedback loop
+        that has to be scanned one tick at a time, as a whole. Steps that
+        do not depend on a load run before it, and the remaining
+        load-dependent steps after it, each over the full block.
+        """
+        if self._groups is not None:
+            return self._groups
+
+        writers: dict[int, list[int]] = {}
+        for k, (_, _, outputs) in enumerate(self._steps):
+            for _, i in outputs:
+                writers.setdefault(i, []).append(k)
+        deps = [
+            {j for _, i in inputs for j in writers.get(i, ())}
+            for _, inputs, _ in self._steps
+        ]
+        loads  = {k for k, (_, kind) in enumerate(self._kinds) if kind == LOAD}
+        stores = {k for k, (_, kind) in enumerate(self._kinds) if kind == STORE}
+        rewritten = {i for k in stores for _, i in self._steps[k][2]}
+        readers = {k for k, (_, inputs, _) in enumerate(self._steps) if any(i in rewritten for _, i in inputs)}
+
+        # Steps depending on a load, and steps feeding a store (or rewritten value reader)
+        after_load = set(loads)
+        feeding = stores | readers
+        changed = True
+        while changed:
+            changed = False
+            for k, d in enumerate(deps):
+                if k not in after_load and d & after_load:
+                    after_load.add(k)
+                    changed = True
+                if k in feeding and not d <= feeding:
+                    feeding |= d
+                    changed = True
+
+        feedback = loads | stores | (after_load & feeding)
+        steps = range(len(self._steps))
+        self._groups = (
+            [k for k in steps if k not in after_load and k not in feedback],
+            [k for k in steps if k in feedback],
+            [k for k in steps if k in after_load and k not in feedback],
+        )
+        return self._groups
+
+    def run_batch(
+            self,
+            batch: LOBBatch,
+            tick_index: int = 0,
+            variables: Optional[dict[str, Any]] = None,
+            metadata: Optional[dict[str, Any]] = None,
+            by_owner: bool = False,
+    ) -> list:
+        """
+        Execute ``len(batch)`` consecutive ticks, column by column.
+
+        Produces the same orders and variable writes as calling ``run`` once
+        per tick, as long as the LOBBatch holds the same top-of-book fields.
+        Ticks where LOBSnapshot returns None for a field - an empty side, an
+        empty book, no last trade - are run one at a time with ``run``
+        instead, on their snapshot, so that NaN never reaches a node in
+        place of None. If ``run`` raises on such a tick, so does this.
+
+        Returns
+        -------
+        list[list[Order]]
+            Orders emitted on each tick, in the order ``run`` emits them.
+            With ``by_owner``, one such list per owner graph.
+        """
+        n = len(batch)
+        if n == 0:
+            return [[] for _ in range(self.n_owners)] if by_owner else []
+
+        variables = variables if variables is not None else {}
+        complete = batch.complete
+        emitted: list[list[tuple[int, Order]]] = []
+        # Ranges of ticks that are all complete, or all not
+        edges = [0, *(np.flatnonzero(complete[1:] != complete[:-1]) + 1).tolist(), n]
+        for start, stop in zip(edges[:-1], edges[1:]):
+            if complete[start]:
+                block = batch if stop - start == n else batch[start:stop]
+                emitted.extend(self._run_block(block, tick_index + start, variables, metadata))
+                continue
+            for t in range(start, stop):
+                ctx = Context(batch.snapshot(t), tick_index + t, variables, metadata)
+                emitted.append(self._run_tick(ctx))
+
+        if not by_owner:
+            return [[order for _, order in orders] for orders in emitted]
+
+        owned = [[[] for _ in range(n)] for _ in range(self.n_owners)]
+        for t, orders in enumerate(emitted):
+            for k, order in orders:
+                for g in self._owners[k]:
+                    owned[g][t].append(order)
+        return owned
+
+    def _run_tick(self, ctx: Context) -> list[tuple[int, Order]]:
+        """Execute one tick like ``run``, returning the (step, order) pairs emitted."""
+        values = self._values
+        emitted = []
+        for k, (fn, inputs, outputs) in enumerate(self._steps):
+            result = fn(ctx, {name: values[i] for name, i in inputs})
+            for name, i in outputs:
+                values[i] = result[name]
+            if ctx.orders:
+                emitted.extend((k, order) for order in ctx.orders)
+                ctx.orders = []
+        return emitted
+
+    def _run_block(
+            self,
+            batch: LOBBatch,
+            tick_index: int,
+            variables: dict[str, Any],
+            metadata: Optional[dict[str, Any]],
+    ) -> list[list[tuple[int, Order]]]:
+        """
+        Execute a block of complete ticks column by column, returning the
+        (step, order) pairs emitted on each tick, sorted by step.
+        """
+        n = len(batch)
+        # Context seen by vectorized nodes: columns instead of scalars
+        batch_ctx = Context(batch, np.arange(tick_index, tick_index + n), variables, metadata)
+        # Context seen by scanned nodes, advanced one tick at a time
+        ctx = Context(batch, tick_index, variables, metadata)
+        lobs = batch.snapshots if batch.snapshots is not None else [None] * n
+        # (tick_index, timestamp, lob) of every tick
+        frames = list(zip(range(tick_index, tick_index + n), batch.timestamp.tolist(), lobs))
+        # Slots some step reads; other outputs are only kept for the last tick
+        consumed = {i for _, inputs, _ in self._steps for _, i in inputs}
+
+        values = self._values
+        arrays: dict[int, np.ndarray] = {}
+        lists:  dict[int, list] = {}
+        # (step, order) per tick, sorted by step at the end
+        emitted: list[list[tuple[int, Order]]] = [[] for _ in range(n)]
+
+        def as_list(i: int) -> list:
+            if i not in lists:
+                lists[i] = arrays[i].tolist() if i in arrays else [values[i]] * n
+            return lists[i]
+
+        def as_array(i: int) -> np.ndarray:
+            if i not in arrays:
+                arrays[i] = np.asarray(as_list(i))
+            return arrays[i]
+
+        def put(i: int, column: Any) -> None:
+            lists.pop(i, None)
+            arrays.pop(i, None)
+            if isinstance(column, np.ndarray) and column.ndim:
+                arrays[i] = column
+            elif isinstance(column, list):
+                lists[i] = column
+            else:
+                lists[i] = [column] * n
+
+        def collect(k: int, t: int) -> None:
+            emitted[t].extend((k, order) for order in ctx.orders)
+            ctx.orders = []
+
+        def run_columns(ks: list[int]) -> None:
+            for k in ks:
+                fn, inputs, outputs = self._steps[k]
+                node = self._kinds[k][0]
+                if node.VECTORIZED:
+                    result = node._compute_batch(batch_ctx, {name: as_array(i) for name, i in inputs})
+                    for name, i in outputs:
+                        put(i, result[name])
+                    continue
+
+                columns = [(name, as_list(i)) for name, i in inputs]
+                results = [(name, i, []) for name, i in outputs if i in consumed]
+                result = {}
+                for t, frame in enumerate(frames):
+                    ctx.tick_index, ctx.timestamp, ctx.lob = frame
+                    result = fn(ctx, {name: column[t] for name, column in columns})
+                    for name, _, column in results:
+                        column.append(result[name])
+                    if ctx.orders:
+                        collect(k, t)
+                for name, i in outputs:
+                    values[i] = result[name]
+                for _, i, column in results:
+                    put(i, column)
+
+        def run_feedback(ks: list[int]) -> None:
+            steps = [(k,) + self._steps[k] for k in ks]
+            produced = {i for _, _, _, outputs in steps for _, i in outputs}
+            external = {
+                i for _, _, inputs, _ in steps for _, i in inputs
+                if i not in produced and (i in arrays or i in lists)
+            }
+            external = [(i, as_list(i)) for i in external]
+            results = {i: [] for i in produced & consumed}
+
+            for t, frame in enumerate(frames):
+                ctx.tick_index, ctx.timestamp, ctx.lob = frame
+                for i, column in external:
+                    values[i] = column[t]
+                for k, fn, inputs, outputs in steps:
+                    result = fn(ctx, {name: values[i] for name, i in inputs})
+                    for name, i in outputs:
+                        values[i] = result[name]
+                    if ctx.orders:
+                        collect(k, t)
+                for i, column in results.items():
+                    column.append(values[i])
+            for i, column in results.items():
+                put(i, column)
+
+        leading, feedback, trailing = self._batch_groups()
+        run_columns(leading)
+        if feedback:
+            run_feedback(feedback)
+        run_columns(trailing)
+
+        # Leave every slot holding its last-tick value, as after run()
+        for i in arrays:
+            values[i] = arrays[i][-1:].tolist()[0]
+        for i in lists:
+            values[i] = lists[i][-1]
+
+        return [sorted(orders, key=itemgetter(0)) if orders else orders for orders in emitted]
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def slot(self, node: Node, port: str) -> int:
+        """Index of a port's value slot."""
+        return self._slots[(node.node_id, port)]
+
+    def value(self, node: Node, port: str) -> Any:
+        """Value of an output port as of the last run."""
+        return self._values[self.slot(node, port)]
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def __repr__(self) -> str:
+        return f"<ExecutionPlan steps={len(self._steps)} slots={len(self._values)}>"
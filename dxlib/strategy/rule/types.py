@@ -16,11 +16,14 @@ Supported dtypes mirror what the LOB and order system natively produce:
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum, auto
-from typing import Any, Optional, Type, Union
+from functools import cached_property
+from typing import Any, Iterable, Optional, Sequence, Type, Union
 import time
 
+import numpy as np
+
 
 # ---------------------------------------------------------------------------
 # Dtype registry
@@ -55,55 +58,167 @@ class Level:
     size: float
 
 
-@dataclass
 class LOBSnapshot:
     """
     Immutable view of the limit order book at a single tick.
 
-    Levels are sorted: bids descending, asks ascending.
-    Provides derived accessors so nodes don't need to recompute them.
+    Levels are sorted: bids descending, asks ascending. Each side is held in
+    the form it was given in - Level objects, or (price, size) depth - and
+    converted on first use to the others: ``bids``, the NumPy arrays
+    ``bid_prices`` / ``bid_sizes``, and so on.
+    Derived accessors are computed once and cached, so nodes don't need to
+    recompute them.
     """
-    symbol:    str
-    timestamp: float              # unix seconds (float for sub-second)
-    bids:      list[Level]        # best bid first
-    asks:      list[Level]        # best ask first
-    last_trade_price: Optional[float] = None
-    last_trade_size:  Optional[float] = None
+
+    def __init__(
+        self,
+        symbol:    str,
+        timestamp: float,           # unix seconds (float for sub-second)
+        bids:      Sequence[Level],  # best bid first
+        asks:      Sequence[Level],  # best ask first
+        last_trade_price: Optional[float] = None,
+        last_trade_size:  Optional[float] = None,
+    ) -> None:
+        self.symbol    = symbol
+        self.timestamp = timestamp
+        self.last_trade_price = last_trade_price
+        self.last_trade_size  = last_trade_size
+        # set the cached properties directly: the other forms are derived on demand
+        self.bids = list(bids)
+        self.asks = list(asks)
+
+    @classmethod
+    def from_depth(
+        cls,
+        symbol:    str,
+        timestamp: float,
+        bids:      Union[Iterable[tuple[float, float]], np.ndarray],
+        asks:      Union[Iterable[tuple[float, float]], np.ndarray],
+        last_trade_price: Optional[float] = None,
+        last_trade_size:  Optional[float] = None,
+    ) -> LOBSnapshot:
+        """
+        Snapshot from ``(price, size)`` depth, best level first, such as the
+        generators of ``OrderBook.depth``:
+
+            LOBSnapshot.from_depth(symbol, t, book.depth(10, Side.BUY), book.depth(10, Side.SELL))
+
+        No Level objects are built. ``(n, 2)`` arrays become the level arrays
+        without a copy.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot.symbol    = symbol
+        snapshot.timestamp = timestamp
+        snapshot.last_trade_price = last_trade_price
+        snapshot.last_trade_size  = last_trade_size
+        for side, depth in (("bid", bids), ("ask", asks)):
+            if isinstance(depth, np.ndarray):
+                setattr(snapshot, f"_{side}", np.asarray(depth, dtype=float).reshape(-1, 2))
+            else:
+                setattr(snapshot, f"_{side}_rows", list(depth))
+        return snapshot
 
     # ------------------------------------------------------------------
-    # Derived accessors
+    # Levels
     # ------------------------------------------------------------------
 
+    @cached_property
+    def _bid_rows(self) -> list[tuple[float, float]]:
+        if "bids" in self.__dict__:
+            return [(l.price, l.size) for l in self.bids]
+        return self._bid.tolist()
+
+    @cached_property
+    def _ask_rows(self) -> list[tuple[float, float]]:
+        if "asks" in self.__dict__:
+            return [(l.price, l.size) for l in self.asks]
+        return self._ask.tolist()
+
+    @cached_property
+    def _bid(self) -> np.ndarray:
+        """(n, 2) array of bid price/size rows."""
+        return np.array(self._bid_rows, dtype=float).reshape(-1, 2)
+
+    @cached_property
+    def _ask(self) -> np.ndarray:
+        return np.array(self._ask_rows, dtype=float).reshape(-1, 2)
+
+    @cached_property
+    def bids(self) -> list[Level]:
+        return [Level(p, s) for p, s in self._bid_rows]
+
+    @cached_property
+    def asks(self) -> list[Level]:
+        return [Level(p, s) for p, s in self._ask_rows]
+
     @property
-    def best_bid(self) -> Optional[float]:
-        return self.bids[0].price if self.bids else None
+    def bid_prices(self) -> np.ndarray:
+        return self._bid[:, 0]
 
     @property
-    def best_ask(self) -> Optional[float]:
-        return self.asks[0].price if self.asks else None
+    def bid_sizes(self) -> np.ndarray:
+        return self._bid[:, 1]
 
     @property
+    def ask_prices(self) -> np.ndarray:
+        return self._ask[:, 0]
+
+    @property
+    def ask_sizes(self) -> np.ndarray:
+        return self._ask[:, 1]
+
+    def bid_at(self, level: int) -> Optional[Level]:
+        return self.bids[level] if level < len(self.bids) else None
+
+    def ask_at(self, level: int) -> Optional[Level]:
+        return self.asks[level] if level < len(self.asks) else None
+
+    # ------------------------------------------------------------------
+    # Derived accessors
+    # ------------------------------------------------------------------
+
+    def _top(self, side: str) -> tuple[Optional[float], float]:
+        """Best price and total size of one side, read from the form it is held in."""
+        levels = self.__dict__.get(side + "s")
+        if levels is not None:
+            return (levels[0].price if levels else None), sum(l.size for l in levels)
+        rows = getattr(self, f"_{side}_rows")
+        return (rows[0][0] if rows else None), sum(size for _, size in rows)
+
+    @cached_property
+    def best_bid(self) -> Optional[float]:
+        self.best_bid, self.bid_depth = self._top("bid")
+        return self.best_bid
+
+    @cached_property
+    def best_ask(self) -> Optional[float]:
+        self.best_ask, self.ask_depth = self._top("ask")
+        return self.best_ask
+
+    @cached_property
     def mid(self) -> Optional[float]:
         if self.best_bid is None or self.best_ask is None:
             return None
         return (self.best_bid + self.best_ask) / 2.0
 
-    @property
+    @cached_property
     def spread(self) -> Optional[float]:
         if self.best_bid is None or self.best_ask is None:
             return None
         return self.best_ask - self.best_bid
 
-    @property
+    @cached_property
     def bid_depth(self) -> float:
         """Total size across all bid levels."""
-        return sum(l.size for l in self.bids)
+        self.best_bid, self.bid_depth = self._top("bid")
+        return self.bid_depth
 
-    @property
+    @cached_property
     def ask_depth(self) -> float:
-        return sum(l.size for l in self.asks)
+        self.best_ask, self.ask_depth = self._top("ask")
+        return self.ask_depth
 
-    @property
+    @cached_property
     def imbalance(self) -> Optional[float]:
         """
         Order book imbalance: (bid_depth - ask_depth) / (bid_depth + ask_depth).
@@ -114,19 +229,156 @@ class LOBSnapshot:
             return None
         return (self.bid_depth - self.ask_depth) / total
 
-    def bid_at(self, level: int) -> Optional[Level]:
-        return self.bids[level] if level < len(self.bids) else None
+    @cached_property
+    def bid_cum_depth(self) -> np.ndarray:
+        """Cumulative bid size down the book: ``bid_cum_depth[i]`` is the size of the top i + 1 levels."""
+        return np.cumsum(self.bid_sizes)
 
-    def ask_at(self, level: int) -> Optional[Level]:
-        return self.asks[level] if level < len(self.asks) else None
+    @cached_property
+    def ask_cum_depth(self) -> np.ndarray:
+        return np.cumsum(self.ask_sizes)
 
     def vwap(self, n_levels: int = 5) -> Optional[float]:
         """Volume-weighted average price across top n levels, both sides."""
-        levels = self.bids[:n_levels] + self.asks[:n_levels]
-        total_size = sum(l.size for l in levels)
+        rows = self._bid_rows[:n_levels] + self._ask_rows[:n_levels]
+        total_size = sum(size for _, size in rows)
         if total_size == 0:
             return None
-        return sum(l.price * l.size for l in levels) / total_size
+        return sum(price * size for price, size in rows) / total_size
+
+    # ------------------------------------------------------------------
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LOBSnapshot):
+            return NotImplemented
+        return (
+            self.symbol == other.symbol
+            and self.timestamp == other.timestamp
+            and self.last_trade_price == other.last_trade_price
+            and self.last_trade_size == other.last_trade_size
+            and np.array_equal(self._bid, other._bid)
+            and np.array_equal(self._ask, other._ask)
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"LOBSnapshot(symbol={self.symbol!r}, timestamp={self.timestamp!r}, "
+            f"bids={self.bids!r}, asks={self.asks!r}, "
+            f"last_trade_price={self.last_trade_price!r}, last_trade_size={self.last_trade_size!r})"
+        )
+
+
+@dataclass
+class LOBBatch:
+    """
+    Columnar block of top-of-book snapshots, one row per tick.
+
+    Input of StrategyRunner.run_batch. Derived accessors mirror those of
+    LOBSnapshot, as arrays - with NaN where LOBSnapshot returns None, so
+    ``complete`` flags the ticks where they agree.
+    ``snapshots`` optionally keeps the full per-tick LOBSnapshot objects,
+    for nodes that consume the ``lob`` port.
+    """
+    symbol:    str
+    timestamp: np.ndarray
+    best_bid:  np.ndarray
+    best_ask:  np.ndarray
+    bid_depth: np.ndarray
+    ask_depth: np.ndarray
+    last_trade_price: Optional[np.ndarray] = None
+    last_trade_size:  Optional[np.ndarray] = None
+    snapshots: Optional[list[LOBSnapshot]] = None
+
+    def __post_init__(self) -> None:
+        for name in ("timestamp", "best_bid", "best_ask", "bid_depth", "ask_depth",
+                     "last_trade_price", "last_trade_size"):
+            value = getattr(self, name)
+            if value is not None:
+                setattr(self, name, np.asarray(value, dtype=float))
+
+    @classmethod
+    def from_snapshots(cls, snapshots: Sequence[LOBSnapshot]) -> LOBBatch:
+        snapshots = list(snapshots)
+
+        def column(values: list) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+        def optional_column(values: list) -> Optional[np.ndarray]:
+            return None if all(v is None for v in values) else column(values)
+
+        return cls(
+            symbol    = snapshots[0].symbol if snapshots else "",
+            timestamp = column([s.timestamp for s in snapshots]),
+            best_bid  = column([s.best_bid  for s in snapshots]),
+            best_ask  = column([s.best_ask  for s in snapshots]),
+            bid_depth = column([s.bid_depth for s in snapshots]),
+            ask_depth = column([s.ask_depth for s in snapshots]),
+            last_trade_price = optional_column([s.last_trade_price for s in snapshots]),
+            last_trade_size  = optional_column([s.last_trade_size  for s in snapshots]),
+            snapshots = snapshots,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, rows: slice) -> LOBBatch:
+        """The ticks in a range, as a batch."""
+        return replace(self, **{
+            name: value[rows] for name, value in vars(self).items()
+            if name != "symbol" and value is not None
+        })
+
+    def snapshot(self, t: int) -> LOBSnapshot:
+        """
+        The snapshot of tick ``t``: the kept one, or else one with the
+        same top-of-book fields, each side as a single level.
+        """
+        if self.snapshots is not None:
+            return self.snapshots[t]
+
+        def side(price: float, depth: float) -> list[tuple[float, float]]:
+            return [] if np.isnan(price) else [(float(price), float(depth))]
+
+        def scalar(column: Optional[np.ndarray]) -> Optional[float]:
+            return None if column is None or np.isnan(column[t]) else float(column[t])
+
+        return LOBSnapshot.from_depth(
+            self.symbol, float(self.timestamp[t]),
+            side(self.best_bid[t], self.bid_depth[t]), side(self.best_ask[t], self.ask_depth[t]),
+            scalar(self.last_trade_price), scalar(self.last_trade_size),
+        )
+
+    @property
+    def complete(self) -> np.ndarray:
+        """
+        Mask of the ticks where no derived field is None in LOBSnapshot,
+        and so NaN here: both sides quoted, and a last trade if any is kept.
+        """
+        complete = ~np.isnan(self.best_bid) & ~np.isnan(self.best_ask) & (self.bid_depth + self.ask_depth != 0)
+        for column in (self.last_trade_price, self.last_trade_size):
+            if column is not None:
+                complete &= ~np.isnan(column)
+        return complete
+
+    # ------------------------------------------------------------------
+    # Derived accessors
+    # ------------------------------------------------------------------
+
+    @property
+    def mid(self) -> np.ndarray:
+        return (self.best_bid + self.best_ask) / 2.0
+
+    @property
+    def spread(self) -> np.ndarray:
+        return self.best_ask - self.best_bid
+
+    @property
+    def imbalance(self) -> np.ndarray:
+        total = self.bid_depth + self.ask_depth
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total == 0, np.nan, (self.bid_depth - self.ask_depth) / total)
 
 
 # ---------------------------------------------------------------------------
@@ -81,6 +81,41 @@ class Rsi(SignalGenerator):
         rsi_df = pd.DataFrame(rsi, index=subset.index, columns=data.columns)
         return rsi_df.tail(self.period).fillna(self.upper)
 
+    def update(self, state, data: pd.DataFrame):
+        """
+        Score each new row from the last `period + window` rows of its instrument, as `generate` scores the last row.
+
+        The state maps each instrument to its row count and its last `period + window` rows.
+        """
+        state = state if state is not None else {}
+        required_len = self.period + self.window
+        scores = np.empty(data.shape, dtype=np.float64)
+
+        groups = data.groupby(level="instrument", sort=False, observed=True).indices if "instrument" in data.index.names \
+            else {None: np.arange(len(data))}
+        for instrument, positions in groups.items():
+            count, tail = state.get(instrument, (0, np.empty((0, data.shape[1]))))
+            values = np.vstack([tail, data.to_numpy(dtype=np.float64)[positions]])
+            for j in range(len(positions)):
+                end = len(tail) + j + 1
+                if count + j + 1 < required_len:
+                    scores[positions[j]] = self.upper
+                else:
+                    score = fast_rsi(values[end - required_len:end], self.window)[-1]
+                    scores[positions[j]] = np.where(np.isnan(score), self.upper, score)
+            state[instrument] = (count + len(positions), values[-required_len:])
+
+        conditions = [scores < self.lower, scores > self.upper]
+        choices = [self.down, self.up]
+        return state, pd.DataFrame(np.select(conditions, choices, default=Signal.HOLD),
+                                   index=data.index, columns=data.columns)
+
+    def validate(self, data: pd.DataFrame, history_schema: HistorySchema):
+        # every column is scored, so all of them must be numeric
+        non_numeric = [column for column in data.columns if not pd.api.types.is_numeric_dtype(data[column])]
+        if non_numeric:
+            raise ValueError(f"Rsi requires numeric columns, got non-numeric columns {non_numeric}.")
+
     @classmethod
     def output_schema(cls, history_schema: HistorySchema):
         schema = history_schema.copy()
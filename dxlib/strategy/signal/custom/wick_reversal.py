@@ -6,6 +6,8 @@ from dxlib.strategy.signal import SignalGenerator
 
 
 class WickReversal(SignalGenerator):
+    stateless = True
+
     def __init__(self,
                  range_multiplier=0.4,
                  low_range=1,
@@ -45,6 +47,9 @@ class WickReversal(SignalGenerator):
             'signal': signal
         }, index=data.index)
 
+    def update(self, state, data: pd.DataFrame):
+        return state, self.generate(data, None)
+
     @classmethod
     def output_schema(cls, history_schema: HistorySchema):
         schema = history_schema.copy()
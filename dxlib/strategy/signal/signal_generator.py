@@ -1,4 +1,5 @@
 from abc import abstractmethod, ABC
+from typing import Any, Tuple
 
 import pandas as pd
 
@@ -6,6 +7,9 @@ from dxlib.history import HistorySchema
 
 
 class SignalGenerator(ABC):
+    # Whether the signal of each row depends only on that row, so that signals can be generated over a whole panel at once.
+    stateless: bool = False
+
     @abstractmethod
     def generate(self, data: pd.DataFrame, history_schema: HistorySchema):
         pass
@@ -14,5 +18,24 @@ class SignalGenerator(ABC):
     def validate(self, data: pd.DataFrame, history_schema: HistorySchema):
         pass
 
+    def update(self, state: Any, data: pd.DataFrame) -> Tuple[Any, pd.DataFrame]:
+        """
+        Generate signals for new rows only, carrying whatever is needed from past rows in `state`.
+
+        Optional: `SignalStrategy` recomputes signals over the whole history for generators that do not implement it.
+
+        Args:
+            state (Any): The state returned by the previous call, or None on the first call.
+            data (pd.DataFrame): The new rows for all instruments, in time order.
+
+        Returns:
+            Tuple[Any, pd.DataFrame]: The new state, and the signals of the new rows.
+        """
+        raise NotImplementedError
+
+    @property
+    def incremental(self) -> bool:
+        return type(self).update is not SignalGenerator.update
+
     def output_schema(self, history_schema: HistorySchema):
         return history_schema
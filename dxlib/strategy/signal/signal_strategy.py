@@ -1,3 +1,7 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
 from dxlib.history import History, HistorySchema, HistoryView
 from dxlib.market import Order
 from ..order_generator import OrderGenerator
@@ -5,10 +9,84 @@ from ..strategy import Strategy
 from . import SignalGenerator
 
 
+class SignalStream:
+    """
+    State of an incremental signal generator over one history: the generator state,
+    and for each instrument, the last index key fed to the generator and the signals of the rows under that key.
+
+    Rows are fed in time order per instrument, so the last key is a high-water mark: rows at or before it were already fed.
+    Only the signals of the latest rows of each instrument are kept, for observations that are executed again,
+    so that the stream does not grow with the history.
+    """
+
+    def __init__(self, history: History):
+        self.history = history
+        self.state: Any = None
+        self.last: Dict[Any, Any] = {}
+        self.signals: Dict[Any, Dict[Any, List[tuple]]] = {}
+
+    @staticmethod
+    def keys(index: pd.Index) -> List[tuple]:
+        """
+        Split each key of `index` into its instrument, and the rest of the key, which orders the rows of an instrument.
+        """
+        if "instrument" not in index.names:
+            return [(None, key) for key in index]
+        if index.nlevels == 1:
+            return [(key, ()) for key in index]
+        level = index.names.index("instrument")
+        return [(key[level], key[:level] + key[level + 1:]) for key in index]
+
+    def until(self, frame: pd.DataFrame, index: pd.Index) -> pd.DataFrame:
+        """
+        Get the rows of `frame` at or before the last row of `index`, whatever their instrument.
+        """
+        if len(index) == 0:
+            return frame
+        last = max(key for _, key in self.keys(index))
+        return frame[[key <= last for _, key in self.keys(frame.index)]]
+
+    def unseen(self, index: pd.Index) -> List[bool]:
+        """
+        Whether each row of `index` is past the high-water mark of its instrument.
+        """
+        last = self.last
+        return [instrument not in last or key > last[instrument] for instrument, key in self.keys(index)]
+
+    def feed(self, index: pd.Index):
+        """
+        Move the high-water mark of each instrument to the last row of `index`.
+        """
+        last = self.last
+        for instrument, key in self.keys(index):
+            if instrument not in last or key > last[instrument]:
+                last[instrument] = key
+                self.signals.pop(instrument, None)
+
+    def keep(self, signals: pd.DataFrame) -> Dict[Any, List[tuple]]:
+        """
+        Keep the signals of the rows at the high-water mark of their instrument.
+
+        Returns:
+            Dict[Any, List[tuple]]: All of `signals`, as the rows under each index key.
+        """
+        rows = {}
+        for (instrument, key), index_key, row in zip(self.keys(signals.index), signals.index,
+                                                     signals.itertuples(index=False)):
+            rows.setdefault(index_key, []).append(row)
+            if key == self.last[instrument]:
+                self.signals.setdefault(instrument, {}).setdefault(index_key, []).append(row)
+        return rows
+
+    def get(self, instrument, key) -> List[tuple]:
+        return self.signals.get(instrument, {}).get(key, [])
+
+
 class SignalStrategy(Strategy):
     def __init__(self, signal_generator: SignalGenerator, order_generator: OrderGenerator):
         self.signal_generator = signal_generator
         self.order_generator = order_generator
+        self._stream: Optional[SignalStream] = None
 
     def validate(self, observation: History, history_view: HistoryView):
         return self.signal_generator.validate(observation.data, history_view.history_schema(observation.history_schema))
@@ -21,13 +99,64 @@ class SignalStrategy(Strategy):
         input_schema = history_view.history_schema(history.history_schema)
         signal_schema = self.signal_generator.output_schema(input_schema)
 
-        def _generate(data):
-            return self.signal_generator.generate(data, input_schema)
+        if self.signal_generator.incremental:
+            signals = self._update(observation, history, input_schema, signal_schema)
+        else:
+            def _generate(data):
+                return self.signal_generator.generate(data, input_schema)
 
-        signals: History = history_view.apply(history, _generate, signal_schema)
+            signals: History = history_view.apply(history, _generate, signal_schema)
         orders = self.order_generator.generate(signals)
         return orders.loc(index=observation.data.index)
 
+    def _update(self,
+                observation: History,
+                history: History,
+                input_schema: HistorySchema,
+                signal_schema: HistorySchema) -> History:
+        """
+        Feed the generator only the rows it has not seen, and return the signals of the observation rows in `history`,
+        which are the same signals `generate` would give over the whole history.
+
+        Observations must come in time order: only the signals of the latest rows fed are kept,
+        so an observation older than those gets no signals.
+        """
+        stream = self._stream
+        if stream is None or stream.history is not history:
+            stream = self._stream = SignalStream(history)
+            # later rows of the history are fed as they are observed, so that only the latest signals need to be kept
+            frames = [stream.until(history.data, observation.data.index), observation.data]
+        else:
+            frames = [observation.data]
+
+        new = []
+        for frame in frames:
+            mask = stream.unseen(frame.index)
+            if any(mask):
+                rows = frame.loc[mask, input_schema.column_names]
+                stream.feed(rows.index)
+                new.append(rows)
+
+        fresh = {}
+        if new:
+            stream.state, signals = self.signal_generator.update(stream.state, pd.concat(new) if len(new) > 1 else new[0])
+            fresh = stream.keep(signals[signal_schema.column_names])
+
+        available = history.buffer if history.buffer is not None else history.data.index
+        index = observation.data.index.unique()
+        signals = [
+            fresh[key] if key in fresh else stream.get(instrument, key)
+            for (instrument, _), key in zip(stream.keys(index), index)
+        ]
+        found = [len(rows) > 0 and key in available for rows, key in zip(signals, index)]
+        index, signals = index[found], [rows for rows, ok in zip(signals, found) if ok]
+        data = pd.DataFrame(
+            [row for rows in signals for row in rows],
+            index=index.repeat([len(rows) for rows in signals]),
+            columns=signal_schema.column_names,
+        )
+        return History(signal_schema, data)
+
     def output_schema(self, history_schema: HistorySchema):
         signal_schema = self.signal_generator.output_schema(history_schema)
         order_schema = HistorySchema(signal_schema.index.copy(), {key: Order for key in signal_schema.column_names})
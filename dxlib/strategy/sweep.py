@@ -0,0 +1,153 @@
+import copy
+import itertools
+import math
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Union
+
+import pandas as pd
+
+from dxlib.core import Portfolio
+from dxlib.history import History, HistoryView
+from dxlib.interfaces import BacktestInterface
+from dxlib.market import OrderTransaction
+from dxlib.market.simulators.fill_model import FillModelRegistry
+from .executor import Executor
+from .signal import SignalStrategy
+from .strategy import Strategy
+
+# state of a sweep worker process, set once by `_init_worker` and reused by every backtest it runs
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(sweep: "Sweep", name: str):
+    sweep.history = History.attach(name)
+    _worker["sweep"] = sweep
+
+
+def _run_worker(params: Dict[str, Any]) -> Dict[str, float]:
+    return _worker["sweep"].backtest(params)
+
+
+def _equity(portfolio: Portfolio, prices: pd.Series) -> float:
+    return sum(quantity * prices.get(instrument, math.nan) for instrument, quantity in portfolio.quantities.items())
+
+
+class Sweep:
+    """
+    Backtests a strategy over a grid of parameters.
+
+    Each parameter set is passed to `factory` to build a strategy, which is backtested from the same starting
+    portfolio on its own `BacktestInterface` over `history`.
+    Backtests run on a pool of worker processes, which map the history from shared memory (`History.to_shared`)
+    instead of receiving a copy of it.
+
+    Example:
+        >>> sweep = Sweep(lambda window, lower, upper: SignalStrategy(Rsi(window, lower, upper), OrderGenerator()),
+        ...               {"window": [7, 14], "lower": [.2, .3], "upper": [.7, .8]},
+        ...               history, SecuritySignalView("date", ["close"]), Portfolio({Instrument("USD"): 1000.0}))
+        >>> sweep.run()
+        # One row per parameter set, with its parameters, pnl, return, turnover and trade count.
+    """
+
+    def __init__(self,
+                 factory: Callable[..., Strategy],
+                 grid: Union[Mapping[str, Iterable], Iterable[Mapping[str, Any]]],
+                 history: History,
+                 history_view: HistoryView,
+                 portfolio: Optional[Portfolio] = None,
+                 fill_registry: Optional[FillModelRegistry] = None,
+                 context_fn: Optional[Callable] = None,
+                 vectorized: Optional[bool] = None,
+                 processes: Optional[int] = None,
+                 context: Optional[str] = None):
+        """
+        Args:
+            factory (Callable[..., Strategy]): Builds a strategy from the keyword arguments of a parameter set.
+                Must be picklable for the `spawn` and `forkserver` start methods.
+            grid (Mapping[str, Iterable] | Iterable[Mapping]): Values of each parameter, whose cartesian product
+                is swept, or the parameter sets themselves.
+            history (History): The history to backtest over.
+            history_view (HistoryView): The view to run strategies and price orders with.
+            portfolio (Portfolio): The starting portfolio of every backtest. Defaults to an empty portfolio.
+            fill_registry (FillModelRegistry): The fill models of every backtest. Defaults to immediate market fills.
+            context_fn (Callable): Called with each backtest's interface, returns the `Executor` context function,
+                such as `PortfolioContext.bind`.
+            vectorized (bool): Whether to backtest with `Executor.run_vectorized`. Defaults to doing so when the
+                strategy supports it.
+            processes (int): The number of worker processes. Defaults to the number of CPUs,
+                and backtests run in this process if it is 1.
+            context (str): The multiprocessing start method.
+        """
+        self.factory = factory
+        if isinstance(grid, Mapping):
+            names = list(grid.keys())
+            self.params: List[Dict[str, Any]] = [
+                dict(zip(names, values)) for values in itertools.product(*(list(grid[name]) for name in names))
+            ]
+        else:
+            self.params = [dict(params) for params in grid]
+        self.history = history
+        self.history_view = history_view
+        self.portfolio = portfolio if portfolio is not None else Portfolio()
+        self.fill_registry = fill_registry
+        self.context_fn = context_fn
+        self.vectorized = vectorized
+        self.processes = processes or multiprocessing.cpu_count()
+        self._context = multiprocessing.get_context(context)
+
+    def backtest(self, params: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Backtest the strategy of one parameter set.
+
+        Returns:
+            Dict[str, float]: The pnl, return, turnover (traded value) and number of trades of the backtest.
+        """
+        strategy = self.factory(**params)
+        portfolio = Portfolio(self.portfolio.quantities.copy())
+        interface = BacktestInterface(self.history, self.history_view, portfolio, self.fill_registry)
+
+        vectorized = self.vectorized
+        if vectorized is None:
+            vectorized = (self.context_fn is None and self.fill_registry is None
+                          and isinstance(strategy, SignalStrategy) and strategy.signal_generator.stateless)
+        if vectorized:
+            result, _ = Executor(strategy, interface).run_vectorized(self.history_view, self.history)
+        else:
+            context_fn = self.context_fn(interface) if self.context_fn is not None else None
+            executor = Executor(strategy, interface, context_fn)
+            result, _ = executor.run(self.history_view, interface.iter(), history=self.history.copy())
+
+        # value both portfolios at the prices of the first and last timestamp each instrument was seen
+        prices, _ = self.history_view.price(self.history)
+        by_instrument = prices.groupby(level=0, sort=False, observed=True)
+        base = pd.Series({interface.market.base_security: 1.0})
+        start = _equity(self.portfolio, pd.concat([base, by_instrument.first()]))
+        end = _equity(interface.portfolio, pd.concat([base, by_instrument.last()]))
+
+        transactions = [tx for tx in result.data.to_numpy().ravel() if isinstance(tx, OrderTransaction)]
+        return {
+            "pnl": end - start,
+            "return": (end - start) / start if start else math.nan,
+            "turnover": float(sum(abs(tx.value) for tx in transactions)),
+            "trades": len(transactions),
+        }
+
+    def run(self) -> pd.DataFrame:
+        """
+        Backtest every parameter set.
+
+        Returns:
+            pd.DataFrame: One row per parameter set, in grid order, with a column per parameter,
+                followed by the `backtest` results.
+        """
+        if self.processes > 1 and len(self.params) > 1:
+            worker = copy.copy(self)
+            worker.history = None
+            with self.history.to_shared() as shared, self._context.Pool(
+                    min(self.processes, len(self.params)), _init_worker, (worker, shared.name)
+            ) as pool:
+                results = pool.map(_run_worker, self.params)
+        else:
+            results = [self.backtest(params) for params in self.params]
+
+        return pd.DataFrame([{**params, **result} for params, result in zip(self.params, results)])
@@ -27,9 +27,9 @@ class SecurityPriceView(HistoryView):
 
     def get(self, origin: History, idx):
         if isinstance(idx, int) and idx < 0:
-            times = sorted(origin.levels(self.time_index))
+            times = origin.level_index(self.time_index)
             try:
-                idx = times[idx]
+                idx = times.key(idx)
             except IndexError:
                 raise IndexError(f"idx {idx} out of range for time index with {len(times)} unique timestamps")
         return origin.get({self.time_index: [idx]}, ["price"])
@@ -3,7 +3,7 @@ import unittest
 import matplotlib.pyplot as plt
 import numpy as np
 
-from dxlib.core.dynamics import OrnsteinUhlenbeck, CoxIngersollRoss, GeometricBrownianMotion, Hawkes
+from dxlib.core.dynamics import OrnsteinUhlenbeck, CoxIngersollRoss, GeometricBrownianMotion, Hawkes, MultivariateHawkes
 
 
 class TestGBM(unittest.TestCase):
@@ -115,6 +115,40 @@ class TestHawkes(unittest.TestCase):
         plt.show()
 
 
+class TestHawkesEvents(unittest.TestCase):
+    def test_recursive_intensity(self):
+        hawkes = Hawkes(0.5, 0.5, 0.3)
+        events = np.array([0.5, 1.2, 1.3, 4.0])
+        for event in events:
+            hawkes.update(event, dt=2)
+
+        for x in (4.0, 4.5, 10.0):
+            self.assertAlmostEqual(float(hawkes.intensity(x, 2, events)), float(hawkes.intensity(x, 2)))
+
+        hawkes.reset()
+        self.assertEqual(0.5, hawkes.intensity(10.0, 2))
+
+    def test_simulate_events(self):
+        # stationary rate mu / (1 - alpha / beta)
+        hawkes = Hawkes(1.0, 0.5, 1.0)
+        events = hawkes.simulate_events(2e4, seed=0)
+
+        self.assertTrue((np.diff(events) > 0).all())
+        self.assertTrue(0 < events[0] and events[-1] <= 2e4)
+        self.assertAlmostEqual(2.0, len(events) / 2e4, delta=0.05)
+        np.testing.assert_array_equal(events, hawkes.simulate_events(2e4, seed=0))
+
+    def test_multivariate(self):
+        excitation = np.array([[0.3, 0.2], [0.1, 0.4]])
+        for decay in (1.0, np.array([[1.0, 2.0], [0.5, 1.0]])):
+            hawkes = MultivariateHawkes([0.5, 0.5], excitation, decay)
+            times, marks = hawkes.simulate_events(2e4, seed=0)
+
+            self.assertTrue((np.diff(times) > 0).all())
+            expected = np.linalg.solve(np.eye(2) - excitation / decay, [0.5, 0.5])
+            np.testing.assert_allclose(expected, np.bincount(marks) / 2e4, rtol=0.05)
+
+
 class TestCIR(unittest.TestCase):
     def setUp(self):
         self.mean_reversion = 0.1
@@ -194,5 +228,63 @@ class TestMeanReversion(unittest.TestCase):
         plt.title("Simulated trajectories")
         plt.show()
 
+class TestSimulatePaths(unittest.TestCase):
+    def setUp(self):
+        self.processes = {
+            "gbm": (GeometricBrownianMotion(0.05, 0.2), 100.0),
+            "ou": (OrnsteinUhlenbeck(0.5, 1.0, 0.2), 2.0),
+            "cir": (CoxIngersollRoss(0.5, 0.04, 0.5), 0.04),
+            "hawkes": (Hawkes(0.5, 0.5, 1), 0.0),
+        }
+
+    def test_shape(self):
+        for name, (process, x0) in self.processes.items():
+            paths = process.simulate_paths(x0, 0.01, 50, 7, seed=0)
+            self.assertEqual((50, 7), paths.shape, name)
+            np.testing.assert_array_equal(paths[0], x0)
+
+    def test_chunks(self):
+        for name, (process, x0) in self.processes.items():
+            paths = process.simulate_paths(x0, 0.01, 100, 5, seed=1)
+            chunks = list(process.iter_paths(x0, 0.01, 100, 5, seed=1, chunk_size=30))
+
+            self.assertEqual([30, 30, 30, 10], [len(chunk) for chunk in chunks], name)
+            np.testing.assert_allclose(paths, np.concatenate(chunks), err_msg=name)
+
+    def test_seed(self):
+        gbm, x0 = self.processes["gbm"]
+        np.testing.assert_array_equal(gbm.simulate_paths(x0, 1, 10, 3, seed=2), gbm.simulate_paths(x0, 1, 10, 3, seed=2))
+        self.assertFalse(np.array_equal(gbm.simulate_paths(x0, 1, 10, 3, seed=2), gbm.simulate_paths(x0, 1, 10, 3, seed=3)))
+
+    def test_gbm_moments(self):
+        gbm = GeometricBrownianMotion(0.05, 0.2)
+        paths = gbm.simulate_paths(100.0, 1 / 252, 253, 20000, seed=0)
+
+        self.assertAlmostEqual(100 * np.exp(0.05), paths[-1].mean(), delta=1)
+        log_returns = np.diff(np.log(paths), axis=0)
+        self.assertAlmostEqual(0.2 / np.sqrt(252), log_returns.std(), delta=1e-4)
+
+    def test_ou_mean_reversion(self):
+        ou = OrnsteinUhlenbeck(2.0, 1.0, 0.1)
+        paths = ou.simulate_paths(np.linspace(0, 2, 1000), 0.01, 500, 1000, seed=0)
+
+        self.assertAlmostEqual(1.0, paths[-1].mean(), delta=0.01)
+        # stationary variance of the euler scheme, sigma^2 dt / (1 - phi^2)
+        phi = 1 - 2.0 * 0.01
+        self.assertAlmostEqual(0.1 ** 2 * 0.01 / (1 - phi ** 2), paths[-1].var(), delta=5e-4)
+
+    def test_cir_non_negative(self):
+        cir = CoxIngersollRoss(0.5, 0.04, 0.5)
+        paths = cir.simulate_paths(0.04, 0.1, 200, 1000, seed=0)
+
+        self.assertTrue((paths >= 0).all())
+        self.assertAlmostEqual(0.04, paths[-1].mean(), delta=0.01)
+
+    def test_hawkes_increasing(self):
+        hawkes = Hawkes(0.5, 0.5, 1)
+        paths = hawkes.simulate_paths(0.0, 1, 100, 50, seed=0)
+        self.assertTrue((np.diff(paths, axis=0) > 0).all())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,145 @@
+import os
+from datetime import datetime
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+
+from dxlib import Instrument
+from dxlib.data._storage import Storage
+from dxlib.history import History, HistorySchema, HistorySchemaDto, HistoryDto
+
+
+def history():
+    schema = HistorySchema(index={"date": datetime, "instrument": Instrument},
+                           columns={"close": float, "volume": int})
+    index = pd.MultiIndex.from_product([pd.date_range("2021-01-01", periods=4),
+                                        [Instrument("AAPL"), Instrument("MSFT")]], names=["date", "instrument"])
+    return History(schema, pd.DataFrame({"close": np.arange(8, dtype=float), "volume": np.arange(8) * 10},
+                                        index=index))
+
+
+def test_keys_coexist(tmp_path):
+    storage = Storage(str(tmp_path))
+    frame = pd.DataFrame({"a": [1.0, 2.0]})
+    schema = HistorySchemaDto.from_domain(history().history_schema)
+
+    storage.store("unit", "frame", frame)
+    storage.store("unit", "schema", schema)
+    storage.store("unit", "history", history())
+
+    pd.testing.assert_frame_equal(storage.load("unit", "frame"), frame)
+    assert storage.load("unit", "schema", HistorySchemaDto) == schema
+    assert storage.load("unit", "history").history_schema == history().history_schema
+    assert sorted(path.name for path in tmp_path.rglob("*") if path.is_file()) == \
+        ["frame.h5", "history.h5", "schema.h5"]
+
+
+def test_store_one_key(tmp_path):
+    storage = Storage(str(tmp_path))
+    storage.store("unit", "large", history())
+    large = storage._key_path("unit", "large")
+    modified = os.stat(large).st_mtime_ns
+
+    storage.store("unit", "small", pd.DataFrame({"a": [1.0]}))
+    storage.store("unit", "small", pd.DataFrame({"a": [2.0]}), overwrite=True)
+    assert os.stat(large).st_mtime_ns == modified
+    assert storage.load("unit", "small")["a"].tolist() == [2.0]
+
+
+def test_legacy_unit(tmp_path):
+    storage = Storage(str(tmp_path))
+    schema = HistorySchemaDto.from_domain(history().history_schema)
+    with h5py.File(storage._path("unit"), "w") as f:
+        f.create_dataset("schema", data=schema.model_dump_json())
+
+    assert storage.load("unit", "schema", HistorySchemaDto) == schema
+    with pytest.raises(KeyError):
+        storage.store("unit", "schema", schema)
+
+
+def test_overwrite(tmp_path):
+    storage = Storage(str(tmp_path))
+    storage.store("unit", "frame", pd.DataFrame({"a": [1.0]}))
+    storage.store("unit", "other", pd.DataFrame({"b": [1.0]}))
+    with pytest.raises(KeyError):
+        storage.store("unit", "frame", pd.DataFrame({"a": [2.0]}))
+
+    storage.store("unit", "frame", pd.DataFrame({"a": [2.0]}), overwrite=True)
+    assert storage.load("unit", "frame")["a"].tolist() == [2.0]
+    assert storage.load("unit", "other")["b"].tolist() == [1.0]
+    with pytest.raises(KeyError):
+        storage.load("unit", "missing")
+
+
+def test_frame_native(tmp_path):
+    storage = Storage(str(tmp_path))
+    frame = pd.DataFrame({
+        "float": [1.5, np.nan, 3.0],
+        "int": [1, 2, 3],
+        "bool": [True, False, True],
+        "str": ["x", "y", "x"],
+        "time": pd.date_range("2021-01-01", periods=3, tz="America/New_York"),
+        "category": pd.Categorical(["b", "a", "b"]),
+    }, index=pd.Index(pd.date_range("2021-01-01", periods=3, freq="h"), name="date"))
+    storage.store("unit", "frame", frame)
+
+    loaded = storage.load("unit", "frame")
+    pd.testing.assert_frame_equal(loaded, frame, check_freq=False)
+    with h5py.File(storage._key_path("unit", "frame"), "r") as f:
+        assert f["data/columns/0"].dtype == np.float64
+        assert f["data/columns/0"].compression == "gzip"
+        assert f["data/columns/3"].dtype == np.int32
+
+
+def test_nullable(tmp_path):
+    storage = Storage(str(tmp_path))
+    frame = pd.DataFrame({
+        "int": pd.array([1, None, 3], dtype="Int64"),
+        "float": pd.array([1.5, None, 3.0], dtype="Float64"),
+        "bool": pd.array([True, None, False], dtype="boolean"),
+        "str": pd.array(["x", None, "y"], dtype="string"),
+    })
+    storage.store("unit", "frame", frame)
+    pd.testing.assert_frame_equal(storage.load("unit", "frame"), frame)
+    with h5py.File(storage._key_path("unit", "frame"), "r") as f:
+        assert f["data/columns/0"].dtype == np.int64
+
+
+def test_empty(tmp_path):
+    storage = Storage(str(tmp_path))
+    frame = pd.DataFrame({"a": [1.0], "b": ["x"]}).iloc[:0]
+    storage.store("unit", "frame", frame)
+    assert storage.load("unit", "frame").shape == (0, 2)
+
+    empty = History(history().history_schema, history().data.iloc[:0])
+    storage.store("unit", "history", empty)
+    loaded = storage.load("unit", "history")
+    assert len(loaded.data) == 0
+    assert list(loaded.data.columns) == ["close", "volume"]
+
+
+def test_history(tmp_path):
+    storage = Storage(str(tmp_path))
+    for key, original in (("history", history()), ("categorized", history().categorize())):
+        storage.store("unit", key, original, compression=None)
+        loaded = storage.load("unit", key, HistoryDto)
+        assert loaded.history_schema == original.history_schema
+        pd.testing.assert_frame_equal(loaded.data, original.data)
+
+    assert isinstance(storage.load("unit", "history").data.index.get_level_values("instrument")[0], Instrument)
+
+
+def test_cached(tmp_path):
+    storage = Storage(str(tmp_path))
+    calls = []
+
+    def fetch(n):
+        calls.append(n)
+        return history()
+
+    first = storage.cached("unit", History, fetch, 1)
+    second = storage.cached("unit", History, fetch, 1)
+    assert calls == [1]
+    pd.testing.assert_frame_equal(first.data, second.data)
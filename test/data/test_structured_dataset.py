@@ -0,0 +1,123 @@
+import os
+from datetime import date, datetime
+
+import polars as pl
+import pytest
+
+from dxlib.data._structured_storage import StructuredStorage
+
+
+def bars(symbol, days, close):
+    return pl.DataFrame({
+        "date": pl.Series(days, dtype=pl.Date),
+        "symbol": [symbol] * len(days),
+        "open": [close] * len(days),
+        "high": [close] * len(days),
+        "low": [close] * len(days),
+        "close": [close] * len(days),
+        "volume": [100] * len(days),
+    })
+
+
+def files(root):
+    return sorted(os.path.relpath(os.path.join(path, name), root)
+                  for path, _, names in os.walk(root) for name in names)
+
+
+def test_append_writes_only_new_parts(tmp_path):
+    s = StructuredStorage(str(tmp_path))
+    s.append_timeseries(pl.concat([bars("A", [date(2020, 12, 31), date(2021, 1, 4)], 1.0),
+                                   bars("EURUSD=X", [date(2021, 1, 4)], 1.0)]))
+    first = os.path.join(s.timeseries_dir, "symbol=A", "year=2021", "part-000001.parquet")
+    modified = os.path.getmtime(first)
+
+    s.append_timeseries(bars("A", [date(2021, 1, 4), date(2021, 1, 5)], 2.0))
+    assert files(s.timeseries_dir) == [
+        os.path.join("symbol=A", "year=2020", "part-000001.parquet"),
+        os.path.join("symbol=A", "year=2021", "part-000001.parquet"),
+        os.path.join("symbol=A", "year=2021", "part-000002.parquet"),
+        os.path.join("symbol=EURUSD%3DX", "year=2021", "part-000001.parquet"),
+    ]
+    assert os.path.getmtime(first) == modified
+
+    # later rows replace earlier ones with the same (date, symbol)
+    out = s.query_timeseries(symbols=["A"]).sort("date")
+    assert out.get_column("close").to_list() == [1.0, 2.0, 2.0]
+    assert s.query_timeseries(symbols=["EURUSD=X"]).shape[0] == 1
+
+
+def test_compact(tmp_path):
+    s = StructuredStorage(str(tmp_path))
+    for close in (1.0, 2.0, 3.0):
+        s.append_timeseries(bars("A", [date(2021, 1, 4), date(2021, 1, 5)], close))
+    s.append_timeseries(bars("B", [date(2021, 1, 4)], 1.0))
+    expected = s.query_timeseries().sort(["symbol", "date"])
+
+    assert s.compact(symbols=["B"]) == 0
+    assert s.compact() == 1
+    assert s.compact() == 0
+    assert len(files(s.timeseries_dir)) == 2
+    assert s.query_timeseries().sort(["symbol", "date"]).equals(expected)
+    assert expected.get_column("close").to_list() == [3.0, 3.0, 1.0]
+
+
+def test_migrate_single_file(tmp_path):
+    legacy = pl.concat([bars("A", [date(2021, 1, 4)], 1.0), bars("B", [date(2022, 1, 4)], 2.0)])
+    legacy.write_parquet(tmp_path / StructuredStorage.TIMESERIES_FILENAME)
+
+    s = StructuredStorage(str(tmp_path), partition_by=["symbol"])
+    assert not os.path.exists(s.timeseries_path)
+    assert len(files(s.timeseries_dir)) == 2
+    assert s.query_timeseries().sort("symbol").equals(legacy)
+
+
+def test_partition_keys(tmp_path):
+    with pytest.raises(ValueError):
+        StructuredStorage(str(tmp_path), partition_by=["close"])
+    s = StructuredStorage(str(tmp_path), partition_by=["year", "month"])
+    with pytest.raises(ValueError):
+        s.append_timeseries(bars("A", [date(2021, 1, 4)], 1.0), partition_by=["symbol"])
+    s.append_timeseries(bars("A", [date(2021, 1, 4), date(2021, 2, 1)], 1.0))
+    assert files(s.timeseries_dir)[0] == os.path.join("year=2021", "month=1", "part-000001.parquet")
+
+
+def test_query_pushdown(tmp_path):
+    s = StructuredStorage(str(tmp_path))
+    days = [date(2020, 12, 30), date(2020, 12, 31), date(2021, 1, 4), date(2021, 3, 1)]
+    for i, symbol in enumerate(["A", "B", "C"]):
+        s.append_timeseries(bars(symbol, days, float(i)))
+    s.append_timeseries(bars("A", [date(2021, 1, 4)], 9.0))
+    everything = pl.concat([bars(symbol, days, float(i)) for i, symbol in enumerate(["A", "B", "C"])])
+    replaced = (pl.col("symbol") == "A") & (pl.col("date") == date(2021, 1, 4))
+    everything = pl.concat([everything.filter(~replaced), bars("A", [date(2021, 1, 4)], 9.0)])
+
+    # only the partitions of the symbols and years asked for are scanned
+    assert len(s._partitions(["A", "C"], date(2021, 1, 1), date(2021, 1, 31))) == 2
+    plan = s.scan_timeseries(["A"], date(2021, 1, 1), date(2021, 1, 31)).select("date", "close").explain()
+    assert "SELECTION" in plan and "PROJECT 3/7 COLUMNS" in plan
+
+    out = s.query_timeseries(["A", "C"], date(2021, 1, 1), date(2021, 1, 31), columns=["symbol", "close"],
+                             sort_by=[("symbol", "desc")])
+    assert out.rows() == [("C", 2.0), ("A", 9.0)]
+
+    out = s.query_timeseries(sort_by=[("date", "desc"), ("symbol", "asc")], limit=4)
+    expected = everything.sort(["date", "symbol"], descending=[True, False]).head(4)
+    assert out.equals(expected)
+    assert s.query_timeseries(start=datetime(2021, 3, 1, 12)).shape[0] == 0
+
+
+def test_query_months(tmp_path):
+    s = StructuredStorage(str(tmp_path), partition_by=["symbol", "year", "month"])
+    s.append_timeseries(bars("A", [date(2021, 1, 31), date(2021, 2, 1), date(2021, 12, 31)], 1.0))
+    assert len(s._partitions(start=date(2021, 1, 31), end=date(2021, 2, 1))) == 2
+    assert len(s._partitions(start=date(2021, 12, 1))) == 1
+    out = s.query_timeseries(start=date(2021, 2, 1)).sort("date")
+    assert out.get_column("date").to_list() == [date(2021, 2, 1), date(2021, 12, 31)]
+
+
+def test_query_assets(tmp_path):
+    s = StructuredStorage(str(tmp_path))
+    s.store_asset_metadata(pl.DataFrame({"symbol": ["A", "B", "C"], "sector": ["x", "y", "x"], "cap": [3, 2, 1]}))
+    out = s.query_assets(filters=[("sector", "==", "x")], columns=["symbol"], sort_by=[("cap", "asc")])
+    assert out.get_column("symbol").to_list() == ["C", "A"]
+    assert s.query_assets(symbols=["B"], limit=1).get_column("cap").to_list() == [2]
@@ -0,0 +1,126 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dxlib import Instrument, InstrumentStore
+from dxlib.history import History
+from dxlib.history.level_index import LevelIndex
+from test.history.test_shared_history import history
+
+
+def decoded(data: pd.DataFrame) -> pd.DataFrame:
+    return data.reset_index().astype({"instrument": object})
+
+
+class TestInstrumentStore(unittest.TestCase):
+    def test_ids(self):
+        store = InstrumentStore.from_symbols(["MSFT", "AAPL"])
+        self.assertEqual(1, store.id("AAPL"))
+        self.assertEqual(0, store.id(Instrument("MSFT")))
+
+        # new instruments are added, and existing ids do not change
+        ids = store.ids([Instrument("GOOG"), "AAPL", Instrument("GOOG"), None])
+        self.assertEqual([2, 1, 2, -1], ids.tolist())
+        self.assertEqual(["MSFT", "AAPL", "GOOG"], store.symbols())
+        self.assertEqual([Instrument("GOOG"), Instrument("MSFT")], store.decode([2, 0]))
+
+        store.add("AAPL", Instrument("AAPL", "Apple"))
+        self.assertEqual(1, store.id("AAPL"))
+        self.assertEqual("Apple", store.categories[1].name)
+
+        # ids of symbols removed from the dict of instruments are kept, and still decode
+        codes = store.ids(["MSFT", "AAPL"])
+        del store.instruments["MSFT"]
+        store.setdefault("TSLA", Instrument("TSLA"))
+        self.assertEqual(3, store.id("TSLA"))
+        self.assertEqual(1, store.id("AAPL"))
+        self.assertEqual([Instrument("MSFT"), Instrument("AAPL")], store.decode(codes))
+        with self.assertRaises(KeyError):
+            store.id("MSFT")
+
+        store.add("MSFT")
+        self.assertEqual(0, store.id("MSFT"))
+        self.assertEqual(4, len(store.categories))
+
+    def test_categorical(self):
+        store = InstrumentStore()
+        categorical = store.categorical([Instrument("MSFT"), Instrument("AAPL"), Instrument("MSFT")])
+        self.assertEqual([0, 1, 0], categorical.codes.tolist())
+        self.assertEqual([Instrument("MSFT"), Instrument("AAPL"), Instrument("MSFT")], list(categorical))
+
+
+class TestCategorize(unittest.TestCase):
+    def test_categorize(self):
+        store = InstrumentStore.from_symbols(["MSFT", "TSLA"])
+        original = history(n_days=10)
+        categorized = original.categorize(store=store)
+
+        index = categorized.data.index
+        self.assertIsInstance(index.levels[1].dtype, pd.CategoricalDtype)
+        self.assertEqual([store.id(instrument) for instrument in original.level_values("instrument")],
+                         index.codes[1].tolist())
+        self.assertEqual(["MSFT", "TSLA", "AAPL", "GOOG"], store.symbols())
+        pd.testing.assert_frame_equal(decoded(categorized.data), decoded(original.data))
+        self.assertEqual(original.levels("instrument"), categorized.levels("instrument"))
+
+    def test_get(self):
+        original = history(n_days=10)
+        original.data = original.data.iloc[np.random.default_rng(0).permutation(len(original))]
+        categorized = original.categorize()
+
+        for index in ({"instrument": [Instrument("MSFT")]},
+                      {"instrument": [Instrument("GOOG"), Instrument("AAPL")], "date": slice("2021-01-03", "2021-01-05")},
+                      {"instrument": slice(Instrument("B"), Instrument("H"))}):
+            expected = original.get(index)
+            actual = categorized.get(index)
+            pd.testing.assert_frame_equal(decoded(actual.data), decoded(expected.data))
+
+    def test_concat(self):
+        store = InstrumentStore()
+        original = history(n_days=10)
+        first = History(original.history_schema, original.data.iloc[:12]).categorize(store=store)
+        second = History(original.history_schema, original.data.iloc[6:]).categorize(store=store)
+
+        first.concat(second)
+        self.assertIsInstance(first.data.index.levels[1].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(decoded(first.data), decoded(original.data))
+
+        # grouping only sees the instruments present
+        self.assertEqual(3, len(first.data.groupby(level="instrument", observed=True)))
+
+    def test_concat_growing_store(self):
+        original = history(n_days=10)
+        instruments = original.data.index.get_level_values("instrument")
+        first_instruments = instruments.unique()[:2]
+        first, second = (History(original.history_schema, original.data[mask]) for mask in
+                         (instruments.isin(first_instruments), ~instruments.isin(first_instruments)))
+        for part in (first, second):
+            part.data.index = part.data.index.remove_unused_levels()
+
+        for columnar in (False, True):
+            store = InstrumentStore()
+            # the store grows between the two calls, so the categories of the second extend those of the first
+            result = History(first.history_schema, first.data, columnar=columnar).categorize(store=store)
+            result.concat(second.categorize(store=store))
+
+            dtype = result.data.index.levels[1].dtype
+            self.assertIsInstance(dtype, pd.CategoricalDtype)
+            self.assertEqual(list(store.categories), list(dtype.categories))
+            pd.testing.assert_frame_equal(decoded(result.data), decoded(pd.concat([first.data, second.data])))
+
+    def test_level_index(self):
+        values = pd.Index([Instrument(s) for s in "CABBAC"])
+        index = pd.MultiIndex.from_arrays([range(6), values])
+        index = index[[5, 0, 3, 1]]  # leaves levels and codes unused by any row
+
+        level = LevelIndex(index.levels[1], np.asarray(index.codes[1]))
+        expected = LevelIndex(index.get_level_values(1))
+        self.assertEqual(expected.keys.tolist(), level.keys.tolist())
+        self.assertEqual(expected.offsets.tolist(), level.offsets.tolist())
+        self.assertEqual(expected.order.tolist(), level.order.tolist())
+        self.assertEqual([0, 1], level.rows([Instrument("C")]).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+from dxlib.history import History, HistorySchema
+from dxlib.history.history_buffer import HistoryBuffer
+
+
+def schema():
+    return HistorySchema(
+        index={"date": pd.Timestamp, "instrument": str},
+        columns={"close": Number},
+    )
+
+
+def frame(dates, instruments, values):
+    index = pd.MultiIndex.from_product([pd.to_datetime(dates), instruments], names=["date", "instrument"])
+    return pd.DataFrame({"close": np.asarray(values, dtype=float)}, index=index)
+
+
+class TestHistoryBuffer(unittest.TestCase):
+    def test_append(self):
+        buffer = HistoryBuffer(["date", "instrument"], ["close"], capacity=2)
+        for i in range(10):
+            buffer.append(frame([f"2021-01-{i + 1:02d}"], ["AAPL", "MSFT"], [i, -i]))
+
+        self.assertEqual(20, len(buffer))
+        self.assertGreaterEqual(buffer.capacity, 20)
+        data = buffer.frame()
+        self.assertEqual(["date", "instrument"], list(data.index.names))
+        self.assertEqual(9.0, data.loc[(pd.Timestamp("2021-01-10"), "AAPL"), "close"])
+
+    def test_keep(self):
+        first = HistoryBuffer(["date", "instrument"], ["close"])
+        last = HistoryBuffer(["date", "instrument"], ["close"])
+        for buffer, keep in ((first, "first"), (last, "last")):
+            buffer.append(frame(["2021-01-01"], ["AAPL"], [1]), keep=keep)
+            buffer.append(frame(["2021-01-01", "2021-01-02"], ["AAPL"], [2, 3]), keep=keep)
+
+        self.assertEqual([1.0, 3.0], first.frame()["close"].tolist())
+        self.assertEqual([2.0, 3.0], last.frame()["close"].tolist())
+
+    def test_reorder_levels(self):
+        buffer = HistoryBuffer(["date", "instrument"], ["close"])
+        buffer.append(frame(["2021-01-01"], ["AAPL"], [1]))
+        buffer.append(frame(["2021-01-02"], ["AAPL"], [2]).swaplevel())
+
+        self.assertEqual(["date", "instrument"], list(buffer.frame().index.names))
+        self.assertEqual(2, len(buffer))
+
+    def test_new_column(self):
+        buffer = HistoryBuffer(["date", "instrument"], ["close"])
+        buffer.append(frame(["2021-01-01"], ["AAPL"], [1]))
+        buffer.append(frame(["2021-01-02"], ["AAPL"], [2]).assign(volume=10))
+
+        data = buffer.frame()
+        self.assertEqual(["close", "volume"], list(data.columns))
+        self.assertTrue(np.isnan(data["volume"].iloc[0]))
+        self.assertEqual(10, data["volume"].iloc[1])
+
+    def test_frame_views(self):
+        buffer = HistoryBuffer(["date", "instrument"], ["close"])
+        buffer.append(frame(["2021-01-01"], ["AAPL", "MSFT"], [1, 2]))
+        before = buffer.frame()
+        buffer.append(frame(["2021-01-02"], ["AAPL", "MSFT"], [3, 4]))
+        after = buffer.frame()
+
+        self.assertTrue(np.shares_memory(before["close"].to_numpy(), after["close"].to_numpy()))
+        self.assertEqual([1.0, 2.0], before["close"].tolist())
+        self.assertEqual(pd.Timestamp("2021-01-02"), after.index[3][0])
+
+        buffer.update(frame(["2021-01-01"], ["AAPL"], [10]))
+        self.assertEqual([1.0, 2.0, 3.0, 4.0], after["close"].tolist())
+        self.assertEqual([10.0, 2.0, 3.0, 4.0], buffer.frame()["close"].tolist())
+
+    def test_single_level(self):
+        buffer = HistoryBuffer(["date"], ["close"])
+        for day in ("2021-01-01", "2021-01-02"):
+            buffer.append(pd.DataFrame({"close": [1.0]}, index=pd.DatetimeIndex([day], name="date", tz="UTC")))
+
+        index = buffer.frame().index
+        self.assertIsInstance(index, pd.DatetimeIndex)
+        self.assertEqual("UTC", str(index.tz))
+        self.assertEqual("date", index.name)
+
+    def test_take(self):
+        buffer = HistoryBuffer(["date", "instrument"], ["close"])
+        for i in range(3):
+            buffer.append(frame([f"2021-01-0{i + 1}"], ["AAPL", "MSFT"], [i, -i]))
+
+        pd.testing.assert_frame_equal(buffer.frame().iloc[2:4], buffer.take(slice(2, 4)))
+        pd.testing.assert_frame_equal(buffer.frame().iloc[[0, 5]], buffer.take(np.array([0, 5])))
+
+
+class TestColumnarHistory(unittest.TestCase):
+    def test_concat(self):
+        pandas = History(schema())
+        columnar = History(schema(), columnar=True)
+        for i in range(5):
+            observation = History(schema(), frame([f"2021-01-0{i + 1}", "2021-01-01"], ["AAPL", "MSFT"], range(4)))
+            pandas.concat(observation)
+            columnar.concat(observation)
+
+        self.assertTrue(columnar.columnar)
+        self.assertEqual(len(pandas), len(columnar))
+        pd.testing.assert_frame_equal(pandas.data, columnar.data)
+
+    def test_concat_data(self):
+        history = History(HistorySchema({"date": pd.Timestamp, "instrument": str}, {"price": float}), columnar=True)
+        prices = pd.Series({"AAPL": 1.0, "MSFT": 2.0}, name="price")
+        prices.index.name = "instrument"
+        history.concat_data(prices, pd.Index([pd.Timestamp("2021-01-01")], name="date"))
+        history.concat_data(prices * 2, pd.Index([pd.Timestamp("2021-01-02")], name="date"))
+
+        self.assertEqual([1.0, 2.0, 2.0, 4.0], history.data["price"].tolist())
+
+    def test_set(self):
+        history = History(schema(), frame(["2021-01-01"], ["AAPL", "MSFT"], [1, 2]), columnar=True)
+        history.set(frame(["2021-01-01", "2021-01-02"], ["AAPL"], [10, 20]))
+
+        self.assertEqual([10.0, 2.0, 20.0], history.data["close"].tolist())
+
+    def test_copy(self):
+        history = History(schema(), frame(["2021-01-01"], ["AAPL"], [1]), columnar=True)
+        copy = history.copy()
+        copy.concat(History(schema(), frame(["2021-01-02"], ["AAPL"], [2])))
+
+        self.assertTrue(copy.columnar)
+        self.assertEqual(1, len(history))
+        self.assertEqual(2, len(copy))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from dxlib import Instrument
+from dxlib.data import Registry
+from dxlib.history import History, HistoryDto, HistorySchema
+from test.history.test_shared_history import history
+
+
+class TestHistoryIpc(unittest.TestCase):
+    def test_roundtrip(self):
+        original = history()
+        loaded = HistoryDto.from_ipc(HistoryDto.to_ipc(original))
+
+        self.assertEqual(loaded.history_schema, original.history_schema)
+        pd.testing.assert_frame_equal(loaded.data, original.data)
+        self.assertIsInstance(loaded.data.index.get_level_values("instrument")[0], Instrument)
+
+    def test_encoding(self):
+        table = pa.ipc.open_stream(HistoryDto.to_ipc(history())).read_all()
+
+        # numbers and datetimes are raw buffers, and only object columns are dictionary-encoded
+        self.assertEqual(pa.timestamp("ns"), table.schema.field("date").type)
+        self.assertEqual(pa.float64(), table.schema.field("close").type)
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("instrument").type))
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("venue").type))
+        self.assertEqual(3, len(table.column("instrument").chunk(0).dictionary))
+
+    def test_zero_copy(self):
+        buffer = HistoryDto.to_ipc(history())
+        close = HistoryDto.from_ipc(buffer).data["close"].to_numpy()
+        self.assertFalse(close.flags.writeable)
+        self.assertTrue(np.shares_memory(close, np.frombuffer(buffer, dtype=np.uint8)))
+
+    def test_missing(self):
+        schema = HistorySchema({"date": pd.Timestamp, "instrument": Instrument}, {"close": float, "venue": str})
+        index = pd.MultiIndex.from_arrays([
+            pd.DatetimeIndex(["2021-01-01", "2021-01-02", "2021-01-03"], tz="UTC"),
+            [Instrument("AAPL"), Instrument("MSFT"), Instrument("AAPL")],
+        ], names=["date", "instrument"])
+        original = History(schema, pd.DataFrame({"close": [1.0, np.nan, 3.0], "venue": ["XNAS", "XNYS", "XNAS"]},
+                                                index=index))
+        loaded = HistoryDto.from_ipc(HistoryDto.to_ipc(original))
+        pd.testing.assert_frame_equal(loaded.data, original.data)
+
+    def test_categorized(self):
+        original = history().categorize()
+        pd.testing.assert_frame_equal(HistoryDto.from_ipc(HistoryDto.to_ipc(original)).data, original.data)
+
+    def test_registry(self):
+        original = history()
+        loaded = Registry.loads(Registry.dumps(original), History)
+        pd.testing.assert_frame_equal(loaded.data, original.data)
+
+        schema = original.history_schema
+        self.assertEqual(schema, Registry.loads(Registry.dumps(schema), HistorySchema))
+
+
+if __name__ == '__main__':
+    unittest.main()
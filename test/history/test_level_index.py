@@ -0,0 +1,112 @@
+import unittest
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+from dxlib.history import History, HistorySchema
+from dxlib.history.level_index import LevelIndex
+from dxlib.strategy.views import SecurityPriceView
+
+
+def history(shuffle=False):
+    dates = pd.date_range("2021-01-01", periods=5)
+    index = pd.MultiIndex.from_product([dates, ["AAPL", "MSFT"]], names=["time", "instrument"])
+    data = pd.DataFrame({"price": np.arange(10, dtype=float)}, index=index)
+    if shuffle:
+        data = data.iloc[np.random.default_rng(0).permutation(len(data))]
+    schema = HistorySchema(index={"time": pd.Timestamp, "instrument": str}, columns={"price": Number})
+    return History(schema, data)
+
+
+class TestLevelIndex(unittest.TestCase):
+    def test_sorted(self):
+        level = LevelIndex(pd.Index([1, 1, 2, 3, 3, 3]))
+
+        self.assertTrue(level.sorted)
+        self.assertEqual([1, 2, 3], level.keys.tolist())
+        self.assertEqual(slice(3, 6), level.rows([3]))
+        self.assertEqual(slice(0, 3), level.range(0, 2))
+        self.assertEqual(slice(0, 0), level.rows([4]))
+        self.assertEqual(3, level.key(-1))
+
+    def test_unsorted(self):
+        level = LevelIndex(pd.Index([3, 1, 3, 2]))
+
+        self.assertFalse(level.sorted)
+        self.assertEqual([0, 2], level.rows([3]).tolist())
+        self.assertEqual([1, 3], level.range(None, 2).tolist())
+        self.assertEqual([0, 1, 2], level.rows([1, 3]).tolist())
+
+
+class TestHistoryGet(unittest.TestCase):
+    def test_list(self):
+        for shuffle in (False, True):
+            h = history(shuffle)
+            t = pd.Timestamp("2021-01-03")
+            expected = h.data[h.data.index.get_level_values("time").isin([t])]
+
+            pd.testing.assert_frame_equal(expected, h.get({"time": [t]}).data)
+
+    def test_slice(self):
+        for shuffle in (False, True):
+            h = history(shuffle)
+            expected = h.data.sort_index().loc[pd.IndexSlice["2021-01-02":"2021-01-04", :], :]
+
+            pd.testing.assert_frame_equal(expected, h.get({"time": slice("2021-01-02", "2021-01-04")}).data)
+
+    def test_levels(self):
+        h = history(shuffle=True)
+        result = h.get({"time": slice("2021-01-02", None), "instrument": ["MSFT"]})
+
+        self.assertEqual([3.0, 5.0, 7.0, 9.0], result.data["price"].tolist())
+
+    def test_cache(self):
+        h = history()
+        level = h.level_index("time")
+        self.assertIs(level, h.level_index("time"))
+
+        h.data = h.data.iloc[2:]
+        self.assertIsNot(level, h.level_index("time"))
+
+    def test_columnar(self):
+        h = history()
+        columnar = History(h.history_schema, columnar=True)
+        level = None
+        for time, rows in h.data.groupby(level="time"):
+            columnar.concat(History(h.history_schema, rows))
+            level = columnar.level_index("time")
+            self.assertIs(level, columnar.buffer.level_index(0))
+
+        expected = LevelIndex(h.level_values("time"))
+        self.assertEqual(expected.keys.tolist(), level.keys.tolist())
+        self.assertEqual(expected.offsets.tolist(), level.offsets.tolist())
+
+        last = pd.Timestamp("2021-01-05")
+        index = pd.MultiIndex.from_tuples([(last, "GOOG")], names=["time", "instrument"])
+        columnar.concat(History(h.history_schema, pd.DataFrame({"price": [10.0]}, index=index)))
+        self.assertEqual(slice(8, 10), level.rows([last]))
+        self.assertEqual(slice(8, 11), columnar.level_index("time").rows([last]))
+        self.assertIsNone(columnar.buffer.level_index(1))
+        self.assertEqual([2.0, 3.0], columnar.get({"time": [pd.Timestamp("2021-01-02")]}).data["price"].tolist())
+
+    def test_columnar_out_of_order(self):
+        h = history()
+        columnar = History(h.history_schema, h.data.iloc[4:], columnar=True)
+        self.assertIsNotNone(columnar.buffer.level_index(0))
+
+        columnar.concat(History(h.history_schema, h.data.iloc[:2]))
+        self.assertIsNone(columnar.buffer.level_index(0))
+        self.assertEqual([0.0, 1.0], columnar.get({"time": [pd.Timestamp("2021-01-01")]}).data["price"].tolist())
+
+    def test_view(self):
+        h = history(shuffle=True)
+        view = SecurityPriceView("time")
+
+        self.assertEqual([8.0, 9.0], sorted(view.get(h, -1).data["price"].tolist()))
+        with self.assertRaises(IndexError):
+            view.get(h, -6)
+
+
+if __name__ == '__main__':
+    unittest.main()
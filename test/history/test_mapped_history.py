@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dxlib import Instrument
+from dxlib.history import History
+from test.history.test_shared_history import history
+
+
+class TestMappedHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "history.dxh")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_open(self):
+        original = history()
+        original.to_file(self.path)
+
+        for mmap in (True, False):
+            opened = History.open(self.path, mmap=mmap)
+            self.assertEqual(opened.history_schema, original.history_schema)
+            pd.testing.assert_frame_equal(opened.data, original.data)
+
+        # numeric columns and the index codes are read-only views of the mapped file
+        opened = History.open(self.path)
+        close = opened.data["close"].to_numpy()
+        self.assertFalse(close.flags.writeable)
+        self.assertFalse(close.flags.owndata)
+        self.assertFalse(np.asarray(opened.data.index.codes[1]).flags.writeable)
+
+    def test_api(self):
+        original = history()
+        original.to_file(self.path)
+        opened = History.open(self.path)
+
+        index = {"instrument": [Instrument("MSFT")], "date": slice("2021-01-10", "2021-01-20")}
+        pd.testing.assert_frame_equal(opened.get(index, ["close"]).data, original.get(index, ["close"]).data)
+        self.assertEqual(opened.levels("instrument"), original.levels("instrument"))
+        rows = [(pd.Timestamp("2021-01-02"), Instrument("GOOG"))]
+        pd.testing.assert_frame_equal(opened.loc(rows).data, original.loc(rows).data)
+
+        # a copy is writable
+        copy = opened.copy()
+        copy.data.iloc[0, 0] = 0.0
+        self.assertNotEqual(0.0, opened.data.iloc[0, 0])
+
+    def test_columns(self):
+        original = history()
+        original.to_file(self.path)
+
+        opened = History.open(self.path, columns=["volume", "close"])
+        self.assertEqual(["close", "volume"], list(opened.data.columns))
+        self.assertEqual(["close", "volume"], opened.history_schema.column_names)
+        pd.testing.assert_frame_equal(opened.data, original.data[["close", "volume"]])
+
+        with self.assertRaises(KeyError):
+            History.open(self.path, columns=["open"])
+
+    def test_untrusted(self):
+        history().to_file(self.path)
+        with open(self.path, "rb") as file:
+            length = int.from_bytes(file.read(8), "little")
+            layout = json.loads(file.read(length))
+        self.assertIn("schema", layout)
+
+        # a file's header is only ever parsed as JSON
+        with open(self.path, "r+b") as file:
+            file.seek(8)
+            file.write(b"\x80\x04")
+        with self.assertRaises(ValueError):
+            History.open(self.path)
+
+    def test_categorized(self):
+        original = history().categorize()
+        original.to_file(self.path)
+        pd.testing.assert_frame_equal(History.open(self.path).data, original.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import multiprocessing
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dxlib import Instrument
+from dxlib.history import History, HistorySchema
+
+
+def history(n_days=50, symbols=("AAPL", "MSFT", "GOOG")):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=n_days)
+    index = pd.MultiIndex.from_product([dates, [Instrument(s) for s in symbols]], names=["date", "instrument"])
+    close = rng.uniform(100, 200, len(index))
+    data = pd.DataFrame({
+        "close": close,
+        "volume": rng.integers(0, 1000, len(index)),
+        "up": close > 150,
+        "venue": ["XNAS" if i % 2 else "XNYS" for i in range(len(index))],
+    }, index=index)
+    schema = HistorySchema({"date": pd.Timestamp, "instrument": Instrument},
+                           {"close": float, "volume": int, "up": bool, "venue": str})
+    return History(schema, data)
+
+
+def _close_sum(name: str) -> float:
+    return float(History.attach(name).data["close"].sum())
+
+
+class TestSharedHistory(unittest.TestCase):
+    def test_attach(self):
+        original = history()
+        with original.to_shared() as shared:
+            attached = History.attach(shared.name)
+            self.assertEqual(attached.history_schema, original.history_schema)
+            pd.testing.assert_frame_equal(attached.data, original.data)
+
+            # numeric columns and the index codes are read-only views of the block
+            close = attached.data["close"].to_numpy()
+            self.assertFalse(close.flags.writeable)
+            self.assertFalse(close.flags.owndata)
+            self.assertFalse(np.asarray(attached.data.index.codes[0]).flags.writeable)
+
+            # and operations work as on the original
+            selected = attached.get({"instrument": [Instrument("MSFT")]}, ["close"])
+            pd.testing.assert_frame_equal(selected.data, original.get({"instrument": [Instrument("MSFT")]}, ["close"]).data)
+
+    def test_outlives_history(self):
+        original = history(n_days=5)
+        shared = original.to_shared()
+        data = History.attach(shared.name).data
+        shared.release()
+        pd.testing.assert_frame_equal(data, original.data)
+        with self.assertRaises(FileNotFoundError):
+            History.attach(shared.name)
+
+    def test_single_index(self):
+        data = pd.DataFrame({"price": [1.0, 2.0, 3.0]}, index=pd.date_range("2021-01-01", periods=3, name="date"))
+        original = History(HistorySchema({"date": pd.Timestamp}, {"price": float}), data)
+        with original.to_shared() as shared:
+            pd.testing.assert_frame_equal(History.attach(shared.name).data, data, check_freq=False)
+
+    def test_header(self):
+        data = pd.DataFrame({"price": [1.0, 2.0], "venue": ["XNAS", "XNYS"],
+                             "at": pd.date_range("2021-01-01", periods=2, tz="UTC")},
+                            index=pd.Index([Instrument("AAPL"), Instrument("MSFT")], name="instrument"))
+        original = History(HistorySchema({"instrument": Instrument},
+                                         {"price": float, "venue": str, "at": pd.Timestamp}), data)
+        with original.to_shared() as shared:
+            # the layout is JSON, with instruments serialized through the Registry
+            length = int.from_bytes(bytes(shared.shm.buf[:8]), "little")
+            layout = json.loads(bytes(shared.shm.buf[8:8 + length]))
+            self.assertEqual([{"symbol": "AAPL"}, {"symbol": "MSFT"}], layout["levels"][0]["uniques"])
+
+            attached = History.attach(shared.name)
+            self.assertEqual(attached.history_schema, original.history_schema)
+            pd.testing.assert_frame_equal(attached.data, data)
+
+    def test_rejects_extension_dtypes(self):
+        data = pd.DataFrame({"volume": pd.array([1, None], dtype="Int64")}, index=pd.Index([1, 2], name="id"))
+        with self.assertRaises(TypeError):
+            History(HistorySchema({"id": int}, {"volume": int}), data).to_shared()
+
+    def test_processes(self):
+        original = history()
+        with original.to_shared() as shared, multiprocessing.get_context().Pool(2) as pool:
+            sums = pool.map(_close_sum, [shared.name] * 2)
+        self.assertEqual(sums, [float(original.data["close"].sum())] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
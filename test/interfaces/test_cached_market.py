@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from dxlib import Instrument
+from dxlib.core import InstrumentStore
+from dxlib.history import History, HistorySchema
+from dxlib.interfaces import CachedMarket, MarketInterface
+
+
+class Market(MarketInterface):
+    """Serves one deterministic daily bar per symbol and day, and records the ranges it was asked for."""
+
+    def __init__(self, version: float = 0.0):
+        self.calls = []
+        self.version = version
+        self.unpublished = set()
+        # the most bars of a symbol a call returns, the latest ones, as providers capping their output do
+        self.cap = None
+
+    @property
+    def history_schema(self) -> HistorySchema:
+        return HistorySchema(index={"date": datetime, "instrument": Instrument}, columns={"close": float})
+
+    def historical(self, symbols, start, end, interval="1d", store=None) -> History:
+        store = store or InstrumentStore()
+        instruments = [store.setdefault(symbol, Instrument(symbol)) for symbol in symbols]
+        self.calls.append(([instrument.symbol for instrument in instruments], start, end))
+        days = pd.date_range(start, end, freq="D", inclusive="left")[-self.cap if self.cap else None:]
+        instruments = [instrument for instrument in instruments if instrument.symbol not in self.unpublished]
+        index = pd.MultiIndex.from_product([days, instruments], names=["date", "instrument"])
+        close = [day.day + len(instrument.symbol) + self.version for day, instrument in index]
+        return History(self.history_schema, pd.DataFrame({"close": close}, index=index))
+
+
+class TestCachedMarket(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.market = Market()
+        self.cached = CachedMarket(self.market, self.dir.name)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_repeat(self):
+        start, end = datetime(2021, 1, 1), datetime(2021, 1, 11)
+        first = self.cached.historical(["AAPL", "MSFT"], start, end)
+        second = self.cached.historical(["AAPL", "MSFT"], start, end)
+
+        self.assertEqual([(["AAPL", "MSFT"], start, end)], self.market.calls)
+        pd.testing.assert_frame_equal(first.data, second.data)
+        pd.testing.assert_frame_equal(first.data, Market().historical(["AAPL", "MSFT"], start, end).data)
+        self.assertEqual([(pd.Timestamp(start), pd.Timestamp(end))], self.cached.coverage("AAPL", "1d"))
+
+    def test_gaps(self):
+        self.cached.historical(["AAPL"], datetime(2021, 1, 5), datetime(2021, 1, 10))
+        self.cached.historical(["MSFT"], datetime(2021, 1, 1), datetime(2021, 1, 10))
+        self.market.calls.clear()
+
+        start, end = datetime(2021, 1, 1), datetime(2021, 1, 15)
+        history = self.cached.historical(["AAPL", "MSFT"], start, end)
+        self.assertEqual([
+            (["AAPL"], datetime(2021, 1, 1), datetime(2021, 1, 5)),
+            (["AAPL", "MSFT"], datetime(2021, 1, 10), datetime(2021, 1, 15)),
+        ], self.market.calls)
+        pd.testing.assert_frame_equal(history.data, Market().historical(["AAPL", "MSFT"], start, end).data)
+
+    def test_persistent(self):
+        start, end = datetime(2021, 1, 1), datetime(2021, 1, 11)
+        self.cached.historical(["AAPL"], start, end)
+
+        market = Market()
+        history = CachedMarket(market, self.dir.name, provider="market").historical(["AAPL"], start, end)
+        self.assertEqual([], market.calls)
+        self.assertEqual(10, len(history.data))
+        self.assertTrue(os.path.exists(os.path.join(self.dir.name, "provider=market", "interval=1d",
+                                                    "symbol=AAPL", "coverage.json")))
+
+    def test_present(self):
+        today = pd.Timestamp.now().normalize().to_pydatetime()
+        start, end = today - timedelta(days=3), today + timedelta(days=1)
+        self.cached.historical(["AAPL"], start, end)
+        # the bar of today is not held, and is fetched again, and replaced
+        self.assertEqual([(pd.Timestamp(start), pd.Timestamp(today))], self.cached.coverage("AAPL", "1d"))
+
+        self.market.version = 1.0
+        history = self.cached.historical(["AAPL"], start, end)
+        self.assertEqual((["AAPL"], today, end), self.market.calls[-1])
+        close = history.data["close"]
+        self.assertEqual(today.day + 4 + 1.0, close.iloc[-1])
+        self.assertEqual((today - timedelta(days=1)).day + 4, close.iloc[-2])
+        self.assertEqual(4, len(close))
+
+    def test_unpublished(self):
+        today = pd.Timestamp.now().normalize().to_pydatetime()
+        start, end = today - timedelta(days=3), today + timedelta(days=1)
+        self.market.unpublished = {"AAPL"}
+        self.cached.historical(["AAPL"], start, end)
+        self.assertEqual([], self.cached.coverage("AAPL", "1d"))
+
+        self.market.unpublished = set()
+        history = self.cached.historical(["AAPL"], start, end)
+        self.assertEqual((["AAPL"], start, end), self.market.calls[-1])
+        self.assertEqual(4, len(history.data))
+
+    def test_truncated(self):
+        start, end = datetime(2021, 1, 1), datetime(2021, 1, 11)
+        self.market.cap = 3
+        self.cached.historical(["AAPL"], start, end)
+        self.assertEqual([(pd.Timestamp(2021, 1, 8), pd.Timestamp(end))], self.cached.coverage("AAPL", "1d"))
+
+        self.market.cap = None
+        history = self.cached.historical(["AAPL"], start, end)
+        self.assertEqual((["AAPL"], start, datetime(2021, 1, 8)), self.market.calls[-1])
+        self.assertEqual([(pd.Timestamp(start), pd.Timestamp(end))], self.cached.coverage("AAPL", "1d"))
+        self.assertEqual(10, len(history.data))
+
+    def test_years(self):
+        self.cached.historical(["AAPL"], datetime(2020, 12, 25), datetime(2021, 1, 5))
+        directory = os.path.join(self.dir.name, "provider=market", "interval=1d", "symbol=AAPL")
+        self.assertEqual(["coverage.json", "year=2020", "year=2021"], sorted(os.listdir(directory)))
+
+        os.remove(self.cached._parts(os.path.join(directory, "year=2020"))[0])
+        history = self.cached.historical(["AAPL"], datetime(2021, 1, 1), datetime(2021, 1, 5))
+        self.assertEqual(4, len(history.data))
+
+    def test_compact(self):
+        cached = CachedMarket(self.market, self.dir.name, max_parts=2)
+        for day in range(1, 6):
+            cached.historical(["AAPL"], datetime(2021, 1, day), datetime(2021, 1, day + 1))
+        directory = os.path.join(self.dir.name, "provider=market", "interval=1d", "symbol=AAPL", "year=2021")
+        self.assertLessEqual(len([name for name in os.listdir(directory) if name.endswith(".parquet")]), 2)
+
+        history = cached.historical(["AAPL"], datetime(2021, 1, 1), datetime(2021, 1, 6))
+        self.assertEqual(5, len(self.market.calls))
+        self.assertEqual([(pd.Timestamp(2021, 1, 1), pd.Timestamp(2021, 1, 6))], cached.coverage("AAPL", "1d"))
+        self.assertEqual(5, len(history.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import httpx
+import pandas as pd
+
+from dxlib import Instrument
+from dxlib.interfaces.external.utils import TokenBucket
+from dxlib.interfaces.external.yfinance.yfinance import YFinance
+from dxlib.interfaces.external.twelvedata.twelvedata import TwelveData
+
+SYMBOLS = ["AAPL", "MSFT", "GOOG", "AMZN", "META", "NVDA"]
+TIMESTAMPS = [1609459200 + 86400 * i for i in range(5)]
+
+
+def price(symbol: str, i: int) -> float:
+    return 100.0 + SYMBOLS.index(symbol) * 10 + i
+
+
+def respond(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.startswith("/quote/"):
+        return httpx.Response(200, text='<script>{"crumb":"abc"}</script>')
+    if path.startswith("/v8/finance/chart/"):
+        symbol = path.rsplit("/", 1)[1]
+        prices = [price(symbol, i) for i in range(len(TIMESTAMPS))]
+        quote = {"close": prices, "open": prices, "high": prices, "low": prices, "volume": [1000] * len(prices)}
+        return httpx.Response(200, json={"chart": {"result": [{"timestamp": TIMESTAMPS,
+                                                               "indicators": {"quote": [quote]}}]}})
+    if path == "/time_series":
+        symbol = request.url.params["symbol"]
+        values = [{"datetime": pd.Timestamp(t, unit="s").isoformat(), **{
+            column: str(price(symbol, i)) for column in ("open", "high", "low", "close", "volume")
+        }} for i, t in enumerate(TIMESTAMPS)]
+        return httpx.Response(200, json={"values": values})
+    return httpx.Response(404)
+
+
+class Transport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Serves `respond` locally, and records how many async requests were in flight at once."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.requests = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        await asyncio.sleep(.01)
+        self.in_flight -= 1
+        return respond(request)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_reserve(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+
+        self.assertEqual([0.0, 0.0, .5, 1.0], [bucket.reserve() for _ in range(4)])
+        now[0] = 1.0  # the debt of 2 tokens is repaid, but the bucket is empty
+        self.assertEqual(.5, bucket.reserve())
+        now[0] = 10.0  # and it does not refill beyond its capacity
+        self.assertEqual([0.0, 0.0, .5], [bucket.reserve() for _ in range(3)])
+
+
+    def test_threads(self):
+        bucket = TokenBucket(rate=1, capacity=1, clock=lambda: 0.0)
+        with ThreadPoolExecutor(8) as pool:
+            delays = list(pool.map(lambda _: bucket.reserve(), range(200)))
+
+        # every token is reserved once, whatever the interleaving of the threads
+        self.assertEqual(list(range(200)), sorted(delays))
+
+
+class TestHistoricalAsync(unittest.TestCase):
+    start = datetime(2021, 1, 1)
+    end = datetime(2021, 1, 6)
+
+    def check(self, api, transport):
+        api.start()
+        try:
+            expected = api.historical(SYMBOLS, self.start, self.end)
+            actual = asyncio.run(api.historical_async(SYMBOLS, self.start, self.end))
+        finally:
+            api.stop()
+
+        self.assertEqual(len(SYMBOLS) * len(TIMESTAMPS), len(actual.data))
+        pd.testing.assert_frame_equal(expected.data, actual.data)
+        self.assertEqual(price("GOOG", 2), actual.data.loc[(pd.Timestamp(TIMESTAMPS[2], unit="s"),
+                                                            Instrument("GOOG")), "close"])
+        self.assertEqual(len(SYMBOLS), transport.requests)
+        self.assertEqual(3, transport.most_in_flight)
+
+    def test_yfinance(self):
+        transport = Transport()
+        self.check(YFinance(concurrency=3, rate=1000, burst=1000, transport=transport), transport)
+
+    def test_twelvedata(self):
+        transport = Transport()
+        self.check(TwelveData(api_key="key", concurrency=3, rate=1000, burst=1000, transport=transport), transport)
+
+    def test_twelvedata_range(self):
+        start, end = datetime(2021, 1, 1, tzinfo=timezone.utc), datetime(2021, 1, 6, tzinfo=timezone.utc)
+        _, params = TwelveData(api_key="key")._historical_request("AAPL", int(start.timestamp()),
+                                                                  int(end.timestamp()), "1day")
+        self.assertEqual("2021-01-01 00:00:00", params["start_date"])
+        self.assertEqual("2021-01-06 00:00:00", params["end_date"])
+
+    def test_rate_limit(self):
+        api = TwelveData(api_key="key", rate=100, burst=1, transport=Transport())
+        start = time.perf_counter()
+        asyncio.run(api.historical_async(SYMBOLS, self.start, self.end))
+        self.assertGreaterEqual(time.perf_counter() - start, (len(SYMBOLS) - 1) / 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
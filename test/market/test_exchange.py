@@ -0,0 +1,113 @@
+import unittest
+
+import numpy as np
+
+from dxlib import Instrument, Portfolio
+from dxlib.market import Exchange, ShardedExchange, Order, Side
+
+usd = Instrument("USD")
+
+
+def order_flow(instruments, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    flow = []
+    for _ in range(n):
+        instrument = instruments[rng.integers(len(instruments))]
+        side = Side.BUY if rng.random() < .5 else Side.SELL
+        price = float(rng.integers(95, 106))
+        quantity = float(rng.integers(1, 10))
+        market = rng.random() < .1
+        flow.append((market, instrument, price, quantity, side, ["A", "B", "C"][rng.integers(3)]))
+    return flow
+
+
+class TestExchange(unittest.TestCase):
+    def setUp(self):
+        self.instrument = Instrument("BTC")
+        self.exchange = Exchange(tick_size=1)
+        self.exchange.add_instrument(self.instrument)
+        self.alice = self.exchange.register("alice", Portfolio({usd: 1000.0}))
+        self.bob = self.exchange.register("bob", Portfolio({usd: 1000.0}))
+
+    def test_settlement(self):
+        ask = Order(self.instrument, 100, 2, Side.SELL)
+        self.assertEqual([], self.exchange.send_limit(ask, "alice"))
+
+        bid = Order(self.instrument, 101, 5, Side.BUY)
+        transactions = self.exchange.send_limit(bid, "bob")
+
+        self.assertEqual([(100, 2)], [(t.price, t.quantity) for t in transactions])
+        self.assertEqual(-2, self.alice.get(self.instrument))
+        self.assertEqual(1200, self.alice.get(usd))
+        self.assertEqual(2, self.bob.get(self.instrument))
+        self.assertEqual(800, self.bob.get(usd))
+        # the rest of the bid rests in the book, the ask was fully filled
+        self.assertEqual(3, self.exchange.books[self.instrument].quantity(101, Side.BUY))
+        self.assertEqual({bid.uuid}, set(self.exchange.order_owners))
+
+    def test_market_and_cancel(self):
+        bid = Order(self.instrument, 99, 3, Side.BUY)
+        self.exchange.send_limit(bid, "bob")
+        self.exchange.cancel_order(self.instrument, bid.uuid)
+
+        transactions = self.exchange.send_market(Order(self.instrument, 99, 1, Side.SELL), "alice")
+        self.assertEqual([], transactions)
+        self.assertEqual({}, self.exchange.order_owners)
+
+    def test_unknown(self):
+        with self.assertRaises(KeyError):
+            self.exchange.send_limit(Order(Instrument("ETH"), 1, 1, Side.BUY), "alice")
+        with self.assertRaises(KeyError):
+            self.exchange.send_limit(Order(self.instrument, 1, 1, Side.BUY), "carol")
+
+
+class TestShardedExchange(unittest.TestCase):
+    def test_matches_exchange(self):
+        instruments = [Instrument(symbol) for symbol in ("AAPL", "MSFT", "GOOG", "AMZN")]
+        clients = ("A", "B", "C")
+
+        exchange = Exchange(tick_size=1)
+        for instrument in instruments:
+            exchange.add_instrument(instrument)
+        expected = {client: exchange.register(client) for client in clients}
+
+        quantities = []
+        for market, instrument, price, quantity, side, client in order_flow(instruments):
+            order = Order(instrument, price, quantity, side)
+            send = exchange.send_market if market else exchange.send_limit
+            quantities += [t.quantity for t in send(order, client)]
+
+        with ShardedExchange(instruments, n_shards=2, tick_size=1, capacity=64) as sharded:
+            actual = {client: sharded.register(client) for client in clients}
+            flow = order_flow(instruments)
+            for market, instrument, price, quantity, side, client in flow[:150]:
+                order = Order(instrument, price, quantity, side)
+                (sharded.send_market if market else sharded.send_limit)(order, client)
+            transactions = sharded.flush()
+            for market, instrument, price, quantity, side, client in flow[150:]:
+                order = Order(instrument, price, quantity, side)
+                (sharded.send_market if market else sharded.send_limit)(order, client)
+            transactions += sharded.flush()
+
+        self.assertEqual(sorted(quantities), sorted(t.quantity for t in transactions))
+        for client in clients:
+            for instrument in instruments + [usd]:
+                self.assertAlmostEqual(expected[client].get(instrument), actual[client].get(instrument))
+
+    def test_cancel(self):
+        instrument = Instrument("AAPL")
+        with ShardedExchange([instrument], n_shards=1, tick_size=1) as sharded:
+            sharded.register("A")
+            sharded.register("B")
+            order_id = sharded.send_limit(Order(instrument, 10, 1, Side.BUY), "A")
+            sharded.flush()
+            sharded.cancel_order(order_id)
+            self.assertEqual([], sharded.flush())
+            self.assertEqual({}, sharded.orders)
+
+            sharded.send_market(Order(instrument, 10, 1, Side.SELL), "B")
+            self.assertEqual([], sharded.flush())
+
+
+if __name__ == '__main__':
+    unittest.main()
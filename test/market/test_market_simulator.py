@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+from dxlib.market.simulators.market_simulator import MarketSimulator
+
+
+class TestMarketSimulator(unittest.TestCase):
+    def test_step(self):
+        np.random.seed(0)
+        simulator = MarketSimulator(100, spread_mean=.1)
+        for _ in range(500):
+            simulator.step()
+
+        events = simulator.market_variables.events
+        self.assertGreater(len(events), 0)
+        self.assertEqual(events[-1], simulator.event_process.last_event)
+        self.assertEqual(501, len(simulator.market_variables.midprice))
+
+    def test_reset(self):
+        simulator = MarketSimulator(100)
+        simulator.step()
+        simulator.reset()
+
+        self.assertIsNone(simulator.event_process.last_event)
+        self.assertEqual([], simulator.market_variables.events)
+        self.assertEqual((0, 0), simulator.lob.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
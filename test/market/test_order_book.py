@@ -1,12 +1,10 @@
+import numpy as np
 import pytest
 from uuid import uuid4
 
 from dxlib import Instrument
-# from dxlib.market import OrderBook, OrderBookV1, PriceLevel, Order, Side, Transaction  # adjust import
-
-from dxcore import order_book as dxcore
-
-from dxcore.order_book import OrderBook
+from dxlib.market import OrderBook, PriceLevel, Order, Side
+from dxlib.market.order_book import MessageType, MESSAGE_DTYPE
 
 
 instrument = Instrument("MSFT")
@@ -94,6 +92,141 @@ def test_send_market_matches():
     assert remaining_qty == 5
 
 
+def test_price_level_totals():
+    pl = PriceLevel(1.0)
+    o1 = Order(instrument, uuid=uuid4(), price=1.0, quantity=10, side=Side.BUY, client="A")
+    o2 = Order(instrument, uuid=uuid4(), price=1.0, quantity=5, side=Side.BUY, client="B")
+    pl.add_order(o1)
+    pl.add_order(o2)
+    assert (pl.quantity, pl.count) == (15, 2)
+
+    pl.fill(o1, 4)
+    assert (pl.quantity, o1.quantity) == (11, 6)
+
+    pl.pop(o1)
+    assert (pl.quantity, pl.count) == (5, 1)
+
+
+def test_best_prices(sample_orders):
+    ob = OrderBook(tick_size=0.01)
+    o1, o2, o3 = sample_orders
+    assert (ob.best_bid, ob.best_ask, ob.midprice) == (None, None, None)
+
+    for order in sample_orders:
+        ob.send_limit(order)
+    assert (ob.best_bid, ob.best_ask) == (o2.price, o3.price)
+    assert ob.best(Side.BUY).quantity == 5
+    assert ob.spread == pytest.approx(0.01)
+
+    ob.cancel_order(o2.uuid)
+    assert ob.best_bid == o1.price
+    assert ob.shape == (1, 1)
+
+    ob.send_market(Order(instrument, price=1.0, quantity=10, side=Side.SELL))
+    assert ob.best_bid is None
+    assert ob.shape == (0, 1)
+    assert o1.uuid not in ob.orders
+
+
+def test_send_market_best_first():
+    ob = OrderBook()
+    low = Order(instrument, uuid=uuid4(), price=1.0, quantity=4, side=Side.BUY, client="L")
+    high = Order(instrument, uuid=uuid4(), price=1.02, quantity=4, side=Side.BUY, client="H")
+    ob.send_limit(low)
+    ob.send_limit(high)
+
+    transactions = ob.send_market(Order(instrument, uuid=uuid4(), price=1.0, quantity=6, side=Side.SELL))
+    assert [(t.price, t.quantity) for t in transactions] == [(high.price, 4), (low.price, 2)]
+    assert ob.quantity(1.0, Side.BUY) == 2
+
+
+def test_depth():
+    ob = OrderBook(tick_size=1)
+    for price, quantity in [(3, 1), (5, 2), (4, 3), (5, 1)]:
+        ob.send_limit(Order(instrument, uuid=uuid4(), price=price, quantity=quantity, side=Side.BUY))
+    for price, quantity in [(8, 2), (6, 1)]:
+        ob.send_limit(Order(instrument, uuid=uuid4(), price=price, quantity=quantity, side=Side.SELL))
+
+    assert list(ob.depth(2, Side.BUY)) == [(5, 3), (4, 3)]
+    assert list(ob.depth(5, Side.SELL)) == [(6, 1), (8, 2)]
+
+
+def test_apply_batch():
+    ob = OrderBook(tick_size=0.01)
+    msgs = np.array([
+        (MessageType.ADD, 1, 1, 1.001, 5),
+        (MessageType.ADD, 2, 1, 1.0, 3),
+        (MessageType.ADD, 3, 1, 0.99, 4),
+        (MessageType.ADD, 4, -1, 1.05, 2),
+        (MessageType.MODIFY, 1, 1, 1.0, 2),  # reduce in place, keeps priority over order 2
+        (MessageType.CANCEL, 3, 1, 0.99, 0),
+        (MessageType.CANCEL, 99, 1, 0.0, 0),  # unknown ids are ignored
+        (MessageType.MARKET, 10, -1, 0.0, 4),
+        (MessageType.MODIFY, 4, -1, 1.04, 2),
+    ], dtype=MESSAGE_DTYPE)
+
+    fills = ob.apply_batch(msgs)
+
+    assert fills["message"].tolist() == [7, 7]
+    assert fills["taker"].tolist() == [10, 10]
+    assert fills["maker"].tolist() == [1, 2]
+    assert fills["quantity"].tolist() == [2, 2]
+    assert fills["price"] == pytest.approx([1.0, 1.0])
+    assert set(ob.orders) == {2, 4}
+    assert ob.quantity(1.0, Side.BUY) == 1
+    assert ob.best_ask == pytest.approx(1.04)
+    assert ob.shape == (1, 1)
+
+
+def test_apply_batch_duplicate_id():
+    ob = OrderBook(tick_size=0.01)
+    msgs = np.array([
+        (MessageType.ADD, 1, 1, 1.0, 5),
+        (MessageType.ADD, 1, 1, 0.99, 3),  # duplicate ids are ignored
+        (MessageType.LIMIT, 1, -1, 1.0, 2),
+    ], dtype=MESSAGE_DTYPE)
+
+    fills = ob.apply_batch(msgs)
+
+    assert len(fills) == 0
+    assert ob.quantity(1.0, Side.BUY) == 5
+    assert ob.quantity(0.99, Side.BUY) == 0
+    assert ob.shape == (1, 0)
+
+    ob.apply_batch(np.array([(MessageType.CANCEL, 1, 1, 1.0, 0)], dtype=MESSAGE_DTYPE))
+    assert not ob.orders
+    assert ob.shape == (0, 0)
+
+
+def test_apply_batch_matches_send():
+    rng = np.random.default_rng(0)
+    n = 500
+    msgs = np.zeros(n, dtype=MESSAGE_DTYPE)
+    msgs["type"] = rng.choice([MessageType.ADD, MessageType.CANCEL, MessageType.MARKET], n, p=[.6, .2, .2])
+    msgs["id"] = np.arange(n)
+    msgs["side"] = rng.choice([-1, 1], n)
+    msgs["price"] = np.where(msgs["side"] > 0, rng.uniform(9, 10, n), rng.uniform(10, 11, n))
+    msgs["quantity"] = rng.integers(1, 10, n)
+    msgs["id"][msgs["type"] == MessageType.CANCEL] = rng.integers(0, n, (msgs["type"] == MessageType.CANCEL).sum())
+
+    batch = OrderBook(tick_size=0.01)
+    fills = batch.apply_batch(msgs)
+
+    book = OrderBook(tick_size=0.01)
+    quantities = []
+    for kind, order_id, side, price, quantity in msgs.tolist():
+        order = Order(instrument, price, quantity, Side(side), uuid=order_id)
+        if kind == MessageType.ADD:
+            book.send_limit(order)
+        elif kind == MessageType.CANCEL and order_id in book.orders:
+            book.cancel_order(order_id)
+        elif kind == MessageType.MARKET:
+            quantities += [t.quantity for t in book.send_market(order)]
+
+    assert fills["quantity"].tolist() == quantities
+    assert list(batch.depth(10, Side.BUY)) == list(book.depth(10, Side.BUY))
+    assert list(batch.depth(10, Side.SELL)) == list(book.depth(10, Side.SELL))
+
 
 if __name__ == '__main__':
     pytest.main()
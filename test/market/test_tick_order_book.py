@@ -0,0 +1,138 @@
+import pytest
+from uuid import uuid4
+
+from dxlib import Instrument
+from dxlib.market import Order, Side, TickOrderBook
+from dxlib.market.order_book.tick_order_book import BID, ASK, NULL
+
+instrument = Instrument("MSFT")
+
+
+@pytest.fixture
+def sample_orders():
+    return [
+        Order(instrument, uuid=uuid4(), price=1.01, quantity=10, side=Side.BUY, client="A"),
+        Order(instrument, uuid=uuid4(), price=1.02, quantity=5, side=Side.BUY, client="B"),
+        Order(instrument, uuid=uuid4(), price=1.03, quantity=7, side=Side.SELL, client="C"),
+    ]
+
+
+def test_add_and_quantity(sample_orders):
+    ob = TickOrderBook(tick_size=0.01)
+    for order in sample_orders:
+        ob.send_limit(order)
+
+    assert ob.quantity(1.01, Side.BUY) == 10
+    assert ob.quantity(1.02, Side.BUY) == 5
+    assert ob.quantity(1.03, Side.SELL) == 7
+    assert ob.shape == (2, 1)
+    assert (ob.best_bid, ob.best_ask) == (102, 103)
+
+
+def test_cancel(sample_orders):
+    ob = TickOrderBook(tick_size=0.01)
+    o1, o2, _ = sample_orders
+    ob.send_limit(o1)
+    ob.send_limit(o2)
+
+    ob.cancel_order(o2.uuid)
+    assert ob.quantity(1.02, Side.BUY) == 0
+    assert ob.best_bid == 101
+    with pytest.raises(KeyError):
+        ob.cancel_order(o2.uuid)
+
+    ob.cancel_order(o1.uuid)
+    assert ob.best_bid == NULL
+    assert ob.shape == (0, 0)
+
+
+def test_rounding():
+    ob = TickOrderBook(tick_size=0.02)
+    assert ob.round(1.037) == pytest.approx(1.04)
+    assert ob.round(1.029) == pytest.approx(1.02)
+
+
+def test_send_market_fifo_and_best_price():
+    ob = TickOrderBook(tick_size=0.01)
+    first = Order(instrument, price=1.0, quantity=4, side=Side.BUY)
+    second = Order(instrument, price=1.0, quantity=4, side=Side.BUY)
+    better = Order(instrument, price=1.01, quantity=3, side=Side.BUY)
+    for order in (first, second, better):
+        ob.send_limit(order)
+
+    sell = Order(instrument, price=1.0, quantity=9, side=Side.SELL)
+    transactions = ob.send_market(sell)
+
+    assert [t.quantity for t in transactions] == [3, 4, 2]
+    assert [t.price for t in transactions] == pytest.approx([1.01, 1.0, 1.0])
+    assert sell.quantity == 0
+    assert (better.quantity, first.quantity, second.quantity) == (0, 0, 2)
+    assert set(ob.orders) == {second.uuid}
+    assert ob.quantity(1.0, Side.BUY) == 2
+
+    ob.cancel_order(second.uuid)
+    assert ob.shape == (0, 0)
+
+
+def test_match_limit():
+    ob = TickOrderBook()
+    ob.add(ASK, 10, 5)
+    ob.add(ASK, 12, 5)
+
+    fills, remaining = ob.match(BID, 8, limit=11)
+    assert [(tick, quantity) for _, tick, quantity in fills] == [(10, 5)]
+    assert remaining == 3
+    assert ob.best_ask == 12
+
+
+def test_free_list_reuse():
+    ob = TickOrderBook(capacity=2)
+    a = ob.add(BID, 5, 1)
+    b = ob.add(BID, 5, 1)
+    ob.cancel(a)
+    assert ob.add(BID, 6, 1) == a
+
+    c = ob.add(ASK, 7, 1)
+    assert ob.capacity == 4
+    assert c not in (a, b)
+    assert ob.level(BID, 5) == (1, 1)
+
+
+def test_cancel_freed_slot():
+    ob = TickOrderBook()
+    a = ob.add(BID, 5, 2)
+    b = ob.add(BID, 5, 3)
+    ob.cancel(a)
+    with pytest.raises(KeyError):
+        ob.cancel(a)
+
+    ob.match(ASK, 3)  # fills b, freeing its slot
+    with pytest.raises(KeyError):
+        ob.cancel(b)
+    with pytest.raises(KeyError):
+        ob.cancel(ob.capacity)
+    assert ob.level(BID, 5) == (0, 0)
+    assert ob.add(BID, 5, 1) == b
+
+
+def test_add_negative_tick():
+    ob = TickOrderBook()
+    with pytest.raises(ValueError):
+        ob.add(BID, -1, 1)
+    assert ob.level(BID, 0) == (0, 0)
+    assert ob.best_bid == NULL
+
+
+def test_depth():
+    ob = TickOrderBook(tick_size=1)
+    for tick, quantity in [(3, 1), (5, 2), (4, 3), (5, 1)]:
+        ob.add(BID, tick, quantity)
+    for tick, quantity in [(6, 1), (8, 2)]:
+        ob.add(ASK, tick, quantity)
+
+    assert list(ob.depth(2, Side.BUY)) == [(5, 3), (4, 3)]
+    assert list(ob.depth(5, Side.SELL)) == [(6, 1), (8, 2)]
+
+
+if __name__ == '__main__':
+    pytest.main()
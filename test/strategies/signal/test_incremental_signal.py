@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dxlib import Executor, Portfolio, Instrument, History, HistorySchema, OrderGenerator
+from dxlib.core.indicators.filters import Momentum, Reversion, Volatility
+from dxlib.interfaces import BacktestInterface
+from dxlib.strategy.signal import SignalStrategy, SignalGenerator
+from dxlib.strategy.signal.custom.rsi import Rsi
+from dxlib.strategy.signal.custom.wick_reversal import WickReversal
+from dxlib.strategy.views import SecuritySignalView
+
+
+def ohlc(n_days=25, symbols=("AAPL", "MSFT", "GOOG")):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=n_days)
+    index = pd.MultiIndex.from_product([dates, [Instrument(s) for s in symbols]], names=["date", "instrument"])
+    close = 100 * np.exp(np.cumsum(rng.normal(0, .02, len(index))))
+    open_ = close * rng.uniform(.95, 1.05, len(index))
+    high = np.maximum(open_, close) * rng.uniform(1, 1.05, len(index))
+    low = np.minimum(open_, close) * rng.uniform(.95, 1, len(index))
+    data = pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+    schema = HistorySchema({"date": pd.Timestamp, "instrument": Instrument}, {k: float for k in data.columns})
+    return History(schema, data)
+
+
+class Recomputed:
+    """Disables the incremental protocol of a generator, so that signals are recomputed over the whole history."""
+    update = SignalGenerator.update
+
+
+class RecomputedRsi(Recomputed, Rsi):
+    pass
+
+
+class RecomputedWickReversal(Recomputed, WickReversal):
+    pass
+
+
+class TestIncrementalSignal(unittest.TestCase):
+    def run_strategy(self, signal_generator, columns=None):
+        history = ohlc()
+        view = SecuritySignalView("date", columns)
+        interface = BacktestInterface(history, view, Portfolio({Instrument("USD"): 1000.0}))
+        executor = Executor(SignalStrategy(signal_generator, OrderGenerator()), interface)
+        result, portfolio_history = executor.run(view, interface.iter())
+        return result, portfolio_history
+
+    def assertSameRun(self, incremental, recomputed, columns=None):
+        self.assertTrue(incremental.incremental)
+        self.assertFalse(recomputed.incremental)
+        result, portfolio_history = self.run_strategy(incremental, columns)
+        expected_result, expected_portfolio_history = self.run_strategy(recomputed, columns)
+
+        self.assertTrue(expected_result.data.index.sort_values().equals(result.data.index.sort_values()))
+        pd.testing.assert_frame_equal(expected_portfolio_history.data.sort_index(), portfolio_history.data.sort_index())
+
+    def test_rsi(self):
+        self.assertSameRun(Rsi(window=5, period=3), RecomputedRsi(window=5, period=3), ["close"])
+
+    def test_wick_reversal(self):
+        self.assertSameRun(WickReversal(), RecomputedWickReversal())
+
+    def test_stream_bounded(self):
+        history = ohlc()
+        view = SecuritySignalView("date")
+        interface = BacktestInterface(history, view, Portfolio({Instrument("USD"): 1000.0}))
+        strategy = SignalStrategy(WickReversal(), OrderGenerator())
+        Executor(strategy, interface).run(view, interface.iter())
+
+        stream = strategy._stream
+        last = history.levels("date")[-1]
+        self.assertEqual(set(stream.last.values()), {(last,)})
+        self.assertEqual(set(stream.signals), set(stream.last))
+        self.assertTrue(all(len(rows) == 1 for rows in stream.signals.values()))
+
+
+class TestIncrementalFilters(unittest.TestCase):
+    def test_filters(self):
+        history = ohlc(60).get(columns=["close"])
+        for f in (Momentum(10, 2), Reversion(1.0, -1.0), Volatility(5, 0.5)):
+            state, signals = None, []
+            for date in history.levels("date"):
+                state, new = f.update(state, history.get({"date": [date]}))
+                signals.append(new.data)
+
+            expected = f.get_signals(history).data.sort_index()
+            pd.testing.assert_frame_equal(expected, pd.concat(signals).sort_index(), check_dtype=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,18 +11,24 @@ Strategies
 5. state_machine_mm     - market maker with explicit FLAT/LONG/SHORT states
 """
 from dxlib.strategy.rule import (
-    Graph, StrategyRunner,
+    Graph, StrategyRunner, MultiRunner, Context,
     LOBSource, Constant,
-     BoolVariable,
+    Variable, BoolVariable,
     BinaryOp,
     Compare, LogicGate, Cooldown,
     StateMachine,
     EWMA, RollingWindow, Crossover,
     LimitOrderGen, MarketOrderGen, QuoteGen,
-    LOBSnapshot, Level
+    LOBSnapshot, LOBBatch, Level
 )
 
 import logging
+import math
+import pickle
+import random
+from collections import deque
+
+import pytest
 
 logging.basicConfig(level=logging.DEBUG)  # ensures a handler exists
 
@@ -290,19 +296,18 @@ def state_machine_mm(symbol: str = "SIM") -> StrategyRunner:
 # ---------------------------------------------------------------------------
 # Quick smoke test
 # ---------------------------------------------------------------------------
-def test_rule_strategy():
-    import random, math
+def fake_lob(t: int, rng=random) -> "LOBSnapshot":
+    mid = 100.0 + 2 * math.sin(t / 20) + rng.gauss(0, 0.1)
+    spread = 0.2 + abs(rng.gauss(0, 0.05))
+    return LOBSnapshot(
+        symbol    = "SIM",
+        timestamp = float(t),
+        bids = [Level(mid - spread/2 - i*0.1, 10 - i) for i in range(5)],
+        asks = [Level(mid + spread/2 + i*0.1, 10 - i) for i in range(5)],
+    )
 
 
-    def fake_lob(t: int) -> "LOBSnapshot":
-        mid = 100.0 + 2 * math.sin(t / 20) + random.gauss(0, 0.1)
-        spread = 0.2 + abs(random.gauss(0, 0.05))
-        return LOBSnapshot(
-            symbol    = "SIM",
-            timestamp = float(t),
-            bids = [Level(mid - spread/2 - i*0.1, 10 - i) for i in range(5)],
-            asks = [Level(mid + spread/2 + i*0.1, 10 - i) for i in range(5)],
-        )
+def test_rule_strategy():
 
     strategies = {
         "mean_reversion":       mean_reversion(),
@@ -317,3 +322,308 @@ def test_rule_strategy():
             orders = runner.step(fake_lob(t))
             total_orders += len(orders)
         print(f"  {name:25s} - {total_orders:3d} orders over 100 ticks")
+
+
+# ---------------------------------------------------------------------------
+# Compiled plan matches the pull-based evaluator
+# ---------------------------------------------------------------------------
+def _by_label(graph: Graph, variables: dict) -> dict:
+    labels = {node.node_id: node.label for node in graph.nodes}
+    return {labels[key[:36]] + key[36:]: value for key, value in variables.items()}
+
+
+def test_compiled_plan_matches_run_tick():
+    rng = random.Random(7)
+    lobs = [fake_lob(t, rng) for t in range(300)]
+
+    for factory in (momentum_crossover, mean_reversion, market_maker, state_machine_mm):
+        compiled = factory()
+        reference = factory()
+
+        variables = {}
+        for t, lob in enumerate(lobs):
+            expected = reference.graph.run_tick(lob, tick_index=t, variables=variables)
+            assert compiled.step(lob) == expected.orders, factory.__name__
+        assert _by_label(compiled.graph, compiled._variables) == _by_label(reference.graph, variables)
+
+
+def test_compiled_plan_variables():
+    g = Graph(logger)
+    src     = g.add(LOBSource(label="market"))
+    total   = g.add(Variable(initial=0.0, label="total"))
+    acc     = g.add(BinaryOp(op="add", label="acc"))
+    flag    = g.add(BoolVariable(label="flag"))
+    rising  = g.add(Compare(op="gt", label="rising"))
+
+    # total += 1 every tick, read back one tick late
+    g.connect(total, "value",      acc,   "a")
+    g.connect(Constant(1.0, label="one"), "value", acc, "b")
+    g.connect(acc,   "result",     total, "update")
+    g.connect(src,   "mid",        rising, "a")
+    g.connect(total, "prev",       rising, "b")
+    g.connect(rising, "result",    flag,  "set")
+
+    runner = StrategyRunner(g, validate=False)
+    plan = g.compile()
+    assert g.compile() is plan
+
+    rng = random.Random(0)
+    for t in range(5):
+        runner.step(fake_lob(t, rng))
+    assert runner._variables[total.node_id] == 5
+    assert plan.value(total, "value") == 4
+    assert runner._variables[flag.node_id] is True
+
+    # rewiring invalidates the plan
+    g.connect(src, "spread", rising, "b")
+    assert g.compile() is not plan
+
+
+# ---------------------------------------------------------------------------
+# Batch evaluation matches step-by-step evaluation
+# ---------------------------------------------------------------------------
+def position_gated(symbol: str = "SIM") -> StrategyRunner:
+    # Quotes only while in position; entries and exits run in the deferred pass
+    g = Graph(logger)
+
+    src     = g.add(LOBSource(label="market"))
+    ewma    = g.add(EWMA(span=10, label="ewma"))
+    above   = g.add(Compare(op="gt", label="above"))
+    below   = g.add(Compare(op="lt", label="below"))
+    in_pos  = g.add(BoolVariable(label="in_position"))
+    not_in  = g.add(LogicGate(op="not", label="not_in_pos"))
+    entries = g.add(Variable(initial=0.0, label="entries"))
+    count   = g.add(BinaryOp(op="add", label="count"))
+    sz      = g.add(Constant(1.0, label="size"))
+
+    buy   = g.add(LimitOrderGen(side="buy", symbol=symbol, label="buy"))
+    sell  = g.add(MarketOrderGen(side="sell", symbol=symbol, label="sell"))
+    quote = g.add(QuoteGen(symbol=symbol, label="quotes"))
+
+    g.connect(src,    "mid",      ewma,    "value")
+    g.connect(src,    "mid",      above,   "a")
+    g.connect(ewma,   "ewma",     above,   "b")
+    g.connect(src,    "mid",      below,   "a")
+    g.connect(ewma,   "ewma",     below,   "b")
+    g.connect(in_pos, "value",    not_in,  "a")
+
+    g.connect(above,  "result",   buy,     "trigger")
+    g.connect(not_in, "result",   buy,     "enabled")
+    g.connect(src,    "best_ask", buy,     "price")
+    g.connect(sz,     "value",    buy,     "size")
+    g.connect(below,  "result",   sell,    "trigger")
+    g.connect(in_pos, "value",    sell,    "enabled")
+    g.connect(sz,     "value",    sell,    "size")
+    g.connect(buy,    "fired",    in_pos,  "set")
+    g.connect(sell,   "fired",    in_pos,  "clear")
+
+    g.connect(entries, "value",   count,   "a")
+    g.connect(sz,     "value",    count,   "b")
+    g.connect(count,  "result",   entries, "update")
+    g.connect(in_pos, "rose",     entries, "write_enable")
+
+    g.connect(in_pos, "value",    quote,   "trigger")
+    g.connect(src,    "mid",      quote,   "mid")
+    g.connect(ewma,   "delta",    quote,   "half_spread")
+    g.connect(count,  "result",   quote,   "size")
+
+    return StrategyRunner(g, symbol=symbol)
+
+
+def test_run_batch_matches_step():
+    rng = random.Random(11)
+    lobs = [fake_lob(t, rng) for t in range(400)]
+
+    for factory in (mean_reversion, market_maker, state_machine_mm, position_gated):
+        stepped = factory()
+        batched = factory()
+
+        expected = [stepped.step(lob) for lob in lobs]
+        # Two blocks, so state has to carry over between calls
+        actual = batched.run_batch(lobs[:150]) + batched.run_batch(LOBBatch.from_snapshots(lobs[150:]))
+
+        assert actual == expected, factory.__name__
+        assert batched.tick_index == stepped.tick_index == len(lobs)
+        assert _by_label(batched.graph, batched._variables) == _by_label(stepped.graph, stepped._variables)
+
+    assert sum(map(len, expected)) > 0
+
+
+def test_run_batch_empty_side():
+    rng = random.Random(5)
+    lobs = [fake_lob(t, rng) for t in range(60)]
+    lobs[0] = LOBSnapshot("SIM", 0.0, bids=[], asks=lobs[0].asks)
+    # No last trade on some ticks: those run one at a time, between blocks
+    lobs[1:] = [
+        LOBSnapshot(lob.symbol, lob.timestamp, lob.bids, lob.asks, last_trade_price=None if t % 7 else lob.asks[0].price)
+        for t, lob in enumerate(lobs[1:])
+    ]
+
+    def runner() -> StrategyRunner:
+        g = Graph(logger)
+        src       = g.add(LOBSource(label="market"))
+        ewma      = g.add(EWMA(span=10, label="ewma"))
+        threshold = g.add(Constant(100.0, label="threshold"))
+        above     = g.add(Compare(op="gt", label="above"))
+        size      = g.add(Constant(1.0, label="size"))
+        buy       = g.add(MarketOrderGen(side="buy", label="buy"))
+        g.connect(src,       "mid",    ewma,  "value")
+        g.connect(ewma,      "ewma",   above, "a")
+        g.connect(threshold, "value",  above, "b")
+        g.connect(above,     "result", buy,   "trigger")
+        g.connect(size,      "value",  buy,   "size")
+        return StrategyRunner(g)
+
+    stepped, batched = runner(), runner()
+    # A tick without bids has no mid: step raises on it, and so does run_batch, instead of carrying NaN on
+    with pytest.raises(TypeError):
+        stepped.step(lobs[0])
+    with pytest.raises(TypeError):
+        batched.run_batch(lobs)
+
+    expected = [stepped.step(lob) for lob in lobs[1:]]
+    assert batched.run_batch(lobs[1:]) == expected
+    assert sum(map(len, expected)) > 0
+    assert _by_label(batched.graph, batched._variables) == _by_label(stepped.graph, stepped._variables)
+    assert not math.isnan(_by_label(batched.graph, batched._variables)["ewma__prev"])
+
+    # Without kept snapshots, the ticks run alone get one rebuilt from the columns
+    columns = LOBBatch.from_snapshots(lobs[1:])
+    columns.snapshots = None
+    assert runner().run_batch(columns) == expected
+
+
+# ---------------------------------------------------------------------------
+# RollingWindow incremental statistics match a full recomputation
+# ---------------------------------------------------------------------------
+def test_rolling_window_matches_naive():
+    rng = random.Random(5)
+    for window in (1, 2, 7, 50):
+        node = RollingWindow(window=window)
+        ctx = Context(fake_lob(0, rng))
+        buf = deque(maxlen=window)
+        x = 100.0
+        for t in range(2000):
+            x += rng.gauss(0, 0.05)
+            v = float("nan") if rng.random() < 0.05 else (None if rng.random() < 0.02 else x)
+            out = node._compute(ctx, {"value": v})
+            if v is not None and not math.isnan(v):
+                buf.append(v)
+            if not buf:
+                assert math.isnan(out["sma"]) and not out["full"]
+                continue
+
+            sma = sum(buf) / len(buf)
+            std = math.sqrt(sum((y - sma) ** 2 for y in buf) / max(len(buf) - 1, 1))
+            assert out["sma"] == pytest.approx(sma, abs=1e-9)
+            assert out["std"] == pytest.approx(std, abs=1e-9)
+            assert (out["min"], out["max"]) == (min(buf), max(buf))
+            assert out["full"] == (len(buf) == window)
+
+
+# ---------------------------------------------------------------------------
+# MultiRunner matches one StrategyRunner per graph
+# ---------------------------------------------------------------------------
+_SWEEP = [
+    lambda: mean_reversion(window=10),
+    lambda: mean_reversion(window=30),
+    lambda: market_maker(vol_window=10),
+    lambda: market_maker(vol_window=20),
+    state_machine_mm,
+    position_gated,
+]
+
+
+def test_multi_runner_shares_nodes():
+    runners = [factory() for factory in _SWEEP]
+    multi = MultiRunner([r.graph for r in runners], validate=False)
+
+    # Every graph's LOBSource (and the shared constants) run once
+    assert len(multi.plan) < sum(len(r.graph.compile()) for r in runners)
+    sources = [node for node in multi.plan.nodes if isinstance(node, LOBSource)]
+    assert len(sources) == 1
+
+    # Graphs can be shipped to spawned worker processes
+    for runner in runners:
+        assert len(pickle.loads(pickle.dumps(runner.graph)).nodes) == len(runner.graph.nodes)
+
+
+def test_multi_runner_matches_runners():
+    rng = random.Random(3)
+    lobs = [fake_lob(t, rng) for t in range(300)]
+
+    runners = [factory() for factory in _SWEEP]
+    expected = [[runner.step(lob) for lob in lobs] for runner in runners]
+    assert all(sum(map(len, expected[g])) > 0 for g in (2, 3, 5))
+
+    multi = MultiRunner([factory().graph for factory in _SWEEP], validate=False)
+    stepped = [multi.step(lob) for lob in lobs[:100]]
+    batched = multi.run_batch(lobs[100:])
+    actual = [[tick[g] for tick in stepped] + batched[g] for g in range(len(_SWEEP))]
+    assert actual == expected
+
+
+def test_multi_runner_processes():
+    rng = random.Random(4)
+    lobs = [fake_lob(t, rng) for t in range(200)]
+
+    runners = [factory() for factory in _SWEEP]
+    expected = [runner.run_batch(lobs) for runner in runners]
+
+    with MultiRunner([factory().graph for factory in _SWEEP], validate=False, processes=2) as multi:
+        first = multi.run_batch(lobs[:50])
+        last = multi.step(lobs[50])
+        rest = multi.run_batch(lobs[51:])
+    actual = [first[g] + [last[g]] + rest[g] for g in range(len(_SWEEP))]
+    assert actual == expected
+
+
+# ---------------------------------------------------------------------------
+# LOBSnapshot built from book depth agrees with one built from Levels
+# ---------------------------------------------------------------------------
+def test_lob_snapshot_from_depth():
+    import numpy as np
+    from dxlib import Instrument
+    from dxlib.market import Order, OrderBook, Side, TickOrderBook
+
+    rng = random.Random(6)
+    lob = LOBSnapshot(
+        "SIM", 0.0,
+        bids=[Level(round(99.9 - i * 0.1, 2), 10 - i) for i in range(7)],
+        asks=[Level(round(100.1 + i * 0.1, 2), 7 + i) for i in range(7)],
+    )
+    for book in (OrderBook(0.01), TickOrderBook(0.01)):
+        for side, levels in ((Side.BUY, lob.bids), (Side.SELL, lob.asks)):
+            for level in levels:
+                book.send_limit(Order(Instrument("SIM"), price=level.price, quantity=level.size, side=side))
+
+        snapshot = LOBSnapshot.from_depth("SIM", 0.0, book.depth(5, Side.BUY), book.depth(5, Side.SELL))
+        assert (snapshot.best_bid, snapshot.best_ask) == pytest.approx((lob.best_bid, lob.best_ask))
+        assert snapshot.ask_prices.tolist() == pytest.approx([l.price for l in lob.asks[:5]])
+        assert snapshot.bid_depth == sum(l.size for l in lob.bids[:5])
+        assert snapshot.imbalance == pytest.approx(LOBSnapshot("SIM", 0.0, lob.bids[:5], lob.asks[:5]).imbalance)
+        assert snapshot.vwap(3) == pytest.approx(lob.vwap(3))
+        assert snapshot.bid_at(1).size == lob.bids[1].size and snapshot.ask_at(5) is None
+
+    # Arrays are used as given, and every form of a side agrees
+    bids = np.array([(l.price, l.size) for l in lob.bids])
+    asks = np.array([(l.price, l.size) for l in lob.asks])
+    snapshot = LOBSnapshot.from_depth("SIM", lob.timestamp, bids, asks)
+    assert np.shares_memory(snapshot.bid_prices, bids)
+    assert snapshot == lob and snapshot.bids == lob.bids
+    assert list(snapshot.ask_cum_depth) == list(np.cumsum([l.size for l in lob.asks]))
+    assert (snapshot.mid, snapshot.spread, snapshot.ask_depth) == (lob.mid, lob.spread, lob.ask_depth)
+
+    empty = LOBSnapshot.from_depth("SIM", 0.0, [], np.empty((0, 2)))
+    assert (empty.best_bid, empty.mid, empty.bid_depth, empty.imbalance, empty.vwap()) == (None, None, 0, None, None)
+
+    # Strategies see the same book either way
+    lobs = [fake_lob(t, rng) for t in range(200)]
+    depths = [
+        LOBSnapshot.from_depth(l.symbol, l.timestamp, [(x.price, x.size) for x in l.bids],
+                               [(x.price, x.size) for x in l.asks])
+        for l in lobs
+    ]
+    for factory in (market_maker, position_gated):
+        a, b = factory(), factory()
+        assert [a.step(l) for l in lobs] == [b.step(l) for l in depths]
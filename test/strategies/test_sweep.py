@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dxlib import Portfolio, Instrument, History, HistorySchema, OrderGenerator, Sweep
+from dxlib.strategy.signal import SignalStrategy
+from dxlib.strategy.signal.custom.rsi import Rsi
+from dxlib.strategy.signal.custom.wick_reversal import WickReversal
+from dxlib.strategy.views import SecuritySignalView
+
+
+def ohlc(n_days=40, symbols=("AAPL", "MSFT", "GOOG")):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=n_days)
+    index = pd.MultiIndex.from_product([dates, [Instrument(s) for s in symbols]], names=["date", "instrument"])
+    close = 100 * np.exp(np.cumsum(rng.normal(0, .02, len(index))))
+    open_ = close * rng.uniform(.95, 1.05, len(index))
+    high = np.maximum(open_, close) * rng.uniform(1, 1.05, len(index))
+    low = np.minimum(open_, close) * rng.uniform(.95, 1, len(index))
+    data = pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+    schema = HistorySchema({"date": pd.Timestamp, "instrument": Instrument}, {k: float for k in data.columns})
+    return History(schema, data)
+
+
+class TimestampSignalView(SecuritySignalView):
+    def iter(self, origin: History):
+        for idx in origin.level_values(self.time_index).unique():
+            yield self.get(origin, idx)
+
+
+def wick_strategy(range_multiplier, percent):
+    return SignalStrategy(WickReversal(range_multiplier), OrderGenerator(percent))
+
+
+def rsi_strategy(window, lower, upper):
+    return SignalStrategy(Rsi(window, lower, upper, period=3), OrderGenerator())
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.portfolio = Portfolio({Instrument("USD"): 1000.0})
+
+    def test_grid(self):
+        sweep = Sweep(wick_strategy, {"range_multiplier": [.2, .4, .6], "percent": [.05, .1]},
+                      ohlc(), TimestampSignalView("date"), self.portfolio, processes=1)
+        results = sweep.run()
+
+        self.assertEqual(list(results.columns), ["range_multiplier", "percent", "pnl", "return", "turnover", "trades"])
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[["range_multiplier", "percent"]].iloc[1].tolist(), [.2, .1])
+        self.assertTrue((results["trades"] > 0).all())
+        np.testing.assert_allclose(results["return"], results["pnl"] / 1000.0)
+        # the starting portfolio is not touched by the backtests
+        self.assertEqual(self.portfolio.to_dict(), {Instrument("USD"): 1000.0})
+
+        # stepping through the history gives the vectorized results
+        stepped = Sweep(wick_strategy, sweep.params, sweep.history, sweep.history_view, self.portfolio,
+                        vectorized=False, processes=1).run()
+        pd.testing.assert_frame_equal(results, stepped)
+
+    def test_processes(self):
+        history = ohlc(n_days=15)
+        view = SecuritySignalView("date", ["close"])
+        grid = [{"window": 3, "lower": .3, "upper": .7}, {"window": 5, "lower": .4, "upper": .6}]
+
+        expected = Sweep(rsi_strategy, grid, history, view, self.portfolio, processes=1).run()
+        actual = Sweep(rsi_strategy, grid, history, view, self.portfolio, processes=2).run()
+        pd.testing.assert_frame_equal(expected, actual)
+        self.assertEqual(expected["window"].tolist(), [3, 5])
+        self.assertTrue((expected["trades"] > 0).all())
+
+        grid = {"range_multiplier": [.2, .4], "percent": [.05]}
+        expected = Sweep(wick_strategy, grid, history, TimestampSignalView("date"), self.portfolio, processes=1).run()
+        actual = Sweep(wick_strategy, grid, history, TimestampSignalView("date"), self.portfolio, processes=2).run()
+        pd.testing.assert_frame_equal(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dxlib import Executor, Portfolio, Instrument, History, HistorySchema, OrderGenerator
+from dxlib.interfaces import BacktestInterface
+from dxlib.strategy.signal import SignalStrategy
+from dxlib.strategy.signal.custom.wick_reversal import WickReversal
+from dxlib.strategy.views import SecuritySignalView
+
+
+def ohlc(n_days=40, symbols=("AAPL", "MSFT", "GOOG")):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=n_days)
+    index = pd.MultiIndex.from_product([dates, [Instrument(s) for s in symbols]], names=["date", "instrument"])
+    open_ = rng.uniform(100, 200, len(index))
+    close = open_ * rng.uniform(.95, 1.05, len(index))
+    high = np.maximum(open_, close) * rng.uniform(1, 1.05, len(index))
+    low = np.minimum(open_, close) * rng.uniform(.95, 1, len(index))
+    data = pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+    schema = HistorySchema({"date": pd.Timestamp, "instrument": Instrument}, {k: float for k in data.columns})
+    return History(schema, data)
+
+
+class TimestampSignalView(SecuritySignalView):
+    def iter(self, origin: History):
+        for idx in origin.level_values(self.time_index).unique():
+            yield self.get(origin, idx)
+
+
+class TestVectorizedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.history = ohlc()
+        self.view = TimestampSignalView("date")
+
+    def executor(self, signal_generator=None):
+        interface = BacktestInterface(self.history, self.view, Portfolio({Instrument("USD"): 1000.0}))
+        strategy = SignalStrategy(signal_generator or WickReversal(), OrderGenerator())
+        return Executor(strategy, interface), interface
+
+    def test_matches_run(self):
+        executor, interface = self.executor()
+        result, portfolio_history = executor.run(self.view, interface.iter(), history=self.history)
+        vectorized, vectorized_interface = self.executor()
+        vectorized_result, vectorized_portfolio_history = vectorized.run_vectorized(self.view)
+
+        expected = portfolio_history.data.sort_index()
+        actual = vectorized_portfolio_history.data.sort_index()
+        self.assertTrue(expected.index.equals(actual.index))
+        np.testing.assert_allclose(expected["quantity"].astype(float), actual["quantity"].astype(float))
+
+        self.assertEqual(result.history_schema, vectorized_result.history_schema)
+        self.assertTrue(result.data.index.sort_values().equals(vectorized_result.data.index.sort_values()))
+        np.testing.assert_allclose(
+            interface.portfolio.quantities.sort_index(key=lambda x: x.map(str)),
+            vectorized_interface.portfolio.quantities.sort_index(key=lambda x: x.map(str)),
+        )
+
+    def test_requires_stateless(self):
+        class Stateful(WickReversal):
+            stateless = False
+
+        executor, _ = self.executor(Stateful())
+        with self.assertRaises(ValueError):
+            executor.run_vectorized(self.view)
+
+    def test_requires_immediate_fills(self):
+        executor, interface = self.executor()
+        interface.order.fill_registry.register(Instrument("AAPL"), interface.order.fill_registry.default)
+        self.assertTrue(interface.order.fill_registry.has_overrides())
+        with self.assertRaises(ValueError):
+            executor.run_vectorized(self.view)
+
+
+if __name__ == '__main__':
+    unittest.main()